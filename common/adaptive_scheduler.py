@@ -0,0 +1,156 @@
+"""Choose the polling interval by the activity. Backs off while nothing happens and
+polls fast for a short time after something interesting happens."""
+
+import ctypes
+import threading
+import time
+from collections import deque
+from ctypes import wintypes
+from dataclasses import dataclass, replace
+from typing import Callable, Hashable
+
+from logger import logger
+
+ActivityProbe = Callable[[], Hashable]
+
+
+class _LASTINPUTINFO(ctypes.Structure):  # pylint: disable=too-few-public-methods
+    _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+
+def user_activity_marker() -> Hashable:
+    """return a value that changes whenever the foreground window changes or the user gives an input"""
+
+    user32 = ctypes.windll.user32
+
+    last_input_info = _LASTINPUTINFO(cbSize=ctypes.sizeof(_LASTINPUTINFO))
+    user32.GetLastInputInfo(ctypes.byref(last_input_info))
+
+    return user32.GetForegroundWindow(), last_input_info.dwTime
+
+
+@dataclass(frozen=True)
+class _Intervals:
+    base_secs: float
+    idle_secs: float
+    burst_secs: float
+    burst_duration_secs: float
+    backoff_factor: float
+
+
+class _UserActivity:  # pylint: disable=too-few-public-methods
+    """detects the user activity by the changes of the marker returned by the probe"""
+
+    def __init__(self, probe: ActivityProbe | None) -> None:
+        self._probe = probe
+        self._last_marker: Hashable = None
+
+    def is_active(self) -> bool:
+        """return whether the marker is changed since the last call"""
+
+        if self._probe is None:
+            return False
+
+        try:
+            marker = self._probe()
+        except OSError:
+            return False
+
+        is_active = marker != self._last_marker
+        self._last_marker = marker
+        return is_active
+
+
+class AdaptiveScheduler:
+    """Chooses the interval of the next poll.
+
+    - the interval starts from the base interval and grows by the backoff factor on every idle
+      poll, until the idle interval. Any activity brings it back to the base interval.
+    - in the burst mode the fast interval is used, until the burst duration is over.
+    """
+
+    HISTORY_SIZE = 100
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        base_interval_secs: float = 1,
+        idle_interval_secs: float = 5,
+        burst_interval_secs: float = 0.1,
+        burst_duration_secs: float = 3,
+        backoff_factor: float = 1.5,
+        activity_probe: ActivityProbe | None = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._user_activity = _UserActivity(activity_probe)
+
+        self._intervals = _Intervals(0.0, 0.0, 0.0, 0.0, backoff_factor)
+        self.configure(base_interval_secs, idle_interval_secs, burst_interval_secs, burst_duration_secs)
+
+        self._interval_secs = base_interval_secs
+        self._is_active = False
+        self._burst_until = 0.0
+        self._history: deque[float] = deque(maxlen=self.HISTORY_SIZE)
+
+    def configure(
+        self, base_interval_secs: float, idle_interval_secs: float, burst_interval_secs: float, burst_duration_secs: float
+    ) -> None:
+        """change the intervals, they are applied from the next poll"""
+
+        if not 0 < burst_interval_secs <= base_interval_secs <= idle_interval_secs:
+            raise ValueError("The intervals must be positive and burst <= base <= idle.")
+
+        with self._lock:
+            self._intervals = replace(
+                self._intervals,
+                base_secs=base_interval_secs,
+                idle_secs=idle_interval_secs,
+                burst_secs=burst_interval_secs,
+                burst_duration_secs=burst_duration_secs,
+            )
+
+    @property
+    def interval_secs(self) -> float:
+        """return the last chosen interval"""
+        return self._interval_secs
+
+    @property
+    def history(self) -> list[float]:
+        """return the recently chosen intervals, the oldest first"""
+
+        with self._lock:
+            return list(self._history)
+
+    def notify_activity(self) -> None:
+        """something has changed, do not back off"""
+
+        with self._lock:
+            self._is_active = True
+
+    def burst(self) -> None:
+        """poll fast for a while, i.e. a new window is appeared or a send is failed"""
+
+        with self._lock:
+            self._burst_until = time.monotonic() + self._intervals.burst_duration_secs
+
+    def next_interval(self) -> float:
+        """choose and return the interval until the next poll"""
+
+        is_user_active = self._user_activity.is_active()
+
+        with self._lock:
+            intervals = self._intervals
+            if time.monotonic() < self._burst_until:
+                interval_secs = intervals.burst_secs
+            elif is_user_active or self._is_active or self._interval_secs < intervals.base_secs:
+                interval_secs = intervals.base_secs
+            else:
+                interval_secs = min(self._interval_secs * intervals.backoff_factor, intervals.idle_secs)
+
+            if interval_secs != self._interval_secs:
+                logger.debug("Polling interval is changed from %.2f to %.2f seconds.", self._interval_secs, interval_secs)
+
+            self._interval_secs = interval_secs
+            self._is_active = False
+            self._history.append(interval_secs)
+            return interval_secs
@@ -0,0 +1,88 @@
+"""Crash-safe file writes. The content is written to a temporary file next to the target,
+flushed to the disk and moved over the target at once, so a reader sees either the old
+or the new file but never a partially written one."""
+
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+# a reader that holds the target open without sharing the delete access blocks the replace on Windows for a moment
+REPLACE_ATTEMPTS = 5
+REPLACE_RETRY_SECS = 0.02
+
+
+def backup_path(target: str | Path, generation: int) -> Path:
+    """return the path of the given backup generation of the target, 1 is the most recent one"""
+
+    target = Path(target)
+    return target.with_name(f"{target.name}.bak{generation}")
+
+
+def _rotate_backups(target: Path, generations: int) -> None:
+    if not target.exists():
+        return
+
+    for generation in range(generations - 1, 0, -1):
+        with suppress(FileNotFoundError):
+            os.replace(backup_path(target, generation), backup_path(target, generation + 1))
+
+    # the target stays in place until it is replaced, a hard link does not copy the content
+    latest = backup_path(target, 1)
+    with suppress(FileNotFoundError):
+        os.unlink(latest)
+    try:
+        os.link(target, latest)
+    except OSError:
+        shutil.copy2(target, latest)
+
+
+def _replace(source: str, target: Path) -> None:
+    for attempt in range(REPLACE_ATTEMPTS):
+        try:
+            os.replace(source, target)
+            return
+        except PermissionError:
+            if attempt == REPLACE_ATTEMPTS - 1:
+                raise
+            time.sleep(REPLACE_RETRY_SECS * 2**attempt)
+
+
+def _fsync_directory(directory: Path) -> None:
+    # the directories cannot be opened on Windows, the rename is durable once the file system flushes its journal
+    if os.name == "nt":
+        return
+
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(target: str | Path, mode: str = "wb", encoding: str | None = None, backups: int = 0) -> Iterator[IO[Any]]:
+    """Open a temporary file to write the content of the target. On success, the file is synced to the disk,
+    the given number of backup generations of the old target are kept and the target is replaced at once.
+    On failure the target is left untouched."""
+
+    target = Path(target)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+
+        if backups > 0:
+            _rotate_backups(target, backups)
+        _replace(temp_path, target)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(temp_path)
+        raise
+
+    _fsync_directory(target.parent)
@@ -0,0 +1,33 @@
+"""A daemon thread that runs until it is asked to stop"""
+
+import threading
+from typing import Any, Callable
+
+
+class BackgroundThread:
+    """Runs the target in a daemon thread. The target should wait on the stop event between its
+    rounds, so it returns as soon as the thread is stopped."""
+
+    def __init__(self) -> None:
+        self.stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def is_running(self) -> bool:
+        """return whether the thread is started and not stopped yet"""
+        return self._thread is not None
+
+    def start(self, target: Callable[..., None], *args: Any) -> None:
+        """run the target with the given arguments in a new thread"""
+
+        self.stop_event.clear()
+        self._thread = threading.Thread(target=target, args=args, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """set the stop event and wait for the thread, unless it is called from the thread itself"""
+
+        self.stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
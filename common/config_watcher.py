@@ -0,0 +1,105 @@
+"""Watch the config files and report them once their content is really changed"""
+
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import AsyncIterator
+
+from handlers.file_watcher.base import FileWatcherInterface
+from logger import logger
+from settings import CONFIG_WATCH_DEBOUNCE_SECS
+
+_READ_SIZE = 64 * 1024
+
+
+def get_digest(path: Path) -> bytes | None:
+    """return the digest of the file content, None if it cannot be read"""
+
+    try:
+        digest = hashlib.blake2b()
+        with open(path, "rb") as file:
+            while chunk := file.read(_READ_SIZE):
+                digest.update(chunk)
+        return digest.digest()
+    except OSError:
+        return None
+
+
+class ConfigWatcher:
+    """Reports the config files whose content is changed.
+
+    - the notifications of the watcher are debounced, a burst of writes is reported once
+      after the files are quiet for the debounce time.
+    - the content is compared with the last reported one, so the touched files are not reported.
+    """
+
+    def __init__(self, paths: list[Path], watcher: FileWatcherInterface, debounce_secs: float = CONFIG_WATCH_DEBOUNCE_SECS) -> None:
+        self._paths = paths
+        self._watcher = watcher
+        self._debounce_secs = debounce_secs
+
+        self._digests: dict[Path, bytes | None] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._notified: asyncio.Event | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        """take the current content as the last seen one, should be called before loading the files"""
+        self._digests = {path: get_digest(path) for path in self._paths}
+
+    def accept(self, path: Path, digest: bytes) -> None:
+        """take the given content as seen, i.e. if the change is already applied by other means"""
+        self._digests[path] = digest
+
+    def invalidate(self, path: Path) -> None:
+        """report the file on the next check even if its content is not changed, i.e. if it could not be loaded"""
+        self._digests[path] = None
+
+    def notify(self, _: Path | None = None) -> None:
+        """check the files, can be called from any thread"""
+
+        loop, notified = self._loop, self._notified
+        if loop is None or notified is None:
+            return
+
+        try:
+            loop.call_soon_threadsafe(notified.set)
+        except RuntimeError:
+            pass  # the loop is closed
+
+    def _get_changed(self) -> set[Path]:
+        changed: set[Path] = set()
+        for path in self._paths:
+            digest = get_digest(path)
+            # a missing file is reported only once it is there again
+            if digest is not None and digest != self._digests.get(path):
+                changed.add(path)
+            self._digests[path] = digest
+
+        return changed
+
+    async def _wait_quiet(self, notified: asyncio.Event) -> None:
+        while True:
+            notified.clear()
+            try:
+                await asyncio.wait_for(notified.wait(), self._debounce_secs)
+            except asyncio.TimeoutError:  # not the builtin TimeoutError before Python 3.11
+                return
+
+    async def changes(self) -> AsyncIterator[set[Path]]:
+        """yield the files whose content is changed, until the iteration is cancelled"""
+
+        self._loop = asyncio.get_running_loop()
+        notified = self._notified = asyncio.Event()
+        self._watcher.start(self._paths, self.notify)
+        try:
+            while True:
+                await notified.wait()
+                await self._wait_quiet(notified)
+
+                if changed := self._get_changed():
+                    logger.debug("Config files are changed: %s", ", ".join(path.name for path in changed))
+                    yield changed
+        finally:
+            self._watcher.stop()
+            self._loop = self._notified = None
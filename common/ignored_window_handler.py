@@ -1,34 +1,104 @@
 """handler for ignored windows. creates an interface to easily manage the ignored windows"""
 
+import ctypes
 import threading
 import time
-from typing import Set
+from ctypes import wintypes
 
-import pyautogui
+import psutil
 from pygetwindow import Win32Window  # type: ignore[import-untyped]
 
 from common.tools import get_window_hwnd
+from common.window_registry import WindowRegistry
+
+# owner thread id, owner process id and creation time of the owner process
+WindowIdentity = tuple[int, int, float]
+
+
+def get_window_identity(window_hwnd: int) -> WindowIdentity | None:
+    """return what distinguishes the window from a later one that reuses its hwnd, None if the window is closed"""
+
+    process_id = wintypes.DWORD()
+    thread_id = ctypes.windll.user32.GetWindowThreadProcessId(window_hwnd, ctypes.byref(process_id))
+    if not thread_id:
+        return None
+
+    try:
+        created_at = psutil.Process(process_id.value).create_time()
+    except psutil.Error:
+        return None
+
+    return thread_id, process_id.value, created_at
 
 
 class IgnoredWindowsHandler:
-    """creates an interface to easily manage the ignored windows"""
+    """creates an interface to easily manage the ignored windows.
+
+    The ignored windows are forgotten once they are closed, either on the close event or
+    by a single reaper thread that checks all of them at once on every interval.
+    """
+
+    REAP_INTERVAL_SECS = 5
+
+    def __init__(self, registry: WindowRegistry | None = None) -> None:
+        self._registry = registry or WindowRegistry.shared()
 
-    def __init__(self) -> None:
-        self.__ignored_windows: Set[int] = set()
+        self._lock = threading.Lock()
+        self.__ignored_windows: dict[int, WindowIdentity | None] = {}
+        self._reaper: threading.Thread | None = None
 
     def is_ignored(self, window_hwnd: int) -> bool:
         """return whether given window is ignored"""
 
-        return window_hwnd in self.__ignored_windows
+        with self._lock:
+            if window_hwnd not in self.__ignored_windows:
+                return False
+            identity = self.__ignored_windows[window_hwnd]
+
+        if identity is not None and get_window_identity(window_hwnd) != identity:
+            self.forget(window_hwnd)  # the window is closed and its hwnd is reused
+            return False
+
+        return True
 
     def ignore(self, window: Win32Window) -> None:
-        """add this window as an ignored window and wait in the background until is it closed."""
+        """add this window as an ignored window until is it closed."""
+
+        window_hwnd = get_window_hwnd(window)
+        identity = get_window_identity(window_hwnd)
+
+        with self._lock:
+            self.__ignored_windows[window_hwnd] = identity
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap, daemon=True)
+                self._reaper.start()
+
+    def forget(self, window_hwnd: int) -> None:
+        """stop ignoring the window, should be called when the window is closed"""
+
+        with self._lock:
+            self.__ignored_windows.pop(window_hwnd, None)
+
+    def _reap(self) -> None:
+        while True:
+            time.sleep(self.REAP_INTERVAL_SECS)
+
+            with self._lock:
+                ignored_windows = dict(self.__ignored_windows)
 
-        self.__ignored_windows.add(get_window_hwnd(window))
-        threading.Thread(target=self._cleanup_on_close, args=(window,)).start()
+            # a single enumeration for all ignored windows
+            open_windows = self._registry.windows()
+            closed = [
+                window_hwnd
+                for window_hwnd, identity in ignored_windows.items()
+                if window_hwnd not in open_windows or get_window_identity(window_hwnd) != identity
+            ]
 
-    def _cleanup_on_close(self, window: Win32Window) -> None:
-        while window in pyautogui.getAllWindows():  # type: ignore[attr-defined]
-            time.sleep(5)
+            with self._lock:
+                for window_hwnd in closed:
+                    if self.__ignored_windows.get(window_hwnd) == ignored_windows[window_hwnd]:
+                        del self.__ignored_windows[window_hwnd]
 
-        self.__ignored_windows.remove(get_window_hwnd(window))
+                if not self.__ignored_windows:
+                    self._reaper = None  # started again with the next ignored window
+                    return
@@ -0,0 +1,134 @@
+"""Type a text and verify that it is arrived, without fixed sleeps"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from logger import logger
+from settings import (
+    MAX_KEY_SENT_ATTEMPTS,
+    SEND_RETRY_BACKOFF_SECS,
+    SEND_RETRY_MAX_BACKOFF_SECS,
+    SEND_VERIFY_POLL_INTERVAL_SECS,
+    SEND_VERIFY_TIMEOUT_SECS,
+)
+
+# return the length of the text in the target control, None if it cannot be read at the moment
+LengthProbe = Callable[[], int | None]
+
+
+@dataclass
+class VerificationStatistics:  # pylint: disable=too-many-instance-attributes
+    """timing statistics of the verified sends, a plain record of the counters"""
+
+    sends: int = 0
+    verified: int = 0
+    failed: int = 0
+    attempts: int = 0
+    probes: int = 0
+    total_secs: float = 0.0
+    max_secs: float = 0.0
+    last_secs: float = 0.0
+
+    @property
+    def average_secs(self) -> float:
+        """return the average time of a send, from typing the text until it is verified or given up"""
+        return self.total_secs / self.sends if self.sends else 0.0
+
+
+class SendVerifier:
+    """Types the text and waits until the target control holds exactly as many characters.
+
+    - the control is probed with a short interval until the deadline, a send returns as soon as
+      the length matches instead of sleeping a fixed time.
+    - a mismatch is cleared at once and the text is typed again after an exponentially growing delay.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        timeout_secs: float = SEND_VERIFY_TIMEOUT_SECS,
+        poll_interval_secs: float = SEND_VERIFY_POLL_INTERVAL_SECS,
+        max_attempts: int = MAX_KEY_SENT_ATTEMPTS,
+        backoff_secs: float = SEND_RETRY_BACKOFF_SECS,
+        max_backoff_secs: float = SEND_RETRY_MAX_BACKOFF_SECS,
+    ) -> None:
+        self._timeout_secs = timeout_secs
+        self._poll_interval_secs = poll_interval_secs
+        self._max_attempts = max_attempts
+        self._backoff_secs = backoff_secs
+        self._max_backoff_secs = max_backoff_secs
+
+        self._lock = threading.Lock()
+        self._statistics = VerificationStatistics()
+
+    def backoff_secs(self, attempt: int) -> float:
+        """return the delay before the given retry, the first attempt is not delayed"""
+
+        if attempt <= 0:
+            return 0.0
+        return float(min(self._backoff_secs * 2 ** (attempt - 1), self._max_backoff_secs))
+
+    def wait_for_length(self, probe: LengthProbe, expected: int) -> tuple[bool, int]:
+        """probe until the length is the expected one or the deadline is passed,
+        return whether it matched and how many times it is probed"""
+
+        deadline = time.perf_counter() + self._timeout_secs
+        probes = 0
+
+        while True:
+            length = probe()
+            probes += 1
+
+            if length == expected:
+                return True, probes
+            if length is not None and length > expected:
+                return False, probes  # more characters are there than sent, it does not get better
+            if time.perf_counter() >= deadline:
+                return False, probes
+
+            time.sleep(self._poll_interval_secs)
+
+    def send(self, type_text: Callable[[], None], clear: Callable[[], None], probe: LengthProbe, expected: int) -> bool:
+        """type the text until the probe reports the expected length, return whether it is verified"""
+
+        started_at = time.perf_counter()
+        verified, attempts, probes = False, 0, 0
+
+        for attempt in range(self._max_attempts):
+            if delay_secs := self.backoff_secs(attempt):
+                time.sleep(delay_secs)
+
+            attempts += 1
+            type_text()
+
+            verified, attempt_probes = self.wait_for_length(probe, expected)
+            probes += attempt_probes
+            if verified:
+                break
+
+            logger.debug("The sent keys cannot be verified on the attempt %d, clearing the field.", attempts)
+            clear()
+
+        elapsed = time.perf_counter() - started_at
+        logger.debug("The keys are %s in %.1f ms after %d attempts.", "verified" if verified else "not verified", elapsed * 1000, attempts)
+
+        with self._lock:
+            self._statistics.sends += 1
+            self._statistics.verified += verified
+            self._statistics.failed += not verified
+            self._statistics.attempts += attempts
+            self._statistics.probes += probes
+            self._statistics.total_secs += elapsed
+            self._statistics.max_secs = max(self._statistics.max_secs, elapsed)
+            self._statistics.last_secs = elapsed
+
+        return verified
+
+    @property
+    def statistics(self) -> VerificationStatistics:
+        """return a copy of the statistics"""
+
+        with self._lock:
+            return VerificationStatistics(**vars(self._statistics))
@@ -0,0 +1,127 @@
+"""Index over the window data titles to find the matching window data for a window title quickly."""
+
+import bisect
+import re
+from typing import TYPE_CHECKING, Iterable, Iterator, Sequence
+
+if TYPE_CHECKING:
+    # not imported at runtime, the matching does not need the Windows only dependencies of the config
+    from config.config import WindowData
+
+_REGEX_SPECIAL_CHARS = frozenset(".^$*+?{}[]\\|()")
+# a back reference or a conditional by the group number, i.e. \1 or (?(1)...), an escaped backslash does not count
+_NUMBERED_REFERENCE = re.compile(r"(?<!\\)(?:\\\\)*(?:\\[1-9]|\(\?\(\d)")
+
+
+def is_literal(title: str) -> bool:
+    """return whether the given title has no regex special characters"""
+    return _REGEX_SPECIAL_CHARS.isdisjoint(title)
+
+
+def has_numbered_reference(pattern: str) -> bool:
+    """return whether the pattern refers to its groups by number, which are shifted once it is combined with others"""
+    return _NUMBERED_REFERENCE.search(pattern) is not None
+
+
+class _PrefixIndex:
+    """the literal titles, matched as the prefixes of the title"""
+
+    def __init__(self) -> None:
+        self._prefixes: dict[str, list[int]] = {}
+        self._lengths: list[int] = []
+
+    def add(self, prefix: str, idx: int) -> None:
+        """add the prefix of the window data at the given index"""
+
+        self._prefixes.setdefault(prefix, []).append(idx)
+        if len(prefix) not in self._lengths:
+            bisect.insort(self._lengths, len(prefix))
+
+    def match(self, title: str) -> Iterator[int]:
+        """yield the indexes of the prefixes of the title"""
+
+        for length in self._lengths:
+            if length > len(title):
+                break
+            yield from self._prefixes.get(title[:length], ())
+
+
+class TitleMatcherIndex:
+    """Index over the window data titles. The window data matches to a title if its
+    title pattern matches the title or its title is equal to the title.
+
+    - titles are kept in a hash map to check the equality.
+    - literal titles are matched with prefix lookups, which is what `re.match` does for them.
+    - all remaining patterns are combined in a single regex to reject the titles quickly,
+      except the ones that refer to their groups by number, which are always checked one by one.
+    - the results are memoized per title. Build a new index when the window data changes.
+    """
+
+    MAX_MEMO_SIZE = 1024
+
+    def __init__(self, windows: Sequence["WindowData"]) -> None:
+        self._windows = list(windows)
+
+        self._exact: dict[str, list[int]] = {}
+        self._literal_prefixes = _PrefixIndex()
+        self._patterns: list[tuple[int, re.Pattern[str]]] = []
+        self._uncombined_patterns: list[tuple[int, re.Pattern[str]]] = []
+        self._memo: dict[str, list["WindowData"]] = {}
+
+        for idx, window_data in enumerate(self._windows):
+            self._exact.setdefault(window_data.title, []).append(idx)
+
+            if window_data.title_pattern is None:
+                continue  # not a valid pattern, can only be matched by equality
+
+            if is_literal(window_data.title):
+                self._literal_prefixes.add(window_data.title, idx)
+            elif has_numbered_reference(window_data.title):
+                self._uncombined_patterns.append((idx, window_data.title_pattern))
+            else:
+                self._patterns.append((idx, window_data.title_pattern))
+
+        self._combined_pattern = self._combine(pattern for _, pattern in self._patterns)
+
+    @staticmethod
+    def _combine(patterns: Iterable[re.Pattern[str]]) -> re.Pattern[str] | None:
+        try:
+            return re.compile("|".join(f"(?:{pattern.pattern})" for pattern in patterns))
+        except re.error:
+            # the patterns cannot be combined. i.e. they have the same group names or global flags.
+            return None
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    @property
+    def windows(self) -> list["WindowData"]:
+        """return the indexed window data"""
+        return self._windows
+
+    def match(self, title: str) -> list["WindowData"]:
+        """return the window data that match to the given title, in the original order"""
+
+        try:
+            return self._memo[title]
+        except KeyError:
+            pass
+
+        matched = self._match(title)
+
+        if len(self._memo) >= self.MAX_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[title] = matched
+
+        return matched
+
+    def _match(self, title: str) -> list["WindowData"]:
+        indexes = set(self._exact.get(title, ()))
+
+        indexes.update(self._literal_prefixes.match(title))
+
+        if self._patterns and (self._combined_pattern is None or self._combined_pattern.match(title)):
+            indexes.update(idx for idx, pattern in self._patterns if pattern.match(title))
+        indexes.update(idx for idx, pattern in self._uncombined_patterns if pattern.match(title))
+
+        return [self._windows[idx] for idx in sorted(indexes)]
@@ -1,24 +1,37 @@
 """Common function/methods"""
 
 import ctypes
+import dataclasses
 import os
 import subprocess
 import sys
+import threading
+import time
 import tkinter as tk
+from collections import OrderedDict
 from functools import cache
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Type
+from typing import TYPE_CHECKING, Any, Callable, ClassVar, Dict, Iterable, Iterator, List, Tuple, Type
 
-import psutil
-import pyautogui
-from pygetwindow import Win32Window  # type: ignore[import-untyped]
+from pygetwindow import PyGetWindowException, Win32Window  # type: ignore[import-untyped]
 from screeninfo import get_monitors
 from tendo import singleton
 
 from common.exceptions import ConfigFileNotFoundError
 from common.exit_codes import ExitCodes
+from common.window_text_cache import CacheStatistics
 from logger import logger
-from settings import CREDENTIALS_FILE, ENV_NAME_AUTH_KEY, ENV_NAME_DEBUG, ENV_NAME_SKIP_UPDATE, WRAPPER_FILE
+from settings import (
+    CREDENTIALS_FILE,
+    ENV_NAME_AUTH_KEY,
+    ENV_NAME_DEBUG,
+    ENV_NAME_SKIP_UPDATE,
+    UIA_CACHE_MAX_WINDOWS,
+    UIA_CACHE_TTL_SECS,
+    UIA_WALK_MAX_DEPTH,
+    UIA_WALK_MAX_NODES,
+    WRAPPER_FILE,
+)
 
 if TYPE_CHECKING:
     import pywinauto  # type: ignore[import-untyped]
@@ -33,21 +46,6 @@ def is_debug_enabled() -> bool:
     return bool(os.getenv(ENV_NAME_DEBUG, None))
 
 
-def is_windows_locked() -> bool:
-    """Return the lock information of the windows"""
-
-    for proc in psutil.process_iter():
-        try:
-            proc_name = proc.name()
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
-
-        if proc_name == "LogonUI.exe":
-            return True
-
-    return False
-
-
 def split_long_string(input_string: str, max_length: int) -> str:
     """Splits a long string into smaller pieces based on the given maximum length,
     ensuring that the split occurs at spaces and not in the middle of words.
@@ -101,11 +99,11 @@ def reset_single_instance() -> None:
 
 
 def get_window_by_hwnd(hwnd: int) -> Win32Window | None:
-    """return the window by given ID"""
+    """return the window by given ID, without enumerating all windows"""
 
     try:
-        return next(window for window in pyautogui.getAllWindows() if get_window_hwnd(window) == hwnd)  # type: ignore[attr-defined]
-    except StopIteration:
+        return Win32Window(hwnd)
+    except PyGetWindowException:
         return None
 
 
@@ -116,6 +114,15 @@ def get_window_hwnd(window: Win32Window) -> int:
     return window._hWnd  # type: ignore[no-any-return]
 
 
+def get_window_class_name(window_hwnd: int) -> str:
+    """return the class name of the window, the windows of the same kind share it"""
+
+    buffer = ctypes.create_unicode_buffer(256)
+    if not ctypes.windll.user32.GetClassNameW(window_hwnd, buffer, len(buffer)):
+        return ""
+    return buffer.value
+
+
 def focus_window(window: Win32Window) -> None:
     """focus on given window by minimizing and maximizing it"""
 
@@ -156,58 +163,237 @@ def _get_pywinauto() -> "pywinauto":
     return pywinauto
 
 
-def get_window(window_or_id: Win32Window | int | str) -> "pywinauto.application.WindowSpecification":
-    """return the window based on given ID or window object"""
-    pywinauto = _get_pywinauto()
-
-    desktop = pywinauto.Desktop(backend="uia")
+def _to_hwnd(window_or_id: Win32Window | int | str) -> int:
     if isinstance(window_or_id, Win32Window):
-        window_id = get_window_hwnd(window_or_id)
-    else:
-        window_id = int(window_or_id)
+        return get_window_hwnd(window_or_id)
+    return int(window_or_id)
 
-    window = desktop.window(handle=window_id)
 
-    return window
+def walk_controls(root: Any, max_depth: int = UIA_WALK_MAX_DEPTH, max_nodes: int = UIA_WALK_MAX_NODES) -> Iterator[Any]:
+    """Walk the control tree in document order, without recursion.
+    Does not visit the controls deeper than `max_depth` and visits at most `max_nodes` controls."""
 
+    stack: List[Tuple[Any, int]] = [(root, 0)]
+    visited = 0
 
-def _extract_text_from_window(
+    while stack and visited < max_nodes:
+        control, depth = stack.pop()
+        visited += 1
+        yield control
+
+        if depth >= max_depth:
+            continue
+
+        try:
+            children = control.children()
+        except Exception:  # pylint: disable=broad-except
+            continue
+
+        # push in reverse order to pop the children in their original order
+        stack.extend((child, depth + 1) for child in reversed(children))
+
+
+def _collect_texts(
+    controls: Iterable[Any], kind: "Type[pywinauto.controls.uiawrapper.UIAWrapper]", stop_when: Callable[[str], bool] | None
+) -> List[str]:
+    texts: List[str] = []
+
+    for control in controls:
+        if not isinstance(control, kind):
+            continue
+
+        try:
+            texts.append(control.window_text() + "\n")
+        except Exception:  # pylint: disable=broad-except
+            continue
+
+        if stop_when is not None and stop_when(texts[-1]):
+            break
+
+    return texts
+
+
+def walk_window_texts(
     window: "pywinauto.application.WindowSpecification",
     kind: "Type[pywinauto.controls.uiawrapper.UIAWrapper]",
-) -> str:
-    text = ""
-    try:
-        # Get the text of the current window
-        if isinstance(window, kind):
-            text += window.window_text() + "\n"
-    except Exception:  # pylint: disable=broad-except
-        pass
+    max_depth: int = UIA_WALK_MAX_DEPTH,
+    max_nodes: int = UIA_WALK_MAX_NODES,
+    stop_when: Callable[[str], bool] | None = None,
+) -> List[str]:
+    """Walk the control tree of the window in document order and collect the texts
+    of the controls of given kind.
+
+    The walk is iterative, it does not visit the controls deeper than `max_depth`,
+    visits at most `max_nodes` controls and stops as soon as `stop_when` returns True.
+    `stop_when` is called with the text of each collected control in order, it should keep its own state.
+    """
+
+    return _collect_texts(walk_controls(window, max_depth, max_nodes), kind, stop_when)
+
+
+class _ControlTree:
+    """The controls of a window in document order. The tree is walked lazily and only once,
+    the next reader continues from where the previous one is stopped."""
+
+    def __init__(self, root: Any) -> None:
+        self._created_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._controls: List[Any] = []
+        self._walker = walk_controls(root)
 
-    # Recursively search for child windows
-    for child in window.children():
-        text += _extract_text_from_window(child, kind=kind)
+    def is_expired(self, ttl_secs: float) -> bool:
+        """return whether the tree is older than the given time to live"""
+        return time.monotonic() - self._created_at > ttl_secs
 
-    return text
+    def __iter__(self) -> Iterator[Any]:
+        index = 0
+        while True:
+            with self._lock:
+                if index == len(self._controls):
+                    control = next(self._walker, None)
+                    if control is None:
+                        return
+                    self._controls.append(control)
+                control = self._controls[index]
 
+            index += 1
+            yield control
 
-def extract_text_from_window(window_or_id: Win32Window | int | str) -> str:
-    """recursively search for child windows and extract text"""
+
+class UIASession:
+    """One UI Automation session for the whole process.
+
+    - the desktop is created once, the windows and their resolved controls are cached per hwnd.
+    - the controls are resolved once and their wrapper classes are kept, only the texts are read
+      again. So the text extraction and the verification on the same dialog share one tree.
+    - the entries are invalidated when the window is destroyed, after a while,
+      or when there are too many windows, the least recently used one is dropped.
+    """
+
+    _shared: ClassVar["UIASession | None"] = None
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, ttl_secs: float = UIA_CACHE_TTL_SECS, max_windows: int = UIA_CACHE_MAX_WINDOWS) -> None:
+        self._ttl_secs = ttl_secs
+        self._max_windows = max_windows
+
+        self._lock = threading.Lock()
+        self._desktop: "pywinauto.Desktop | None" = None
+        self._windows: Dict[int, "pywinauto.application.WindowSpecification"] = {}
+        self._trees: OrderedDict[int, _ControlTree] = OrderedDict()
+        self._statistics = CacheStatistics()
+
+    @classmethod
+    def shared(cls) -> "UIASession":
+        """return the session shared by the whole process"""
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def window(self, window_hwnd: int) -> "pywinauto.application.WindowSpecification":
+        """return the specification of the window"""
+
+        with self._lock:
+            if self._desktop is None:
+                self._desktop = _get_pywinauto().Desktop(backend="uia")
+
+            if (window := self._windows.get(window_hwnd)) is None:
+                window = self._windows[window_hwnd] = self._desktop.window(handle=window_hwnd)
+            return window
+
+    def _get_tree(self, window_hwnd: int) -> _ControlTree:
+        with self._lock:
+            tree = self._trees.get(window_hwnd)
+            if tree is not None and tree.is_expired(self._ttl_secs):
+                del self._trees[window_hwnd]
+                self._statistics.expirations += 1
+                tree = None
+
+            if tree is not None:
+                self._trees.move_to_end(window_hwnd)
+                self._statistics.hits += 1
+                return tree
+
+            self._statistics.misses += 1
+
+        # resolve the window once, the specification searches for it on each access
+        tree = _ControlTree(self.window(window_hwnd).wrapper_object())
+
+        with self._lock:
+            self._trees[window_hwnd] = tree
+            while len(self._trees) > self._max_windows:
+                evicted, _ = self._trees.popitem(last=False)
+                self._windows.pop(evicted, None)
+                self._statistics.evictions += 1
+
+        return tree
+
+    def texts(
+        self, window_hwnd: int, kind: "Type[pywinauto.controls.uiawrapper.UIAWrapper]", stop_when: Callable[[str], bool] | None = None
+    ) -> List[str]:
+        """return the texts of the controls of given kind in document order, stop as soon as `stop_when`
+        returns True for the text of a control"""
+        return _collect_texts(self._get_tree(window_hwnd), kind, stop_when)
+
+    def invalidate(self, window_hwnd: int) -> None:
+        """forget the window and its controls, should be called when the window is destroyed"""
+
+        with self._lock:
+            self._windows.pop(window_hwnd, None)
+            self._trees.pop(window_hwnd, None)
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """return a copy of the statistics of the control trees"""
+
+        with self._lock:
+            return dataclasses.replace(self._statistics, size=len(self._trees))
+
+
+def get_window(window_or_id: Win32Window | int | str) -> "pywinauto.application.WindowSpecification":
+    """return the window based on given ID or window object"""
+    return UIASession.shared().window(_to_hwnd(window_or_id))
+
+
+def extract_text_from_window(window_or_id: Win32Window | int | str, stop_when: Callable[[str], bool] | None = None) -> str:
+    """search for child windows and extract text, stop as soon as `stop_when` returns True for the text of a control"""
     pywinauto = _get_pywinauto()
 
-    window = get_window(window_or_id)
-    return _extract_text_from_window(window, kind=pywinauto.controls.uia_controls.StaticWrapper)
+    texts = UIASession.shared().texts(_to_hwnd(window_or_id), pywinauto.controls.uia_controls.StaticWrapper, stop_when=stop_when)
+    return "".join(texts)
 
 
 def get_password_length(window_or_id: Win32Window) -> int:
     """return the password length based on given window"""
     pywinauto = _get_pywinauto()
 
-    window = get_window(window_or_id)
-
-    chars = _extract_text_from_window(window, kind=pywinauto.controls.uia_controls.EditWrapper)
+    chars = "".join(UIASession.shared().texts(_to_hwnd(window_or_id), pywinauto.controls.uia_controls.EditWrapper))
     return len(chars.strip())
 
 
+def get_focused_edit_length(window_or_id: Win32Window | int) -> int | None:
+    """return the length of the text in the focused edit control of the window. Only the focused
+    control is read, None is returned if the window is not in the foreground or the focus is not on an edit control."""
+    pywinauto = _get_pywinauto()
+
+    window_hwnd = _to_hwnd(window_or_id)
+    if ctypes.windll.user32.GetForegroundWindow() != window_hwnd:
+        return None
+
+    try:
+        element = pywinauto.uia_defines.IUIA().iuia.GetFocusedElement()
+        control = pywinauto.controls.uiawrapper.UIAWrapper(pywinauto.uia_element_info.UIAElementInfo(element))
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+    if not isinstance(control, pywinauto.controls.uia_controls.EditWrapper):
+        return None
+
+    return len(control.window_text().strip())
+
+
 def complete_update() -> None:
     """Complete the update process"""
 
@@ -0,0 +1,78 @@
+"""Decide the auto key triggers of the window data while the text of a window is being collected"""
+
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    # not imported at runtime, the scanning does not need the Windows only dependencies of the config
+    from config.config import WindowData
+
+
+def is_triggered(window_data: "WindowData", text: str) -> bool:
+    """return whether the auto key trigger of the window data matches the text"""
+
+    return bool(
+        (window_data.auto_key_trigger_pattern is not None and window_data.auto_key_trigger_pattern.match(text))
+        or (window_data.auto_key_trigger and window_data.auto_key_trigger in text)
+    )
+
+
+def _is_end_anchored(window_data: "WindowData") -> bool:
+    # an escaped dollar sign is taken as an anchor as well, it only delays the decision
+    return "$" in window_data.auto_key_trigger or r"\Z" in window_data.auto_key_trigger
+
+
+class TriggerScanner:
+    """Decides the auto key triggers while the text of a window is fed piece by piece. The triggers are decided
+    once all window data with a trigger are matched, or more than one of them is matched, which is ambiguous anyway.
+
+    - the plain triggers are searched only in the new text, together with the end of the previous text
+      that a trigger can start in.
+    - the patterns are matched from the start of the text, so they need the whole text. To keep the
+      total cost linear, they are checked again only once the text is doubled since the last check.
+    - the end anchored patterns may match a part of the text but not the whole of it, so their matches
+      are not final. They are left to the check of the whole text and the walk is not stopped for them.
+    """
+
+    def __init__(self, windows: Sequence["WindowData"]) -> None:
+        self._pending = [window_data for window_data in windows if window_data.auto_key_trigger]
+        self._matched_count = 0
+
+        self._texts: list[str] = []
+        self._length = 0
+        self._checked_length = 0
+        # a trigger may start in the previous text and end in the new one
+        self._tail = ""
+        self._tail_size = max((len(window_data.auto_key_trigger) for window_data in self._pending), default=1) - 1
+
+    @property
+    def is_decided(self) -> bool:
+        """return whether more text cannot change the decision"""
+        return self._matched_count > 1 or (self._matched_count == 1 and not self._pending)
+
+    def feed(self, text: str) -> bool:
+        """add the next piece of the text, return whether the triggers are decided"""
+
+        self._texts.append(text)
+        self._length += len(text)
+        searched = self._tail + text
+
+        whole_text: str | None = None
+        if self._length >= 2 * self._checked_length:
+            whole_text = "".join(self._texts)
+            self._checked_length = self._length
+
+        pending: list["WindowData"] = []
+        for window_data in self._pending:
+            if window_data.auto_key_trigger in searched or (
+                whole_text is not None
+                and window_data.auto_key_trigger_pattern is not None
+                and not _is_end_anchored(window_data)
+                and window_data.auto_key_trigger_pattern.match(whole_text)
+            ):
+                self._matched_count += 1
+            else:
+                pending.append(window_data)
+        self._pending = pending
+
+        self._tail = searched[-self._tail_size :] if self._tail_size else ""
+        return self.is_decided
@@ -0,0 +1,148 @@
+"""Dispatch the matched windows to a bounded pool of workers"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
+
+from logger import logger
+
+if TYPE_CHECKING:
+    # not imported at runtime, the dispatching does not need the Windows only dependencies of the config
+    from config.config import WindowData
+
+WindowHandler = Callable[[int, list["WindowData"]], None]
+
+
+@dataclass
+class DispatcherStatistics:  # pylint: disable=too-many-instance-attributes
+    """load and latency statistics of a dispatcher, a plain record of the counters"""
+
+    in_flight: int = 0
+    queue_depth: int = 0
+    dispatched: int = 0
+    completed: int = 0
+    deduplicated: int = 0
+    dropped: int = 0
+    total_latency_secs: float = 0.0
+    max_latency_secs: float = 0.0
+
+    @property
+    def average_latency_secs(self) -> float:
+        """return the average time from dispatching a window until it is handled"""
+        return self.total_latency_secs / self.completed if self.completed else 0.0
+
+
+@dataclass
+class _DispatchQueues:
+    """the windows that are being handled or waiting for a worker, guarded by the lock of the dispatcher"""
+
+    # hwnd -> dispatched at
+    in_flight: dict[int, float] = field(default_factory=dict)
+    # hwnd -> windows, the in flight windows that are dispatched again
+    rerun: dict[int, list["WindowData"]] = field(default_factory=dict)
+    # hwnd -> (dispatched at, windows)
+    waiting: OrderedDict[int, tuple[float, list["WindowData"]]] = field(default_factory=OrderedDict)
+
+
+class WindowDispatcher:
+    """Runs the handler for the windows on a bounded pool of workers.
+
+    - a window is handled by one worker at a time. If the same window is dispatched while it is
+      in flight, it is handled once more right after the running one, with the latest data.
+    - the windows wait in a bounded queue while all workers are busy, a waiting window is updated
+      instead of queued twice. The oldest one is dropped when the queue is full.
+    - the threads are created once by the pool, not per window.
+    """
+
+    def __init__(self, handler: WindowHandler, max_workers: int = 4, max_waiting: int = 32) -> None:
+        self._handler = handler
+        self._max_workers = max_workers
+        self._max_waiting = max_waiting
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="window-dispatcher")
+        self._lock = threading.Lock()
+        self._queues = _DispatchQueues()
+        self._statistics = DispatcherStatistics()
+
+    def dispatch(self, window_hwnd: int, windows: list["WindowData"]) -> bool:
+        """handle the window on a worker, return False if it is already being handled"""
+
+        now = time.perf_counter()
+
+        with self._lock:
+            if window_hwnd in self._queues.in_flight:
+                self._queues.rerun[window_hwnd] = windows
+                self._statistics.deduplicated += 1
+                return False
+
+            self._statistics.dispatched += 1
+
+            if window_hwnd in self._queues.waiting:
+                dispatched_at, _ = self._queues.waiting[window_hwnd]
+                self._queues.waiting[window_hwnd] = (dispatched_at, windows)
+                self._statistics.deduplicated += 1
+                return True
+
+            if len(self._queues.in_flight) >= self._max_workers:
+                if len(self._queues.waiting) >= self._max_waiting:
+                    dropped_hwnd, _ = self._queues.waiting.popitem(last=False)
+                    self._statistics.dropped += 1
+                    logger.warning("All workers are busy, the window %s is dropped.", dropped_hwnd)
+                self._queues.waiting[window_hwnd] = (now, windows)
+                return True
+
+            self._queues.in_flight[window_hwnd] = now
+
+        self._executor.submit(self._run, window_hwnd, windows)
+        return True
+
+    def _run(self, window_hwnd: int, windows: list["WindowData"]) -> None:
+        while True:
+            try:
+                self._handler(window_hwnd, windows)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Cannot handle the window %s", window_hwnd)
+
+            with self._lock:
+                now = time.perf_counter()
+                latency = now - self._queues.in_flight.pop(window_hwnd)
+                self._statistics.completed += 1
+                self._statistics.total_latency_secs += latency
+                self._statistics.max_latency_secs = max(self._statistics.max_latency_secs, latency)
+
+                if window_hwnd in self._queues.rerun:
+                    windows = self._queues.rerun.pop(window_hwnd)
+                    self._queues.in_flight[window_hwnd] = now
+                    continue
+
+                # continue with a waiting window on the same worker
+                if not self._queues.waiting:
+                    return
+                window_hwnd, (dispatched_at, windows) = self._queues.waiting.popitem(last=False)
+                self._queues.in_flight[window_hwnd] = dispatched_at
+
+    def cancel_waiting(self) -> None:
+        """drop the windows that are not started yet, the running handlers are not interrupted"""
+
+        with self._lock:
+            self._queues.waiting.clear()
+            self._queues.rerun.clear()
+
+    @property
+    def statistics(self) -> DispatcherStatistics:
+        """return a copy of the statistics"""
+
+        with self._lock:
+            return DispatcherStatistics(
+                in_flight=len(self._queues.in_flight),
+                queue_depth=len(self._queues.waiting),
+                dispatched=self._statistics.dispatched,
+                completed=self._statistics.completed,
+                deduplicated=self._statistics.deduplicated,
+                dropped=self._statistics.dropped,
+                total_latency_secs=self._statistics.total_latency_secs,
+                max_latency_secs=self._statistics.max_latency_secs,
+            )
@@ -0,0 +1,209 @@
+"""A shared snapshot of the top-level windows. The windows are enumerated at most once
+per tick, no matter how many consumers ask for them."""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import ClassVar
+
+import pyautogui
+from pygetwindow import Win32Window  # type: ignore[import-untyped]
+
+from common.adaptive_scheduler import AdaptiveScheduler
+from common.background_thread import BackgroundThread
+from common.tools import get_window_hwnd
+from handlers.window_events.base import WindowEvent, WindowEventCallback, WindowEventType
+from logger import logger
+
+DEFAULT_TICK_SECS = 1.0
+
+
+def take_snapshot() -> dict[int, str]:
+    """return the titles of the all visible windows keyed by their hwnd"""
+
+    try:
+        windows: list[Win32Window] = pyautogui.getAllWindows()  # type: ignore[attr-defined]
+    except OSError:
+        return {}
+
+    return {get_window_hwnd(window): window.title for window in windows}
+
+
+def diff_snapshots(old: dict[int, str], new: dict[int, str]) -> list[WindowEvent]:
+    """compare two snapshots and return the events that converts the old one to the new one"""
+
+    events = [WindowEvent(WindowEventType.DESTROYED, hwnd, title) for hwnd, title in old.items() if hwnd not in new]
+
+    for hwnd, title in new.items():
+        try:
+            old_title = old[hwnd]
+        except KeyError:
+            events.append(WindowEvent(WindowEventType.CREATED, hwnd, title))
+            continue
+
+        if old_title != title:
+            events.append(WindowEvent(WindowEventType.TITLE_CHANGED, hwnd, title))
+
+    return events
+
+
+@dataclass
+class _Snapshot:
+    """the titles of the open windows keyed by their hwnd and when they are enumerated"""
+
+    windows: dict[int, str] = field(default_factory=dict)
+    refreshed_at: float | None = None
+    enumerations: int = 0
+
+
+class WindowRegistry:
+    """Keeps the titles of the open windows keyed by their hwnd and publishes the changes.
+
+    - the snapshot is refreshed when it is older than the tick, concurrent callers share the same enumeration.
+    - it can be ticked by its own thread, then the changes are published to the subscribers periodically.
+    - an event driven source can apply its events, so the snapshot is kept up to date without enumerating.
+    """
+
+    _shared: ClassVar["WindowRegistry | None"] = None
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, tick_secs: float = DEFAULT_TICK_SECS) -> None:
+        self._tick_secs = tick_secs
+
+        self._lock = threading.Lock()
+        # serializes the enumerations, the waiting callers use the result of the running one
+        self._refresh_lock = threading.Lock()
+        self._snapshot = _Snapshot()
+
+        self._subscribers: list[WindowEventCallback] = []
+        self._thread = BackgroundThread()
+
+    @classmethod
+    def shared(cls) -> "WindowRegistry":
+        """return the registry shared by the whole application"""
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def enumerations(self) -> int:
+        """return how many times the windows are enumerated"""
+        return self._snapshot.enumerations
+
+    def refresh(self, max_age_secs: float = 0) -> list[WindowEvent]:
+        """enumerate the windows if the snapshot is older than the given age, publish and return the changes"""
+
+        requested_at = time.monotonic()
+        with self._refresh_lock:
+            refreshed_at = self._snapshot.refreshed_at
+            if refreshed_at is not None and refreshed_at >= requested_at - max_age_secs:
+                return []  # refreshed in the meantime or still fresh
+
+            new_windows = take_snapshot()
+            self._snapshot.enumerations += 1
+
+            with self._lock:
+                events = diff_snapshots(self._snapshot.windows, new_windows)
+                self._snapshot.windows = new_windows
+                self._snapshot.refreshed_at = time.monotonic()
+
+        self._publish(events)
+        return events
+
+    def windows(self) -> dict[int, str]:
+        """return the titles of the open windows keyed by their hwnd, the snapshot is at most a tick old"""
+
+        self.refresh(self._tick_secs)
+        with self._lock:
+            return dict(self._snapshot.windows)
+
+    def get_title(self, window_hwnd: int) -> str | None:
+        """return the title of the window, None if it is not open"""
+
+        self.refresh(self._tick_secs)
+        with self._lock:
+            return self._snapshot.windows.get(window_hwnd)
+
+    def is_open(self, window_hwnd: int) -> bool:
+        """return whether the window is open"""
+        return self.get_title(window_hwnd) is not None
+
+    def apply(self, event: WindowEvent) -> None:
+        """update the snapshot by the given event and publish it"""
+
+        with self._lock:
+            if event.event_type is WindowEventType.DESTROYED:
+                self._snapshot.windows.pop(event.hwnd, None)
+            else:
+                self._snapshot.windows[event.hwnd] = event.title
+
+        self._publish([event])
+
+    def subscribe(self, callback: WindowEventCallback, replay: bool = False) -> None:
+        """publish the changes to the callback. If replay is set, the open windows
+        are published as created, as if they are opened after subscribing."""
+
+        if replay:
+            self.refresh(self._tick_secs)  # before subscribing, not to publish the same windows twice
+
+        with self._lock:
+            self._subscribers.append(callback)
+            windows = dict(self._snapshot.windows) if replay else {}
+
+        for window_hwnd, title in windows.items():
+            self._call(callback, WindowEvent(WindowEventType.CREATED, window_hwnd, title))
+
+    def unsubscribe(self, callback: WindowEventCallback) -> None:
+        """stop publishing the changes to the callback"""
+
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    @staticmethod
+    def _call(callback: WindowEventCallback, event: WindowEvent) -> None:
+        try:
+            callback(event)
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Window event callback failed for %s", event)
+
+    def _publish(self, events: list[WindowEvent]) -> None:
+        if not events:
+            return
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for event in events:
+            for callback in subscribers:
+                self._call(callback, event)
+
+    def start(self, scheduler: AdaptiveScheduler | None = None) -> None:
+        """refresh the snapshot in the background, on every tick or on the intervals chosen by the scheduler"""
+
+        if self._thread.is_running:
+            return
+
+        self._thread.start(self._tick, scheduler)
+
+    def stop(self) -> None:
+        """stop refreshing in the background"""
+
+        self._thread.stop()
+
+    def _tick(self, scheduler: AdaptiveScheduler | None) -> None:
+        interval_secs = self._tick_secs
+        while not self._thread.stop_event.is_set():
+            # a little margin to not skip the tick due to the timer resolution
+            events = self.refresh(interval_secs / 2)
+
+            if scheduler is not None:
+                if any(event.event_type is WindowEventType.CREATED for event in events):
+                    scheduler.burst()
+                elif events:
+                    scheduler.notify_activity()
+                interval_secs = scheduler.next_interval()
+
+            self._thread.stop_event.wait(interval_secs)
@@ -0,0 +1,104 @@
+"""A bounded cache for the texts extracted from the windows"""
+
+import dataclasses
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from settings import WINDOW_TEXT_CACHE_MAX_SIZE, WINDOW_TEXT_CACHE_TTL_SECS
+
+WindowTextKey = tuple[int, str]
+
+
+@dataclass
+class CacheStatistics:
+    """hit/miss statistics of a cache"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """return the ratio of the hits to all lookups"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class WindowTextCache:
+    """LRU cache for the texts extracted from the windows with a time to live.
+
+    The entries are keyed by the window handle and the window title, so a reused
+    handle with a different title does not return the text of the old window.
+    """
+
+    def __init__(self, max_size: int = WINDOW_TEXT_CACHE_MAX_SIZE, ttl_secs: float = WINDOW_TEXT_CACHE_TTL_SECS) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self._max_size = max_size
+        self._ttl_secs = ttl_secs
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[WindowTextKey, tuple[float, str]] = OrderedDict()
+        self._statistics = CacheStatistics()
+
+    def get(self, window_hwnd: int, title: str, loader: Callable[[int], str]) -> str:
+        """return the cached text of the window, call the loader to extract it if it is not cached"""
+
+        key = (window_hwnd, title)
+        now = time.monotonic()
+
+        with self._lock:
+            try:
+                created_at, text = self._entries[key]
+            except KeyError:
+                pass
+            else:
+                if now - created_at < self._ttl_secs:
+                    self._entries.move_to_end(key)
+                    self._statistics.hits += 1
+                    return text
+
+                del self._entries[key]
+                self._statistics.expirations += 1
+
+            self._statistics.misses += 1
+
+        # do not hold the lock while extracting, it may take long
+        text = loader(window_hwnd)
+
+        with self._lock:
+            self._entries[key] = (now, text)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._statistics.evictions += 1
+
+        return text
+
+    def evict(self, window_hwnd: int) -> None:
+        """remove all entries of the given window, should be called when the window is closed"""
+
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == window_hwnd]:
+                del self._entries[key]
+                self._statistics.evictions += 1
+
+    def clear(self) -> None:
+        """remove all entries"""
+
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        """return a copy of the statistics"""
+
+        with self._lock:
+            return dataclasses.replace(self._statistics, size=len(self._entries))
@@ -1,97 +1,280 @@
-"""This module provides a simple way to share data between different python processes using sockets"""
+"""This module provides a simple way to share data between different python processes using sockets.
 
+The messages are framed, so a message of any size arrives as a whole and the messages that are
+sent one after another are not merged:
+
+    frame: length of the payload, message type, length of the channel name, channel name, payload
+
+The frames are dispatched to the callbacks of their channel, many channels share the same connection.
+"""
+
+import asyncio
+import select
 import socket
+import struct
 import threading
+from dataclasses import dataclass
 from typing import Callable
 
 from common.tools import is_debug_enabled
+from logger import logger
 
 HOST = "127.0.0.1"
 
 # use a different port to not have conflicts with the main application
 KEY_TRACKER_PORT = 27845 + int(is_debug_enabled())
 
+DEFAULT_CHANNEL = "default"
+# the largest payload that is accepted, a bigger frame closes the connection
+MAX_PAYLOAD_SIZE = 16 * 1024 * 1024
+CONNECT_TIMEOUT_SECS = 1.0
+# the time to wait for the connection handlers to finish on shutdown
+SHUTDOWN_TIMEOUT_SECS = 1.0
+
+# length of the payload, message type, length of the channel name
+_FRAME_HEADER = struct.Struct(">IBB")
+
+
+@dataclass(frozen=True)
+class Frame:
+    """A message on a channel"""
+
+    channel: str
+    message_type: int
+    payload: bytes
+
+
+FrameCallback = Callable[[Frame], None]
+
+
+def encode_frame(frame: Frame) -> bytes:
+    """return the bytes to send for the given frame"""
+
+    channel = frame.channel.encode()
+    if len(channel) > 0xFF:
+        raise ValueError(f"The channel name is too long: {frame.channel}")
+    if len(frame.payload) > MAX_PAYLOAD_SIZE:
+        raise ValueError(f"The payload is too large: {len(frame.payload)} bytes")
+
+    return _FRAME_HEADER.pack(len(frame.payload), frame.message_type, len(channel)) + channel + frame.payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Frame | None:
+    """read the next frame, None if the connection is closed. Raises ValueError if the frame is malformed"""
+
+    try:
+        header = await reader.readexactly(_FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise ValueError("The connection is closed in the middle of a frame.") from exc
+        return None
+
+    payload_size, message_type, channel_size = _FRAME_HEADER.unpack(header)
+    if payload_size > MAX_PAYLOAD_SIZE:
+        raise ValueError(f"The payload is too large: {payload_size} bytes")
+
+    try:
+        channel = await reader.readexactly(channel_size)
+        payload = await reader.readexactly(payload_size)
+    except asyncio.IncompleteReadError as exc:
+        raise ValueError("The connection is closed in the middle of a frame.") from exc
+
+    return Frame(channel.decode(), message_type, payload)
+
+
+class InformerClient:
+    """A connection to an informer that is kept open and reused for the next messages.
+    A broken connection is noticed before sending and opened again."""
+
+    def __init__(self, port: int) -> None:
+        self._port = port
+        self._lock = threading.Lock()
+        self._socket: socket.socket | None = None
+
+    def _is_alive(self, sock: socket.socket) -> bool:
+        # the server never sends anything, so a readable socket is either closed or reset
+        readable, _, _ = select.select([sock], [], [], 0)
+        if not readable:
+            return True
+
+        try:
+            return bool(sock.recv(1, socket.MSG_PEEK))
+        except OSError:
+            return False
+
+    def _connect(self) -> socket.socket:
+        if self._socket is not None and self._is_alive(self._socket):
+            return self._socket
+
+        self.close()
+        sock = socket.create_connection((HOST, self._port), timeout=CONNECT_TIMEOUT_SECS)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket = sock
+        return sock
+
+    def send(self, frame: Frame) -> bool:
+        """send the frame, return False if the informer is not reachable"""
+
+        data = encode_frame(frame)
+        with self._lock:
+            # the second attempt is with a new connection, i.e. the informer is restarted
+            for _ in range(2):
+                try:
+                    self._connect().sendall(data)
+                    return True
+                except (ConnectionError, socket.timeout):
+                    self.close()
+                except OSError as error:
+                    logger.debug("Cannot send the data to the port %s: %s", self._port, error)
+                    self.close()
+                    return False
+
+        return False
+
+    def close(self) -> None:
+        """close the connection, it is opened again by the next message"""
+
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
 
 class Informer:
     """A class to inform the other processes about the changes"""
 
+    _clients: dict[int, InformerClient] = {}
+    _clients_lock = threading.Lock()
+
     def __init__(self, port: int = 0) -> None:
-        self._is_active = False
         self._port = port
-        self._callbacks: dict[str, Callable[[bytes], None]] = {}
+        # channel -> name -> callback
+        self._callbacks: dict[str, dict[str, FrameCallback]] = {}
+
+        # the handlers of the open connections, closed on shutdown
+        self._connections: dict[asyncio.Task[None], asyncio.StreamWriter] = {}
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._serve_task: asyncio.Task[None] | None = None
+        self._thread: threading.Thread | None = None
+        self._serving = threading.Event()
 
     @property
     def port(self) -> int:
         """Get the port number"""
         return self._port
 
-    @classmethod
-    def send_data(cls, data: bytes, port: int) -> bool:
-        """Send the given data to the server"""
-
-        try:
-            client_socket = socket.socket()
-            client_socket.connect((HOST, port))
+    @property
+    def connection_count(self) -> int:
+        """Get the number of the open client connections"""
+        return len(self._connections)
 
-            client_socket.send(data)
+    @classmethod
+    def get_client(cls, port: int) -> InformerClient:
+        """return the connection to the given port that is shared by the process"""
 
-            client_socket.close()
-        except (ConnectionRefusedError, socket.timeout):
-            return False
+        with cls._clients_lock:
+            if (client := cls._clients.get(port)) is None:
+                client = cls._clients[port] = InformerClient(port)
+            return client
 
-        return True
+    @classmethod
+    def send_data(cls, data: bytes, port: int, channel: str = DEFAULT_CHANNEL, message_type: int = 0) -> bool:
+        """Send the given data to the server, over the connection that is kept open"""
+        return cls.get_client(port).send(Frame(channel, message_type, data))
 
-    def add_callback(self, callback: Callable[[bytes], None], name: str | None = None) -> None:
-        """Add a callback to the list of callbacks"""
+    def add_callback(self, callback: FrameCallback, name: str | None = None, channel: str = DEFAULT_CHANNEL) -> None:
+        """Add a callback to the list of callbacks of the channel"""
 
-        self._callbacks[name or str(callback)] = callback
+        self._callbacks.setdefault(channel, {})[name or str(callback)] = callback
 
-    def remove_callback(self, name_or_callback: str | Callable[[bytes], None]) -> None:
-        """Remove a callback from the list of callbacks"""
+    def remove_callback(self, name_or_callback: str | FrameCallback, channel: str = DEFAULT_CHANNEL) -> None:
+        """Remove a callback from the list of callbacks of the channel"""
 
-        self._callbacks.pop(str(name_or_callback), None)
+        self._callbacks.get(channel, {}).pop(str(name_or_callback), None)
 
     def start_server(self) -> None:
-        """start the server and listen for the incoming data. Call the callbacks with the received data"""
-
-        self._is_active = True
-        threading.Thread(target=self._start_server_in_bg, daemon=True).start()
+        """start the server in the background and listen for the incoming data. Call the callbacks with the received data.
+        All connections are served by a single thread."""
 
-    def shutdown(self) -> None:
-        """Shutdown the server"""
+        self._serving.clear()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve_in_bg(),), daemon=True)
+        self._thread.start()
+        self._serving.wait()
 
-        self._is_active = False
+    async def _serve_in_bg(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._serve_task = asyncio.current_task()
+        try:
+            await self.serve()
+        except asyncio.CancelledError:
+            pass
+        except OSError as error:
+            logger.error("Cannot start the informer on the port %s: %s", self._port, error)
+        finally:
+            self._loop = self._serve_task = None
+            self._serving.set()  # do not block the starter if the server cannot be started
 
-    def _start_server_in_bg(self) -> None:
-        server_socket = socket.socket()
-        server_socket.bind((HOST, self._port))
-        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server_socket.listen(10)
+    async def serve(self) -> None:
+        """serve in the running event loop until the task is cancelled, the connections do not need threads.
+        On cancel, the open connections are closed and their handlers are waited."""
 
+        server = await asyncio.start_server(self._handle_stream, HOST, self._port)
         if self._port == 0:
-            self._port = server_socket.getsockname()[1]
+            self._port = server.sockets[0].getsockname()[1]
 
-        while self._is_active:
-            conn, _ = server_socket.accept()
+        self._serving.set()
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                server.close()  # stop accepting before the connections are closed
+                await self._close_connections()
 
-            client_thread = threading.Thread(target=self._handle_client, args=(conn,))
-            client_thread.start()
+    async def _close_connections(self) -> None:
+        for writer in self._connections.values():
+            # the handler reads the end of the stream and returns
+            writer.close()
 
-        server_socket.close()
+        if handlers := list(self._connections):
+            _, pending = await asyncio.wait(handlers, timeout=SHUTDOWN_TIMEOUT_SECS)
+            for handler in pending:
+                handler.cancel()
 
-    def _handle_client(self, conn: socket.socket) -> None:
-        """Handle a single client connection"""
+    def shutdown(self) -> None:
+        """Shutdown the server that is started in the background, the open connections are closed.
+        Returns once the server thread is finished, can be called more than once."""
 
-        while self._is_active:
+        loop, serve_task = self._loop, self._serve_task
+        if loop is not None and serve_task is not None:
             try:
-                data = conn.recv(1024)
-            except (ConnectionResetError, socket.timeout):
-                break
+                loop.call_soon_threadsafe(serve_task.cancel)
+            except RuntimeError:
+                pass  # the loop is already closed
 
-            if not data:
-                continue
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
 
-            for callback in list(self._callbacks.values()):
-                callback(data)
+    def _dispatch(self, frame: Frame) -> None:
+        for callback in list(self._callbacks.get(frame.channel, {}).values()):
+            try:
+                callback(frame)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Informer callback failed for the channel %s", frame.channel)
+
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handle a single client connection until it is closed"""
 
-        conn.close()
+        handler = asyncio.current_task()
+        assert handler is not None
+        self._connections[handler] = writer
+        try:
+            while (frame := await read_frame(reader)) is not None:
+                self._dispatch(frame)
+        except ValueError as error:
+            logger.warning("Closing the connection: %s", error)
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # the server is shut down, the connection ends here anyway
+        finally:
+            self._connections.pop(handler, None)
+            writer.close()
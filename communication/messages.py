@@ -0,0 +1,61 @@
+"""Typed messages that are shared between the processes over the informer channels"""
+
+import enum
+import json
+from dataclasses import dataclass, field
+
+# the channels of the key tracker, each message type has its own channel
+MASTER_KEY_CHANNEL = "master-key"
+CONFIG_CHANNEL = "config"
+
+
+class MessageType(enum.IntEnum):
+    """Types of the messages, carried in the frame header"""
+
+    MASTER_KEY_CHANGED = 1
+    CONFIG_CHANGED = 2
+
+
+class EntryChangeKind(enum.Enum):
+    """How an entry in the config file is changed"""
+
+    ADDED = "added"
+    UPDATED = "updated"
+    REMOVED = "removed"
+
+
+@dataclass(frozen=True)
+class EntryChange:
+    """A change on a single entry in the config file"""
+
+    kind: EntryChangeKind
+    entry_id: str
+
+
+@dataclass
+class ConfigChangedMessage:
+    """The entries that are changed by a save. The digest is of the config file right after the save,
+    so the receiver can tell whether the file is changed again after that."""
+
+    changes: list[EntryChange] = field(default_factory=list)
+    digest: bytes = b""
+
+    def to_bytes(self) -> bytes:
+        """serialize the message"""
+
+        return json.dumps(
+            {"changes": [{"kind": change.kind.value, "id": change.entry_id} for change in self.changes], "digest": self.digest.hex()}
+        ).encode()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ConfigChangedMessage":
+        """deserialize the message, raise ValueError if it is malformed"""
+
+        try:
+            raw = json.loads(data)
+            return cls(
+                changes=[EntryChange(EntryChangeKind(change["kind"]), change["id"]) for change in raw["changes"]],
+                digest=bytes.fromhex(raw.get("digest", "")),
+            )
+        except (TypeError, KeyError) as exc:
+            raise ValueError("Malformed config changed message") from exc
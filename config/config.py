@@ -1,19 +1,27 @@
 """Parse the config file and get the pre-saved passwords"""
 
+import hmac
+import io
 import json
 import os
 import re
+import uuid
 from builtins import bytes
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Literal, TypedDict, overload
+from typing import Any, BinaryIO, Dict, Iterable, List, Literal, TypedDict, cast, overload
 
 import colorama
 from Crypto import Random
 from Crypto.Cipher import AES
-from Crypto.Hash import SHA256
 
+from common.atomic_file import atomic_write
+from common.config_watcher import get_digest
 from communication import data_sharing
+from communication.messages import CONFIG_CHANNEL, MASTER_KEY_CHANNEL, ConfigChangedMessage, EntryChange, EntryChangeKind, MessageType
+from config import container
+from config.kdf import DerivedKeyCache, KdfParameters, derive_key
+from config.store import CredentialStore, StoreEntry
 from settings import CONFIG_PATH, CREDENTIALS_FILE, DFT_ENCODING
 
 
@@ -26,6 +34,19 @@ class ConfigDict(TypedDict):
     auto_key_trigger: str
     group: str | None
     verify_sent: bool
+    id: str
+
+
+def new_entry_id() -> str:
+    """return a new unique id for a WindowData"""
+    return uuid.uuid4().hex
+
+
+def _normalize_entry_id(entry_id: str | None) -> str:
+    try:
+        return uuid.UUID(entry_id).hex
+    except (TypeError, ValueError):
+        return new_entry_id()
 
 
 # pylint: disable=too-many-instance-attributes
@@ -39,6 +60,7 @@ class WindowData:
     auto_key_trigger: str
     group: str | None = None
     verify_sent: bool = True
+    entry_id: str = field(default_factory=new_entry_id, compare=False)
 
     def __hash__(self) -> int:
         return hash((self.title, self.name, self.passkey, self.auto_key_trigger, self.group))
@@ -68,6 +90,7 @@ class WindowData:
             "auto_key_trigger": self.auto_key_trigger,
             "group": self.group,
             "verify_sent": self.verify_sent,
+            "id": self.entry_id,
         }
 
     @classmethod
@@ -81,6 +104,7 @@ class WindowData:
             auto_key_trigger=data.get("auto_key_trigger", ""),
             group=data["group"],
             verify_sent=data.get("verify_sent", True),
+            entry_id=_normalize_entry_id(data.get("id")),
         )
 
 
@@ -91,6 +115,7 @@ class SelectedWindowProperties:
     passkey: str
     send_enter: bool
     verify_sent: bool
+    entry_id: str = ""
 
 
 @dataclass
@@ -182,37 +207,235 @@ class ConfigManager:
     """Helps to load/save the configuration in a secure way."""
 
     def __init__(self, key: bytes) -> None:
-        self.__key = key
+        # the derived keys are cached, the key derivation is slow on purpose
+        self.__keys = DerivedKeyCache(key)
+
+        self._store = self._open_store(CREDENTIALS_FILE)
+        # the serialized entries as they are in the credentials file, None if they are unknown
+        self._saved_entries: dict[str, StoreEntry] | None = None
+        # the passkeys are not decrypted while loading, they are read on demand
+        self._lazy = False
+
+    def is_master_key(self, key: bytes) -> bool:
+        """return whether the given key is the master key of the manager"""
+        return hmac.compare_digest(self.__keys.master_key, key)
+
+    def _open_store(self, filename: str | Path) -> CredentialStore:
+        """return a store that encrypts its entries with the key derived by the parameters in its header"""
+
+        def _key() -> bytes:
+            return self._get_key(store.header)
+
+        def _encrypt(source: bytes) -> bytes:
+            if store.header.get("cipher") == container.CIPHER:
+                return container.seal(_key(), source)
+            return self.encrypt_with_key(_key(), source)
+
+        def _decrypt(source: bytes) -> bytes:
+            if store.header.get("cipher") == container.CIPHER:
+                return container.unseal(_key(), source)
+            return self.decrypt_with_key(_key(), source)
+
+        store = CredentialStore(filename, _encrypt, _decrypt)
+        return store
+
+    def _get_key(self, header: dict[str, Any]) -> bytes:
+        """return the key derived by the parameters in the given header"""
+        return self.__keys.get(KdfParameters.from_dict(header.get("kdf")))
+
+    def _derive_file_key(self, header: dict[str, Any]) -> bytes:
+        """return the key of an encrypted file, not cached since each file has its own salt"""
+        return derive_key(self.__keys.master_key, KdfParameters.from_dict(header.get("kdf")))
+
+    @staticmethod
+    def _new_store_header() -> dict[str, Any]:
+        return {"kdf": KdfParameters.new().to_dict(), "cipher": container.CIPHER}
+
+    @staticmethod
+    def _serialize_entries(cfg: Config) -> dict[str, StoreEntry]:
+        entries: dict[str, StoreEntry] = {}
+        for window in cfg.windows:
+            if window.entry_id in entries:
+                window.entry_id = new_entry_id()  # a copied entry, ids must be unique
+
+            metadata: dict[str, Any] = dict(window.to_dict())
+            # the id is kept with the passkey to detect reading the passkey of another entry
+            secret = {"id": window.entry_id, "passkey": metadata.pop("passkey")}
+            entries[window.entry_id] = (json.dumps(metadata).encode(DFT_ENCODING), json.dumps(secret).encode(DFT_ENCODING))
+
+        return entries
+
+    @staticmethod
+    def _load_store(store: CredentialStore, lazy: bool = False) -> tuple[Config, dict[str, StoreEntry] | None]:
+        store.load()
+
+        windows: list[WindowData] = []
+        entries: dict[str, StoreEntry] = {}
+        for entry_id, (metadata, secret) in store.read_all(secrets=not lazy).items():
+            data = json.loads(metadata)
+            # the passkey is kept in the secret, which is not read if lazy
+            data["passkey"] = "" if secret is None else json.loads(secret)["passkey"]
+            windows.append(WindowData.from_dict(data))
+            entries[entry_id] = (metadata, secret or b"")
+
+        # the saved entries are unknown without the secrets
+        if lazy:
+            return Config(windows), None
+        return Config(windows), entries
+
+    def load_config_file(self, filename: str | Path) -> Config:
+        """Load and decrypt the given config file, either a credential store or a fully encrypted file"""
+
+        if CredentialStore.is_store_file(filename):
+            return self._load_store(self._open_store(filename))[0]
+
+        return Config.from_json(self.decrypt_file(filename))
+
+    def get_config(self, lazy: bool = False) -> Config:
+        """Load and decrypt the passkey data in the config file. If lazy is set, the passkeys
+        are left encrypted in the file and must be read via `get_passkey` when needed."""
+
+        if not CredentialStore.is_store_file(CREDENTIALS_FILE):
+            # old format, it will be converted on the next save
+            self._saved_entries = None
+            self._lazy = False
+            return Config.from_json(self.decrypt_file(CREDENTIALS_FILE))
+
+        cfg, self._saved_entries = self._load_store(self._store, lazy)
+        self._lazy = lazy
+        return cfg
+
+    def get_passkey(self, window: WindowData) -> str:
+        """return the passkey of the given window data, decrypt it from the config file if it is loaded lazily.
+        Raises ValueError if the passkey cannot be read."""
+
+        if not self._lazy:
+            return window.passkey
+
+        try:
+            return self._read_passkey(window)
+        except (KeyError, ValueError):
+            pass
+
+        # the file might be rewritten after it is loaded, retry with the latest index
+        try:
+            self._store.load()
+            return self._read_passkey(window)
+        except (KeyError, OSError) as exc:
+            raise ValueError("The passkey cannot be read.") from exc
 
-    def get_config(self) -> Config:
-        """Load and decrypt the passkey data in the config file"""
+    def _read_passkey(self, window: WindowData) -> str:
+        data = json.loads(self._store.read_secret(window.entry_id))
+        if data["id"] != window.entry_id:
+            raise ValueError("The passkey does not belong to the entry.")
 
-        cfg_data = self.decrypt_file(CREDENTIALS_FILE)
-        return Config.from_json(cfg_data)
+        passkey: str = data["passkey"]
+        return passkey
 
     def save_config(self, cfg: Config) -> None:
-        """Save the passkey data in the config file encrypted"""
+        """Save the passkey data in the config file encrypted. Only the changed entries are written
+        if the config is loaded by this manager, otherwise all entries are rewritten."""
+
+        if self._lazy:
+            raise ValueError("A lazily loaded config cannot be saved, the passkeys are not loaded.")
 
         os.makedirs(CONFIG_PATH, exist_ok=True)
 
-        self.encrypt_file(CREDENTIALS_FILE, cfg.to_json(True))
+        entries = self._serialize_entries(cfg)
+
+        if self._saved_entries is None or not CredentialStore.is_store_file(CREDENTIALS_FILE):
+            self._store.rewrite(entries, self._new_store_header())
+        else:
+            changed = {entry_id: entry for entry_id, entry in entries.items() if self._saved_entries.get(entry_id) != entry}
+            deleted = [entry_id for entry_id in self._saved_entries if entry_id not in entries]
+            if changed or deleted:
+                self._store.append(changed, deleted)
+                self._publish_changes(changed, deleted)
+
+        self._saved_entries = entries
+
+    def _publish_changes(self, changed: Iterable[str], deleted: Iterable[str]) -> None:
+        """let the running application apply the changes without reloading the whole file"""
+
+        assert self._saved_entries is not None
+        changes = [
+            EntryChange(EntryChangeKind.UPDATED if entry_id in self._saved_entries else EntryChangeKind.ADDED, entry_id)
+            for entry_id in changed
+        ]
+        changes += [EntryChange(EntryChangeKind.REMOVED, entry_id) for entry_id in deleted]
+
+        digest = get_digest(CREDENTIALS_FILE)
+        message = ConfigChangedMessage(changes, digest or b"")
+        data_sharing.Informer.send_data(message.to_bytes(), data_sharing.KEY_TRACKER_PORT, CONFIG_CHANNEL, MessageType.CONFIG_CHANGED)
+
+    def get_windows(self, entry_ids: Iterable[str]) -> dict[str, WindowData]:
+        """Load only the given entries, their passkeys are left encrypted as in the lazy load.
+        The entries that are not in the config file anymore are not returned.
+        Raises ValueError if the entries cannot be read."""
+
+        if not CredentialStore.is_store_file(CREDENTIALS_FILE):
+            raise ValueError("The entries cannot be loaded one by one from the old format.")
+
+        self._store.load()
+        stored_ids = set(self._store.ids())
+
+        windows: dict[str, WindowData] = {}
+        for entry_id in entry_ids:
+            if entry_id not in stored_ids:
+                continue
+
+            try:
+                data = json.loads(self._store.read_metadata(entry_id))
+            except KeyError as exc:
+                raise ValueError("The entry cannot be read.") from exc
+            data.setdefault("passkey", "")
+            windows[entry_id] = WindowData.from_dict(data)
+
+        return windows
 
     def decrypt_file(self, filename: str | Path) -> bytes:
         """Open given file and decrypt it's content using the Master Key"""
 
+        target = io.BytesIO()
+        self.decrypt_file_to(filename, target)
+        return target.getvalue()
+
+    def decrypt_file_to(self, filename: str | Path, target: BinaryIO) -> None:
+        """Decrypt the given file chunk by chunk into the target. The files that are
+        encrypted before the chunked format are decrypted at once."""
+
         with open(filename, "rb") as fd:
-            return self.decrypt(fd.read())
+            if not container.is_container(fd.read(len(container.MAGIC))):
+                fd.seek(0)
+                target.write(self.decrypt(fd.read()))
+                return
 
-    def encrypt_file(self, filename: str | Path, data: bytes) -> None:
-        """Encrypt the given data using Master Key and write it to the given file"""
+            fd.seek(0)
+            for chunk in container.read_container(fd, self._derive_file_key):
+                target.write(chunk)
 
-        with open(filename, "wb") as fd:
-            fd.write(self.encrypt(data))
+    def encrypt_file(self, filename: str | Path, data: bytes | BinaryIO) -> None:
+        """Encrypt the given data or stream using Master Key and write it to the given file chunk by chunk"""
+
+        source = io.BytesIO(data) if isinstance(data, bytes) else data
+        header = {"kdf": KdfParameters.new().to_dict()}
+
+        # opened in the binary mode
+        with atomic_write(filename, "wb") as fd:
+            container.write_container(cast(BinaryIO, fd), source, self._derive_file_key(header), header)
 
     def encrypt(self, source: bytes) -> bytes:
         """Encrypt given source using Master Key"""
+        return self.encrypt_with_key(self.__keys.get(KdfParameters()), source)
+
+    def decrypt(self, source: bytes) -> bytes:
+        """Decrypt given source using Master Key"""
+        return self.decrypt_with_key(self.__keys.get(KdfParameters()), source)
+
+    @staticmethod
+    def encrypt_with_key(key: bytes, source: bytes) -> bytes:
+        """Encrypt given source using the derived key"""
 
-        key = SHA256.new(self.__key).digest()  # use SHA-256 over our key to get a proper-sized AES key
         iv = Random.new().read(AES.block_size)  # generate IV
         encryptor = AES.new(key, AES.MODE_CBC, iv)
         padding = AES.block_size - len(source) % AES.block_size  # calculate needed padding
@@ -221,10 +444,10 @@ class ConfigManager:
 
         return data
 
-    def decrypt(self, source: bytes) -> bytes:
-        """Decrypt given source using Master Key"""
+    @staticmethod
+    def decrypt_with_key(key: bytes, source: bytes) -> bytes:
+        """Decrypt given source using the derived key"""
 
-        key = SHA256.new(self.__key).digest()  # use SHA-256 over our key to get a proper-sized AES key
         iv = source[: AES.block_size]  # extract the IV from the beginning
         decryptor = AES.new(key, AES.MODE_CBC, iv)
         data = decryptor.decrypt(source[AES.block_size :])  # decrypt
@@ -237,10 +460,12 @@ class ConfigManager:
     def change_master_key(self, new_key: bytes, filename: str | Path = CREDENTIALS_FILE) -> bool:
         """Changes the master key with given key"""
 
-        result = data_sharing.Informer.send_data(new_key, data_sharing.KEY_TRACKER_PORT)
+        result = data_sharing.Informer.send_data(new_key, data_sharing.KEY_TRACKER_PORT, MASTER_KEY_CHANNEL, MessageType.MASTER_KEY_CHANGED)
 
-        file_content = self.decrypt_file(filename)
-        self.__key = new_key
-        self.encrypt_file(filename, file_content)
+        cfg = self.load_config_file(filename)
+        self.__keys = DerivedKeyCache(new_key)
+        # a new salt with the new key
+        self._open_store(filename).rewrite(self._serialize_entries(cfg), self._new_store_header())
+        self._saved_entries = None
 
         return result
@@ -0,0 +1,160 @@
+"""Authenticated encryption with AES-GCM.
+
+The files are written as a container of fixed size chunks, each chunk is encrypted and
+authenticated on its own. So a file is processed with a constant memory and a tampered
+or truncated file is rejected at the first bad chunk without decrypting the rest.
+
+    preamble: magic, version, length of the json header, json header
+    chunk   : final flag, length of the ciphertext, ciphertext, tag
+
+The nonce of a chunk is a random prefix from the header followed by the chunk number.
+The header and the final flag are authenticated with each chunk, so the header cannot
+be altered, the chunks cannot be reordered and the file cannot be truncated at a chunk boundary.
+"""
+
+import json
+import struct
+from typing import Any, BinaryIO, Callable, Iterator
+
+from Crypto import Random
+from Crypto.Cipher import AES
+
+MAGIC = b"SBGC"
+VERSION = 1
+CIPHER = "aes-256-gcm"
+
+CHUNK_SIZE = 64 * 1024
+NONCE_PREFIX_SIZE = 8
+NONCE_SIZE = 12
+TAG_SIZE = 16
+
+# magic, version, length of the json header
+_PREAMBLE = struct.Struct(">4sBI")
+# final flag, length of the ciphertext
+_CHUNK_HEADER = struct.Struct(">?I")
+_CHUNK_NUMBER = struct.Struct(">I")
+
+KeyProvider = Callable[[dict[str, Any]], bytes]
+
+
+def is_container(data: bytes) -> bool:
+    """return whether the given data starts like a container"""
+    return data[: len(MAGIC)] == MAGIC
+
+
+def seal(key: bytes, data: bytes, associated_data: bytes = b"") -> bytes:
+    """encrypt and authenticate the data, the nonce and the tag are stored with the ciphertext"""
+
+    nonce = Random.new().read(NONCE_SIZE)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(associated_data)
+    ciphertext, tag = cipher.encrypt_and_digest(data)
+    return nonce + ciphertext + tag
+
+
+def unseal(key: bytes, data: bytes, associated_data: bytes = b"") -> bytes:
+    """verify and decrypt the data that is encrypted by `seal`, raise ValueError if it is altered"""
+
+    if len(data) < NONCE_SIZE + TAG_SIZE:
+        raise ValueError("The encrypted data is too short.")
+
+    cipher = AES.new(key, AES.MODE_GCM, nonce=data[:NONCE_SIZE])
+    cipher.update(associated_data)
+    plaintext: bytes = cipher.decrypt_and_verify(data[NONCE_SIZE:-TAG_SIZE], data[-TAG_SIZE:])
+    return plaintext
+
+
+def _nonce(prefix: bytes, number: int) -> bytes:
+    return prefix + _CHUNK_NUMBER.pack(number)
+
+
+def _associated_data(raw_header: bytes, final: bool) -> bytes:
+    return raw_header + bytes([final])
+
+
+def write_container(target: BinaryIO, source: BinaryIO, key: bytes, header: dict[str, Any], chunk_size: int = CHUNK_SIZE) -> None:
+    """encrypt the source chunk by chunk and write it to the target. The header is stored unencrypted
+    but authenticated, it should hold what is needed to find the key again."""
+
+    nonce_prefix = Random.new().read(NONCE_PREFIX_SIZE)
+    raw_header = json.dumps({**header, "cipher": CIPHER, "chunk_size": chunk_size, "nonce_prefix": nonce_prefix.hex()}).encode()
+    target.write(_PREAMBLE.pack(MAGIC, VERSION, len(raw_header)) + raw_header)
+
+    def _write(number: int, chunk: bytes, final: bool) -> None:
+        if number >= 2 ** (8 * _CHUNK_NUMBER.size):
+            raise ValueError("Too many chunks to encrypt with the same nonce prefix.")
+
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(nonce_prefix, number))
+        cipher.update(_associated_data(raw_header, final))
+        ciphertext, tag = cipher.encrypt_and_digest(chunk)
+        target.write(_CHUNK_HEADER.pack(final, len(ciphertext)) + ciphertext + tag)
+
+    # hold one chunk back to know which one is the last
+    number, pending = 0, b""
+    while chunk := source.read(chunk_size):
+        if pending:
+            _write(number, pending, False)
+            number += 1
+        pending = chunk
+
+    _write(number, pending, True)
+
+
+def _read_exactly(source: BinaryIO, size: int) -> bytes:
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError("The container is truncated.")
+    return data
+
+
+def _read_chunks(source: BinaryIO, key: bytes, raw_header: bytes, nonce_prefix: bytes, chunk_size: int) -> Iterator[bytes]:
+    number, final = 0, False
+    while not final:
+        final, length = _CHUNK_HEADER.unpack(_read_exactly(source, _CHUNK_HEADER.size))
+        if length > chunk_size:
+            raise ValueError("The chunk is larger than the chunk size.")
+
+        ciphertext = _read_exactly(source, length)
+        tag = _read_exactly(source, TAG_SIZE)
+
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(nonce_prefix, number))
+        cipher.update(_associated_data(raw_header, final))
+        yield cipher.decrypt_and_verify(ciphertext, tag)
+        number += 1
+
+
+def _parse_header(raw_header: bytes) -> tuple[dict[str, Any], bytes, int]:
+    """return the header with its nonce prefix and chunk size, raise ValueError if any of them is missing or invalid"""
+
+    try:
+        header = json.loads(raw_header)
+        nonce_prefix = bytes.fromhex(header["nonce_prefix"])
+        chunk_size = header["chunk_size"]
+    except (ValueError, TypeError, KeyError) as error:
+        raise ValueError("invalid container header") from error
+
+    if len(nonce_prefix) != NONCE_PREFIX_SIZE or not isinstance(chunk_size, int) or isinstance(chunk_size, bool) or chunk_size <= 0:
+        raise ValueError("invalid container header")
+
+    return header, nonce_prefix, chunk_size
+
+
+def read_container(source: BinaryIO, key_provider: KeyProvider) -> Iterator[bytes]:
+    """verify and decrypt the chunks one by one. The key is asked from the provider with the header.
+    A ValueError is raised as soon as an altered or missing chunk is found."""
+
+    magic, version, header_length = _PREAMBLE.unpack(_read_exactly(source, _PREAMBLE.size))
+    if magic != MAGIC:
+        raise ValueError("Not an encrypted container")
+    if version > VERSION:
+        raise ValueError(f"Unsupported container version: {version}")
+
+    raw_header = _read_exactly(source, header_length)
+    header, nonce_prefix, chunk_size = _parse_header(raw_header)
+    if header.get("cipher") != CIPHER:
+        raise ValueError(f"Unsupported cipher: {header.get('cipher')}")
+
+    yield from _read_chunks(source, key_provider(header), raw_header, nonce_prefix, chunk_size)
+
+    if source.read(1):
+        raise ValueError("Unexpected data after the last chunk.")
@@ -0,0 +1,120 @@
+"""Derive the encryption keys from the master key. The parameters of the derivation
+are stored next to the encrypted data, so the work factor can be changed without
+breaking the existing files.
+
+Run `python -m tests.benchmarks.kdf_benchmark` to measure the timings to tune the work factor.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, cast
+
+from Crypto import Random
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import PBKDF2, scrypt
+
+from settings import KDF_ALGORITHM, KDF_PBKDF2_ITERATIONS, KDF_SCRYPT_COST
+
+KEY_SIZE = 32
+SALT_SIZE = 16
+
+# a bare SHA-256 of the master key, used by the files that are created before the KDF
+LEGACY_ALGORITHM = "sha256"
+PBKDF2_ALGORITHM = "pbkdf2-sha256"
+SCRYPT_ALGORITHM = "scrypt"
+
+
+@dataclass(frozen=True)
+class KdfParameters:
+    """the algorithm and the parameters to derive a key"""
+
+    algorithm: str = LEGACY_ALGORITHM
+    salt: bytes = b""
+    # PBKDF2
+    iterations: int = 0
+    # scrypt
+    cost: int = 0
+    block_size: int = 8
+    parallelization: int = 1
+
+    @classmethod
+    def new(cls, algorithm: str = KDF_ALGORITHM) -> "KdfParameters":
+        """return the parameters with a new random salt and the default work factor of the algorithm"""
+
+        salt = Random.new().read(SALT_SIZE)
+        if algorithm == PBKDF2_ALGORITHM:
+            return cls(algorithm, salt, iterations=KDF_PBKDF2_ITERATIONS)
+        if algorithm == SCRYPT_ALGORITHM:
+            return cls(algorithm, salt, cost=KDF_SCRYPT_COST)
+        if algorithm == LEGACY_ALGORITHM:
+            return cls()
+
+        raise ValueError(f"Unknown key derivation algorithm: {algorithm}")
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert KdfParameters object to dictionary"""
+
+        data: dict[str, Any] = {"algorithm": self.algorithm, "salt": self.salt.hex()}
+        if self.algorithm == PBKDF2_ALGORITHM:
+            data["iterations"] = self.iterations
+        elif self.algorithm == SCRYPT_ALGORITHM:
+            data.update(cost=self.cost, block_size=self.block_size, parallelization=self.parallelization)
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> "KdfParameters":
+        """Convert dictionary to KdfParameters object, the legacy parameters are returned if there is no data"""
+
+        if not data:
+            return cls()
+
+        return cls(
+            algorithm=data["algorithm"],
+            salt=bytes.fromhex(data.get("salt", "")),
+            iterations=data.get("iterations", 0),
+            cost=data.get("cost", 0),
+            block_size=data.get("block_size", 8),
+            parallelization=data.get("parallelization", 1),
+        )
+
+
+def derive_key(master_key: bytes, parameters: KdfParameters) -> bytes:
+    """derive an AES key from the master key with the given parameters"""
+
+    if parameters.algorithm == LEGACY_ALGORITHM:
+        return SHA256.new(master_key).digest()
+
+    if parameters.algorithm == PBKDF2_ALGORITHM:
+        # the stubs declare the password as str, bytes are accepted as well
+        return PBKDF2(cast(str, master_key), parameters.salt, KEY_SIZE, count=parameters.iterations, hmac_hash_module=SHA256)
+
+    if parameters.algorithm == SCRYPT_ALGORITHM:
+        # the stubs declare the password and the salt as str, a single key is returned unless more keys are requested
+        key = scrypt(
+            cast(str, master_key),
+            cast(str, parameters.salt),
+            KEY_SIZE,
+            N=parameters.cost,
+            r=parameters.block_size,
+            p=parameters.parallelization,
+        )
+        return cast(bytes, key)
+
+    raise ValueError(f"Unknown key derivation algorithm: {parameters.algorithm}")
+
+
+@dataclass
+class DerivedKeyCache:
+    """keep the derived keys of a master key, the derivation is expensive on purpose"""
+
+    master_key: bytes
+    _keys: dict[KdfParameters, bytes] = field(default_factory=dict, repr=False)
+
+    def get(self, parameters: KdfParameters) -> bytes:
+        """return the derived key for the parameters, derive it only once"""
+
+        try:
+            return self._keys[parameters]
+        except KeyError:
+            key = self._keys[parameters] = derive_key(self.master_key, parameters)
+            return key
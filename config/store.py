@@ -0,0 +1,267 @@
+"""Incremental credential store. The file is an append-only log of records and each
+entry is encrypted on its own, so an edit only writes the affected entry.
+The metadata and the secret of an entry are encrypted separately, so the metadata
+can be read without decrypting the secrets."""
+
+import enum
+import json
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Mapping
+
+from common.atomic_file import atomic_write
+from logger import logger
+from settings import CREDENTIALS_BACKUP_GENERATIONS
+
+MAGIC = b"SBCS"
+VERSION = 1
+
+# magic, version, length of the json header
+_PREAMBLE = struct.Struct(">4sBI")
+# operation, entry id, length of the payload
+_RECORD_HEADER = struct.Struct(">B16sI")
+# length of the encrypted metadata in the payload, followed by the encrypted metadata and the encrypted secret
+_METADATA_LENGTH = struct.Struct(">I")
+
+Cipher = Callable[[bytes], bytes]
+# metadata and secret of an entry
+StoreEntry = tuple[bytes, bytes]
+
+
+class RecordOperation(enum.IntEnum):
+    """operations of the records in the log"""
+
+    PUT = 1
+    DELETE = 2
+
+
+@dataclass
+class _RecordLocation:
+    offset: int
+    length: int
+
+
+class CredentialStore:
+    """Log structured credential store.
+
+    - a PUT record holds an entry as its encrypted metadata and encrypted secret,
+      a newer PUT with the same id replaces it.
+    - a DELETE record removes the entry.
+
+    The index(entry id -> location of the latest PUT) is built by scanning the record headers,
+    nothing is decrypted until an entry is read. The log is compacted once the replaced and
+    deleted records take more space than the live ones.
+
+    The index is never modified in place, a new one is built and swapped in. So the readers in
+    other threads see either the old or the new index while the log is loaded or appended.
+    """
+
+    COMPACTION_MIN_SIZE = 64 * 1024
+
+    def __init__(self, filename: str | Path, encrypt: Cipher, decrypt: Cipher) -> None:
+        self._filename = Path(filename)
+        self._encrypt = encrypt
+        self._decrypt = decrypt
+
+        self._header: dict[str, Any] = {}
+        self._index: dict[str, _RecordLocation] = {}
+        self._end = 0
+        self._live_bytes = 0
+
+    @staticmethod
+    def is_store_file(filename: str | Path) -> bool:
+        """return whether the given file is in the store format"""
+
+        try:
+            with open(filename, "rb") as fd:
+                return fd.read(len(MAGIC)) == MAGIC
+        except FileNotFoundError:
+            return False
+
+    @property
+    def header(self) -> dict[str, Any]:
+        """return the unencrypted header of the store"""
+        return self._header
+
+    def ids(self) -> list[str]:
+        """return the ids of the entries in the order they are added"""
+        return list(self._index)
+
+    def load(self) -> None:
+        """scan the record headers and build the index, raise ValueError if the file is malformed"""
+
+        index: dict[str, _RecordLocation] = {}
+        live_bytes = 0
+
+        with open(self._filename, "rb") as fd:
+            size = os.fstat(fd.fileno()).st_size
+            header = self._read_header(fd)
+
+            while True:
+                offset = fd.tell()
+                record_header = fd.read(_RECORD_HEADER.size)
+                if len(record_header) < _RECORD_HEADER.size:
+                    break
+
+                operation, raw_id, length = _RECORD_HEADER.unpack(record_header)
+                payload_offset = fd.tell()
+                if fd.seek(length, 1) > size:
+                    break  # torn write, ignore the incomplete record
+
+                live_bytes += self._apply(index, RecordOperation(operation), raw_id.hex(), _RecordLocation(payload_offset, length))
+
+        if record_header:
+            logger.warning("The credential store has an incomplete record at %s, it will be discarded.", offset)
+
+        self._header, self._index, self._live_bytes, self._end = header, index, live_bytes, offset
+
+    @staticmethod
+    def _read_header(fd: BinaryIO) -> dict[str, Any]:
+        """read the preamble and the header, raise ValueError if they are truncated or malformed"""
+
+        preamble = fd.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError("The credential store header is truncated")
+
+        magic, version, header_length = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError("Not a credential store file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported credential store version: {version}")
+
+        raw_header = fd.read(header_length)
+        if len(raw_header) < header_length:
+            raise ValueError("The credential store header is truncated")
+
+        header = json.loads(raw_header)
+        if not isinstance(header, dict):
+            raise ValueError("The credential store header is malformed")
+        return header
+
+    @staticmethod
+    def _apply(index: dict[str, _RecordLocation], operation: RecordOperation, entry_id: str, location: _RecordLocation) -> int:
+        """apply the record on the index, return the change of the live bytes"""
+
+        live_bytes = 0
+        old = index.pop(entry_id, None) if operation is RecordOperation.DELETE else index.get(entry_id)
+        if old is not None:
+            live_bytes -= old.length
+
+        if operation is RecordOperation.PUT:
+            live_bytes += location.length
+            index[entry_id] = location
+
+        return live_bytes
+
+    @staticmethod
+    def _split(payload: bytes) -> tuple[bytes, bytes]:
+        """split the payload into the encrypted metadata and encrypted secret"""
+
+        if len(payload) < _METADATA_LENGTH.size:
+            raise ValueError("The credential store record is malformed")
+
+        (metadata_length,) = _METADATA_LENGTH.unpack_from(payload)
+        metadata_end = _METADATA_LENGTH.size + metadata_length
+        if metadata_end > len(payload):
+            raise ValueError("The credential store record is malformed")
+
+        return payload[_METADATA_LENGTH.size : metadata_end], payload[metadata_end:]
+
+    def _read_payload(self, fd: BinaryIO, location: _RecordLocation) -> tuple[bytes, bytes]:
+        fd.seek(location.offset)
+        return self._split(fd.read(location.length))
+
+    def read_metadata(self, entry_id: str) -> bytes:
+        """read and decrypt the metadata of a single entry, the secret is not decrypted"""
+
+        location = self._index[entry_id]
+        with open(self._filename, "rb") as fd:
+            metadata, _ = self._read_payload(fd, location)
+
+        return self._decrypt(metadata)
+
+    def read_secret(self, entry_id: str) -> bytes:
+        """read and decrypt the secret of a single entry"""
+
+        location = self._index[entry_id]
+        with open(self._filename, "rb") as fd:
+            _, secret = self._read_payload(fd, location)
+
+        return self._decrypt(secret)
+
+    def read_all(self, secrets: bool = True) -> dict[str, tuple[bytes, bytes | None]]:
+        """read and decrypt all entries. The secrets are not decrypted unless requested."""
+
+        entries: dict[str, tuple[bytes, bytes | None]] = {}
+        with open(self._filename, "rb") as fd:
+            for entry_id, location in self._index.items():
+                metadata, secret = self._read_payload(fd, location)
+                entries[entry_id] = (self._decrypt(metadata), self._decrypt(secret) if secrets else None)
+
+        return entries
+
+    def _serialize(self, operation: RecordOperation, entry_id: str, payload: bytes) -> bytes:
+        return _RECORD_HEADER.pack(operation, bytes.fromhex(entry_id), len(payload)) + payload
+
+    def _encrypt_entry(self, entry: StoreEntry) -> bytes:
+        metadata, secret = self._encrypt(entry[0]), self._encrypt(entry[1])
+        return _METADATA_LENGTH.pack(len(metadata)) + metadata + secret
+
+    def rewrite(self, entries: Mapping[str, StoreEntry], header: dict[str, Any] | None = None) -> None:
+        """write all entries into a new log"""
+
+        if header is not None:
+            self._header = header
+
+        raw_header = json.dumps(self._header).encode()
+        data = _PREAMBLE.pack(MAGIC, VERSION, len(raw_header)) + raw_header
+        for entry_id, entry in entries.items():
+            data += self._serialize(RecordOperation.PUT, entry_id, self._encrypt_entry(entry))
+
+        # readers see either the old or the new log, the previous logs are kept as backups
+        with atomic_write(self._filename, backups=CREDENTIALS_BACKUP_GENERATIONS) as fd:
+            fd.write(data)
+
+        self.load()
+
+    def append(self, entries: Mapping[str, StoreEntry], deleted: Iterable[str] = ()) -> None:
+        """append the given changes to the log, compact it if needed"""
+
+        if self._end == 0:
+            self.load()  # never truncate the file before knowing where the records end
+
+        records = [(RecordOperation.PUT, entry_id, self._encrypt_entry(entry)) for entry_id, entry in entries.items()]
+        records += [(RecordOperation.DELETE, entry_id, b"") for entry_id in deleted]
+
+        data = b""
+        locations: list[tuple[RecordOperation, str, _RecordLocation]] = []
+        for operation, entry_id, payload in records:
+            locations.append((operation, entry_id, _RecordLocation(self._end + len(data) + _RECORD_HEADER.size, len(payload))))
+            data += self._serialize(operation, entry_id, payload)
+
+        with open(self._filename, "r+b") as fd:
+            fd.seek(self._end)
+            fd.truncate()  # drop the incomplete record, if any
+            fd.write(data)
+            # the readers ignore a torn record at the end, it is still made durable before the index is updated
+            fd.flush()
+            os.fsync(fd.fileno())
+
+        # update the index without scanning the file again
+        index = dict(self._index)
+        live_bytes = self._live_bytes
+        for operation, entry_id, location in locations:
+            live_bytes += self._apply(index, operation, entry_id, location)
+        self._index, self._live_bytes = index, live_bytes
+        self._end += len(data)
+
+        if self._end > self.COMPACTION_MIN_SIZE and self._end > 2 * self._live_bytes:
+            self.compact()
+
+    def compact(self) -> None:
+        """rewrite the log with the live entries only"""
+
+        logger.debug("Compacting the credential store, %s live bytes in %s bytes.", self._live_bytes, self._end)
+        self.rewrite({entry_id: (metadata, secret or b"") for entry_id, (metadata, secret) in self.read_all().items()})
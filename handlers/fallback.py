@@ -0,0 +1,43 @@
+"""Base controller for the handlers that fall back to another implementation if the primary one cannot be started"""
+
+from typing import Callable, Generic, Protocol, TypeVar
+
+from logger import logger
+
+
+class _Stoppable(Protocol):  # pylint: disable=too-few-public-methods
+    def stop(self) -> None:
+        """stop the handler"""
+
+
+HandlerT = TypeVar("HandlerT", bound=_Stoppable)
+
+
+class FallbackController(Generic[HandlerT]):  # pylint: disable=too-few-public-methods
+    """Starts the primary handler, or the fallback one if the primary cannot be started.
+    Only the started handler is stopped."""
+
+    def __init__(self, primary: HandlerT, fallback: HandlerT | None = None) -> None:
+        self._primary = primary
+        self._fallback = fallback
+        self._active: HandlerT | None = None
+
+    def _start_handler(self, start: Callable[[HandlerT], None]) -> None:
+        """start the primary handler with the given function, start the fallback one if it raises OSError"""
+
+        try:
+            start(self._primary)
+            self._active = self._primary
+        except OSError as error:
+            if self._fallback is None:
+                raise
+            logger.warning("Cannot start %s, falling back to %s: %s", self._primary, self._fallback, error)
+            start(self._fallback)
+            self._active = self._fallback
+
+    def stop(self) -> None:
+        """stop the started handler"""
+
+        if self._active is not None:
+            self._active.stop()
+            self._active = None
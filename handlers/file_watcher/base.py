@@ -0,0 +1,31 @@
+"""Base classes for the file watchers"""
+
+import abc
+from pathlib import Path
+from typing import Callable
+
+from handlers.fallback import FallbackController
+
+# called with the path of a watched file that may be changed, possibly from another thread
+FileChangeCallback = Callable[[Path], None]
+
+
+class FileWatcherInterface(abc.ABC):
+    """Interface class for the file watchers. A watcher may report a file that is not changed,
+    i.e. touched or a sibling in the same directory, the content should be compared by the caller."""
+
+    @abc.abstractmethod
+    def start(self, paths: list[Path], callback: FileChangeCallback) -> None:
+        """Start reporting the changes of the given files to the callback. Must not block."""
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        """Stop reporting the changes"""
+
+
+class FileWatcherController(FallbackController[FileWatcherInterface], FileWatcherInterface):
+    """Controller class for the file watchers. Falls back to the
+    given fallback watcher if the primary one cannot be started."""
+
+    def start(self, paths: list[Path], callback: FileChangeCallback) -> None:
+        self._start_handler(lambda watcher: watcher.start(paths, callback))
@@ -0,0 +1,108 @@
+"""Detect the file changes with the help of the directory change notifications, without polling"""
+
+import ctypes
+import threading
+from collections import defaultdict
+from ctypes import wintypes
+from pathlib import Path
+
+from handlers.file_watcher.base import FileChangeCallback, FileWatcherInterface
+from logger import logger
+
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x001
+FILE_NOTIFY_CHANGE_SIZE = 0x008
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x010
+
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0x000
+INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+# a rename over the file is reported as a file name change, i.e. the atomic writes
+_NOTIFY_FILTER = FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_SIZE | FILE_NOTIFY_CHANGE_LAST_WRITE
+
+
+def _get_kernel32() -> "ctypes.WinDLL":
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+    kernel32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+    kernel32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+    kernel32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+    kernel32.CreateEventW.restype = wintypes.HANDLE
+    kernel32.SetEvent.argtypes = [wintypes.HANDLE]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    kernel32.WaitForMultipleObjects.argtypes = [wintypes.DWORD, ctypes.POINTER(wintypes.HANDLE), wintypes.BOOL, wintypes.DWORD]
+    return kernel32
+
+
+class ChangeNotificationFileWatcher(FileWatcherInterface):
+    """Detect the file changes with the help of the directory change notifications, without polling.
+    The parent directories are watched, a notification is reported for all watched files in that directory.
+    The notifications are waited in a dedicated thread, which is woken up by an event to stop."""
+
+    def __init__(self) -> None:
+        self._kernel32: "ctypes.WinDLL | None" = None
+        self._stop_handle: int | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self, paths: list[Path], callback: FileChangeCallback) -> None:
+        kernel32 = self._kernel32 = _get_kernel32()
+
+        directories: dict[Path, list[Path]] = defaultdict(list)
+        for path in paths:
+            directories[path.resolve().parent].append(path)
+
+        handles: list[int] = []
+        for directory in directories:
+            handle = kernel32.FindFirstChangeNotificationW(str(directory), False, _NOTIFY_FILTER)
+            if handle in (None, INVALID_HANDLE_VALUE):
+                error = ctypes.WinError(ctypes.get_last_error())
+                for opened in handles:
+                    kernel32.FindCloseChangeNotification(opened)
+                raise error
+            handles.append(handle)
+
+        self._stop_handle = kernel32.CreateEventW(None, True, False, None)
+        if not self._stop_handle:
+            for opened in handles:
+                kernel32.FindCloseChangeNotification(opened)
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        self._thread = threading.Thread(target=self._run, args=(handles, list(directories.values()), callback), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None or self._kernel32 is None:
+            return
+
+        self._kernel32.SetEvent(self._stop_handle)
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self, handles: list[int], watched_files: list[list[Path]], callback: FileChangeCallback) -> None:
+        assert self._kernel32 is not None and self._stop_handle is not None
+        kernel32 = self._kernel32
+
+        # the stop event is the last one, so the index of a notification is the index of its directory
+        wait_handles = (wintypes.HANDLE * (len(handles) + 1))(*handles, self._stop_handle)
+
+        try:
+            while True:
+                index = kernel32.WaitForMultipleObjects(len(wait_handles), wait_handles, False, INFINITE) - WAIT_OBJECT_0
+                if not 0 <= index < len(handles):
+                    return  # stopped or failed
+
+                for path in watched_files[index]:
+                    try:
+                        callback(path)
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        logger.exception("File change callback failed for %s", path)
+
+                if not kernel32.FindNextChangeNotification(handles[index]):
+                    logger.error("Cannot watch the changes anymore: %s", ctypes.WinError(ctypes.get_last_error()))
+                    return
+        finally:
+            for handle in handles:
+                kernel32.FindCloseChangeNotification(handle)
+            kernel32.CloseHandle(self._stop_handle)
+            self._stop_handle = None
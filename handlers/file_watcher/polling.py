@@ -0,0 +1,46 @@
+"""Detect the file changes by checking their status periodically"""
+
+from pathlib import Path
+
+from common.background_thread import BackgroundThread
+from handlers.file_watcher.base import FileChangeCallback, FileWatcherInterface
+from logger import logger
+
+# modification time and size, None if the file does not exist
+_FileStatus = tuple[int, int] | None
+
+
+def _get_status(path: Path) -> _FileStatus:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class PollingFileWatcher(FileWatcherInterface):
+    """Detect the file changes by checking their modification time and size periodically"""
+
+    def __init__(self, interval_secs: float = 1) -> None:
+        self._interval_secs = interval_secs
+        self._thread = BackgroundThread()
+
+    def start(self, paths: list[Path], callback: FileChangeCallback) -> None:
+        self._thread.start(self._run, paths, callback)
+
+    def stop(self) -> None:
+        self._thread.stop()
+
+    def _run(self, paths: list[Path], callback: FileChangeCallback) -> None:
+        statuses = {path: _get_status(path) for path in paths}
+
+        while not self._thread.stop_event.wait(self._interval_secs):
+            for path, status in statuses.items():
+                if (new_status := _get_status(path)) == status:
+                    continue
+
+                statuses[path] = new_status
+                try:
+                    callback(path)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("File change callback failed for %s", path)
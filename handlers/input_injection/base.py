@@ -0,0 +1,153 @@
+"""Base classes for the input injection backends"""
+
+import abc
+import threading
+import time
+from dataclasses import dataclass
+
+from logger import logger
+
+
+@dataclass
+class InjectionStatistics:
+    """timing and reliability statistics of a backend on a target window"""
+
+    calls: int = 0
+    errors: int = 0
+    verified: int = 0
+    failed: int = 0
+    total_secs: float = 0.0
+    max_secs: float = 0.0
+
+    @property
+    def average_secs(self) -> float:
+        """return the average time of a call"""
+        return self.total_secs / self.calls if self.calls else 0.0
+
+    @property
+    def is_reliable(self) -> bool:
+        """a backend is unreliable on a target if it fails more than it works"""
+        return self.errors + self.failed <= max(self.verified, 1)
+
+
+class InputInjectorInterface(abc.ABC):
+    """Interface class for the input injection backends"""
+
+    @property
+    def name(self) -> str:
+        """return the name of the backend, used to group the statistics"""
+        return self.__class__.__name__
+
+    @abc.abstractmethod
+    def send_text(self, text: str) -> None:
+        """Type the given text into the focused control"""
+
+    @abc.abstractmethod
+    def press(self, key: str) -> None:
+        """Press and release the given key, i.e. enter, backspace or delete"""
+
+    @abc.abstractmethod
+    def hotkey(self, *keys: str) -> None:
+        """Press the given keys in order and release them in the reverse order, i.e. ctrl+a"""
+
+
+class InputInjectionController(InputInjectorInterface):
+    """Controller class for the input injection backends.
+
+    - the backends are given in the order of preference. The first one that is reliable on the
+      target window is used, a backend that raises is skipped for that call.
+    - each call is timed per backend and per target window, the verification results are reported
+      back by `record_result`. So a backend that does not work for a window is not used for it anymore.
+    """
+
+    def __init__(self, injectors: list[InputInjectorInterface]) -> None:
+        if not injectors:
+            raise ValueError("At least one input injector is required.")
+
+        self._injectors = injectors
+        self._lock = threading.Lock()
+        # (backend name, target) -> statistics
+        self._statistics: dict[tuple[str, str], InjectionStatistics] = {}
+        # target -> name of the backend that typed the last text
+        self._last_used: dict[str, str] = {}
+
+    @property
+    def name(self) -> str:
+        return "+".join(injector.name for injector in self._injectors)
+
+    def _get_statistics(self, injector: InputInjectorInterface, target: str) -> InjectionStatistics:
+        return self._statistics.setdefault((injector.name, target), InjectionStatistics())
+
+    def _candidates(self, target: str) -> list[InputInjectorInterface]:
+        with self._lock:
+            reliable = [injector for injector in self._injectors if self._get_statistics(injector, target).is_reliable]
+
+        # try the unreliable ones as well if nothing else is left
+        return reliable or list(self._injectors)
+
+    def injector_for(self, target: str = "") -> InputInjectorInterface:
+        """return the backend that is used for the given target window"""
+        return self._candidates(target)[0]
+
+    def _timed(self, injector: InputInjectorInterface, target: str, action: str, *args: str) -> None:
+        started_at = time.perf_counter()
+        try:
+            getattr(injector, action)(*args)
+        except OSError:
+            with self._lock:
+                self._get_statistics(injector, target).errors += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self._lock:
+                statistics = self._get_statistics(injector, target)
+                statistics.calls += 1
+                statistics.total_secs += elapsed
+                statistics.max_secs = max(statistics.max_secs, elapsed)
+
+    def _run(self, target: str, action: str, *args: str) -> None:
+        error: OSError | None = None
+        for injector in self._candidates(target):
+            try:
+                self._timed(injector, target, action, *args)
+            except OSError as exc:
+                logger.warning("Input injection via %s is failed: %s", injector.name, exc)
+                error = exc
+                continue
+
+            with self._lock:
+                self._last_used[target] = injector.name
+            return
+
+        assert error is not None
+        raise error
+
+    def send_text(self, text: str, target: str = "") -> None:
+        self._run(target, "send_text", text)
+
+    def press(self, key: str, target: str = "") -> None:
+        self._run(target, "press", key)
+
+    def hotkey(self, *keys: str, target: str = "") -> None:
+        self._run(target, "hotkey", *keys)
+
+    def record_result(self, target: str, success: bool) -> None:
+        """report whether the last text that is sent to the target arrived intact"""
+
+        with self._lock:
+            name = self._last_used.get(target)
+            if name is None:
+                return
+
+            statistics = self._statistics.setdefault((name, target), InjectionStatistics())
+            if success:
+                statistics.verified += 1
+            else:
+                statistics.failed += 1
+
+    @property
+    def statistics(self) -> dict[tuple[str, str], InjectionStatistics]:
+        """return a copy of the statistics keyed by the backend name and the target window"""
+
+        with self._lock:
+            return {key: InjectionStatistics(**vars(value)) for key, value in self._statistics.items()}
@@ -0,0 +1,35 @@
+"""Type the text by pasting it from the clipboard"""
+
+import time
+
+import pyautogui
+import pyperclip
+
+from handlers.input_injection.base import InputInjectorInterface
+
+# the paste is asynchronous, the clipboard must not be restored before the target reads it
+PASTE_SETTLE_SECS = 0.1
+
+
+class ClipboardInjector(InputInjectorInterface):
+    """Copies the text to the clipboard and sends ctrl+v. Works with the controls that ignore the
+    synthesized unicode keystrokes, but the text passes through the clipboard.
+    The previous content of the clipboard is restored after each paste."""
+
+    def __init__(self, settle_secs: float = PASTE_SETTLE_SECS) -> None:
+        self._settle_secs = settle_secs
+
+    def send_text(self, text: str) -> None:
+        current_clipboard = pyperclip.paste()
+        try:
+            pyperclip.copy(text)
+            pyautogui.hotkey("ctrl", "v")
+            time.sleep(self._settle_secs)
+        finally:
+            pyperclip.copy(current_clipboard)
+
+    def press(self, key: str) -> None:
+        pyautogui.press(key)
+
+    def hotkey(self, *keys: str) -> None:
+        pyautogui.hotkey(*keys)
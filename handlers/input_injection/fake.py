@@ -0,0 +1,56 @@
+"""A recording input injector. Does not depend on any OS specific API, emulates a single
+edit control, so the sending and the verification can be driven without real windows."""
+
+import time
+
+from handlers.input_injection.base import InputInjectorInterface
+
+
+class FakeInputInjector(InputInjectorInterface):
+    """A recording input injector that types into an emulated edit control"""
+
+    def __init__(self, delay_secs: float = 0, drop_every: int = 0) -> None:
+        """delay_secs: the time each action takes
+        drop_every: drop every n-th typed character, to emulate the lost keystrokes"""
+
+        self._delay_secs = delay_secs
+        self._drop_every = drop_every
+        self._typed_count = 0
+        self._selected = False
+        self.actions: list[tuple[str, str]] = []
+        self.value = ""
+
+    def _act(self, action: str, argument: str) -> None:
+        self.actions.append((action, argument))
+        if self._delay_secs:
+            time.sleep(self._delay_secs)
+
+    def _delete(self) -> None:
+        if self._selected:
+            self.value = ""
+            self._selected = False
+        else:
+            self.value = self.value[:-1]
+
+    def send_text(self, text: str) -> None:
+        self._act("text", text)
+
+        if self._selected:
+            self.value = ""
+            self._selected = False
+
+        for char in text:
+            self._typed_count += 1
+            if self._drop_every and self._typed_count % self._drop_every == 0:
+                continue
+            self.value += char
+
+    def press(self, key: str) -> None:
+        self._act("press", key)
+        if key in ("backspace", "delete"):
+            self._delete()
+
+    def hotkey(self, *keys: str) -> None:
+        self._act("hotkey", "+".join(keys))
+        if keys == ("ctrl", "a"):
+            self._selected = True
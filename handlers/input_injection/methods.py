@@ -0,0 +1,30 @@
+"""Common enumerations for the input injection methods."""
+
+from enum import Enum
+from typing import Type
+
+from handlers.input_injection.base import InputInjectionController, InputInjectorInterface
+from handlers.input_injection.clipboard import ClipboardInjector
+from handlers.input_injection.send_input import SendInputInjector
+
+
+class InputInjectionMethod(Enum):
+    """Input injection method enumeration."""
+
+    SEND_INPUT = "SendInput"
+    CLIPBOARD = "Clipboard"
+
+    def get_underlying_class(self) -> Type[InputInjectorInterface]:
+        """Get the underlying class name."""
+        return _METHOD_MAP[self]
+
+    def create_controller(self) -> InputInjectionController:
+        """Create a controller that prefers this method and falls back to the others."""
+        methods = [self] + [method for method in InputInjectionMethod if method is not self]
+        return InputInjectionController([method.get_underlying_class()() for method in methods])
+
+
+_METHOD_MAP: dict[InputInjectionMethod, Type[InputInjectorInterface]] = {
+    InputInjectionMethod.SEND_INPUT: SendInputInjector,
+    InputInjectionMethod.CLIPBOARD: ClipboardInjector,
+}
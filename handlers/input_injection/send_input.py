@@ -0,0 +1,108 @@
+"""Type the text with the SendInput as unicode keystrokes, without touching the clipboard"""
+
+import ctypes
+from ctypes import wintypes
+
+from handlers.input_injection.base import InputInjectorInterface
+
+INPUT_KEYBOARD = 1
+
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+
+_VIRTUAL_KEYS = {
+    "backspace": 0x08,
+    "tab": 0x09,
+    "enter": 0x0D,
+    "shift": 0x10,
+    "ctrl": 0x11,
+    "alt": 0x12,
+    "esc": 0x1B,
+    "end": 0x23,
+    "home": 0x24,
+    "delete": 0x2E,
+}
+
+
+class _KEYBDINPUT(ctypes.Structure):  # pylint: disable=too-few-public-methods
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _MOUSEINPUT(ctypes.Structure):  # pylint: disable=too-few-public-methods
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_size_t),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):  # pylint: disable=too-few-public-methods
+    # the mouse input is the largest member, it is needed for the correct size of the INPUT
+    _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+
+class _INPUT(ctypes.Structure):  # pylint: disable=too-few-public-methods
+    _fields_ = [("type", wintypes.DWORD), ("union", _INPUTUNION)]
+
+
+def _key_input(virtual_key: int = 0, scan_code: int = 0, flags: int = 0) -> _INPUT:
+    return _INPUT(type=INPUT_KEYBOARD, union=_INPUTUNION(ki=_KEYBDINPUT(wVk=virtual_key, wScan=scan_code, dwFlags=flags)))
+
+
+def _get_virtual_key(key: str) -> int:
+    try:
+        return _VIRTUAL_KEYS[key.lower()]
+    except KeyError:
+        pass
+
+    if len(key) == 1 and key.isascii() and key.isalnum():
+        return ord(key.upper())
+
+    raise ValueError(f"Unknown key: {key}")
+
+
+def _send(inputs: list[_INPUT]) -> None:
+    if not inputs:
+        return
+
+    array = (_INPUT * len(inputs))(*inputs)
+    sent = ctypes.windll.user32.SendInput(len(inputs), array, ctypes.sizeof(_INPUT))
+    if sent != len(inputs):
+        # blocked by the UIPI or by another thread, i.e. the target runs at a higher integrity level
+        raise ctypes.WinError()
+
+
+class SendInputInjector(InputInjectorInterface):
+    """Sends the whole text as unicode keystrokes in a single SendInput call. The keystrokes
+    cannot be interleaved with the user's typing and nothing is left in the clipboard."""
+
+    def send_text(self, text: str) -> None:
+        inputs: list[_INPUT] = []
+
+        # the characters out of the BMP are sent as surrogate pairs
+        encoded = text.encode("utf-16-le")
+        for index in range(0, len(encoded), 2):
+            code_unit = int.from_bytes(encoded[index : index + 2], "little")
+            inputs.append(_key_input(scan_code=code_unit, flags=KEYEVENTF_UNICODE))
+            inputs.append(_key_input(scan_code=code_unit, flags=KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
+
+        _send(inputs)
+
+    def press(self, key: str) -> None:
+        self.hotkey(key)
+
+    def hotkey(self, *keys: str) -> None:
+        virtual_keys = [_get_virtual_key(key) for key in keys]
+        _send(
+            [_key_input(virtual_key=virtual_key) for virtual_key in virtual_keys]
+            + [_key_input(virtual_key=virtual_key, flags=KEYEVENTF_KEYUP) for virtual_key in reversed(virtual_keys)]
+        )
@@ -0,0 +1,76 @@
+"""Run a Windows message loop in a dedicated thread, for the handlers that are notified by the window messages"""
+
+import ctypes
+import threading
+from ctypes import wintypes
+from typing import Callable
+
+WM_QUIT = 0x0012
+
+# creates what receives the messages in the loop thread, raises OSError on failure and returns the cleanup
+MessageLoopSetup = Callable[[], Callable[[], None]]
+
+
+class MessageLoopThread:
+    """A thread that runs the message loop. The hooks and windows are owned by the thread that
+    creates them, so they are created by the setup in the loop thread and cleaned up there once
+    the loop is quit."""
+
+    def __init__(self) -> None:
+        self._thread: threading.Thread | None = None
+        self._thread_id = 0
+
+    @property
+    def is_running(self) -> bool:
+        """return whether the loop thread is running"""
+        return self._thread is not None
+
+    def start(self, setup: MessageLoopSetup, on_started: Callable[[], None] | None = None) -> None:
+        """Run the setup and the message loop in a new thread, on_started is called in that thread before
+        the loop. Returns once the setup is done, the OSError of the setup is raised here."""
+
+        started = threading.Event()
+        errors: list[OSError] = []
+
+        self._thread = threading.Thread(target=self._run, args=(setup, on_started, started, errors), daemon=True)
+        self._thread.start()
+        started.wait()
+
+        if errors:
+            self._thread.join()
+            self._thread = None
+            raise errors[0]
+
+    def stop(self) -> None:
+        """quit the message loop and wait for the cleanup, unless it is called from the loop thread"""
+
+        if self._thread is None:
+            return
+
+        ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self, setup: MessageLoopSetup, on_started: Callable[[], None] | None, started: threading.Event, errors: list[OSError]) -> None:
+        user32 = ctypes.windll.user32
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+
+        try:
+            cleanup = setup()
+        except OSError as error:
+            errors.append(error)
+            return
+        finally:
+            started.set()
+
+        msg = wintypes.MSG()
+        try:
+            if on_started is not None:
+                on_started()
+
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            cleanup()
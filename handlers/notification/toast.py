@@ -2,7 +2,7 @@
 
 import datetime
 import pathlib
-import time
+import threading
 import winreg
 from dataclasses import dataclass
 
@@ -141,6 +141,7 @@ class ToasterCallback:
         self.toast = toast
 
         self.result = self.Result()
+        self._completed = threading.Event()
 
     def register(self) -> None:
         """Register the toaster"""
@@ -169,18 +170,21 @@ class ToasterCallback:
         else:
             self.result.response = None
 
-        self.result.completed = True
+        self._complete()
 
     def dismissed(self, args: ToastDismissedEventArgs) -> None:
         """Handle the dismissal of the toast"""
         self.result.reason = args.reason
-        self.result.completed = True
+        self._complete()
 
     def failed(self, _: ToastFailedEventArgs) -> None:
         """Handle the failure of the toast"""
+        self._complete()
+
+    def _complete(self) -> None:
         self.result.completed = True
+        self._completed.set()
 
     def wait(self) -> None:
         """Wait for the toaster to finish"""
-        while not self.result.completed:
-            time.sleep(0.1)
+        self._completed.wait()
@@ -0,0 +1,46 @@
+"""Base classes for the session monitors"""
+
+import abc
+import enum
+from typing import Callable
+
+from handlers.fallback import FallbackController
+
+
+class SessionState(enum.Enum):
+    """Lock state of the session"""
+
+    LOCKED = enum.auto()
+    UNLOCKED = enum.auto()
+
+
+SessionStateCallback = Callable[[SessionState], None]
+
+
+class SessionMonitorInterface(abc.ABC):
+    """Interface class for the session monitors"""
+
+    @abc.abstractmethod
+    def start(self, callback: SessionStateCallback) -> None:
+        """Start delivering the lock state changes to the given callback. Must not block."""
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        """Stop delivering the lock state changes"""
+
+    @property
+    @abc.abstractmethod
+    def is_locked(self) -> bool:
+        """return the last known lock state. Must be cheap, it is called on every loop tick."""
+
+
+class SessionMonitorController(FallbackController[SessionMonitorInterface], SessionMonitorInterface):
+    """Controller class for the session monitors. Falls back to the
+    given fallback monitor if the primary one cannot be started."""
+
+    def start(self, callback: SessionStateCallback) -> None:
+        self._start_handler(lambda monitor: monitor.start(callback))
+
+    @property
+    def is_locked(self) -> bool:
+        return self._active is not None and self._active.is_locked
@@ -0,0 +1,85 @@
+"""Detect the lock screen by looking for the LogonUI process periodically"""
+
+import time
+
+import psutil
+
+from common.background_thread import BackgroundThread
+from handlers.session_monitor.base import SessionMonitorInterface, SessionState, SessionStateCallback
+from logger import logger
+
+LOGON_UI_PROCESS_NAME = "LogonUI.exe"
+
+
+def find_logon_ui_pid() -> int | None:
+    """scan the process table and return the PID of the LogonUI, None if the session is not locked"""
+
+    for proc in psutil.process_iter(["name"]):
+        if proc.info["name"] == LOGON_UI_PROCESS_NAME:
+            return int(proc.pid)
+
+    return None
+
+
+def is_logon_ui(pid: int) -> bool:
+    """return whether the process with the given PID is still the LogonUI"""
+
+    try:
+        return bool(psutil.Process(pid).name() == LOGON_UI_PROCESS_NAME)
+    except psutil.Error:
+        return False
+
+
+class PollingSessionMonitor(SessionMonitorInterface):
+    """Detect the lock screen by looking for the LogonUI process periodically.
+
+    The PID of the LogonUI is cached and only that process is checked while it is alive.
+    The process table is scanned at most once per scan interval to find a new LogonUI.
+    """
+
+    def __init__(self, interval_secs: float = 1, scan_interval_secs: float = 5) -> None:
+        self._interval_secs = interval_secs
+        self._scan_interval_secs = scan_interval_secs
+
+        self._logon_ui_pid: int | None = None
+        self._scanned_at: float | None = None
+        self._is_locked = False
+
+        self._thread = BackgroundThread()
+
+    @property
+    def is_locked(self) -> bool:
+        return self._is_locked
+
+    def start(self, callback: SessionStateCallback) -> None:
+        self._is_locked = self._check()
+
+        self._thread.start(self._poll, callback)
+
+    def stop(self) -> None:
+        self._thread.stop()
+
+    def _check(self) -> bool:
+        if self._logon_ui_pid is not None and is_logon_ui(self._logon_ui_pid):
+            return True
+        self._logon_ui_pid = None
+
+        now = time.monotonic()
+        if self._scanned_at is not None and now - self._scanned_at < self._scan_interval_secs:
+            return False  # rate limited, assume it is still unlocked
+
+        self._scanned_at = now
+        self._logon_ui_pid = find_logon_ui_pid()
+        return self._logon_ui_pid is not None
+
+    def _poll(self, callback: SessionStateCallback) -> None:
+        while not self._thread.stop_event.wait(self._interval_secs):
+            is_locked = self._check()
+            if is_locked == self._is_locked:
+                continue
+
+            self._is_locked = is_locked
+            try:
+                callback(SessionState.LOCKED if is_locked else SessionState.UNLOCKED)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Session state callback failed")
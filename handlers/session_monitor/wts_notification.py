@@ -0,0 +1,110 @@
+"""Detect the lock screen with the help of the session change notifications, without polling"""
+
+import ctypes
+from ctypes import wintypes
+from typing import Any, Callable
+
+from handlers.message_loop import MessageLoopThread
+from handlers.session_monitor.base import SessionMonitorInterface, SessionState, SessionStateCallback
+from handlers.session_monitor.polling import find_logon_ui_pid
+from logger import logger
+
+WM_WTSSESSION_CHANGE = 0x02B1
+WTS_SESSION_LOCK = 0x7
+WTS_SESSION_UNLOCK = 0x8
+NOTIFY_FOR_THIS_SESSION = 0
+HWND_MESSAGE = -3
+
+
+# the prototype is created on start, WINFUNCTYPE is only available on Windows and the module must be importable anywhere
+def _wnd_proc_type() -> Any:
+    return ctypes.WINFUNCTYPE(ctypes.c_ssize_t, wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+
+class _WNDCLASSW(ctypes.Structure):  # pylint: disable=too-few-public-methods
+    _fields_ = [
+        ("style", wintypes.UINT),
+        ("lpfnWndProc", ctypes.c_void_p),
+        ("cbClsExtra", ctypes.c_int),
+        ("cbWndExtra", ctypes.c_int),
+        ("hInstance", wintypes.HINSTANCE),
+        ("hIcon", wintypes.HICON),
+        ("hCursor", wintypes.HANDLE),
+        ("hbrBackground", wintypes.HBRUSH),
+        ("lpszMenuName", wintypes.LPCWSTR),
+        ("lpszClassName", wintypes.LPCWSTR),
+    ]
+
+
+class WTSSessionMonitor(SessionMonitorInterface):
+    """Detect the lock screen with the help of the session change notifications, without polling.
+    A message-only window and its message loop live in a dedicated thread."""
+
+    CLASS_NAME = "SecurityBypassSessionMonitor"
+
+    def __init__(self) -> None:
+        self._callback: SessionStateCallback | None = None
+        self._is_locked = False
+        self._loop = MessageLoopThread()
+
+        # keep a reference to the C callback, otherwise it is garbage collected while the window is alive
+        self._wnd_proc: Any = None
+
+    @property
+    def is_locked(self) -> bool:
+        return self._is_locked
+
+    def start(self, callback: SessionStateCallback) -> None:
+        self._callback = callback
+        if self._wnd_proc is None:
+            self._wnd_proc = _wnd_proc_type()(self._on_message)
+        # the notifications only tell the changes, the initial state is checked once
+        self._is_locked = find_logon_ui_pid() is not None
+
+        self._loop.start(self._create_window)
+
+    def stop(self) -> None:
+        self._loop.stop()
+
+    def _create_window(self) -> Callable[[], None]:
+        user32 = ctypes.windll.user32
+        ctypes.windll.kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+        h_instance = ctypes.windll.kernel32.GetModuleHandleW(None)
+
+        window_class = _WNDCLASSW(
+            lpfnWndProc=ctypes.cast(self._wnd_proc, ctypes.c_void_p), hInstance=h_instance, lpszClassName=self.CLASS_NAME
+        )
+        user32.RegisterClassW(ctypes.byref(window_class))  # fails if already registered, which is fine
+
+        user32.CreateWindowExW.restype = wintypes.HWND
+        hwnd = user32.CreateWindowExW(
+            0, self.CLASS_NAME, self.CLASS_NAME, 0, 0, 0, 0, 0, wintypes.HWND(HWND_MESSAGE), None, wintypes.HINSTANCE(h_instance), None
+        )
+        if not hwnd or not ctypes.windll.wtsapi32.WTSRegisterSessionNotification(wintypes.HWND(hwnd), NOTIFY_FOR_THIS_SESSION):
+            error = ctypes.WinError()
+            if hwnd:
+                user32.DestroyWindow(wintypes.HWND(hwnd))
+            raise error
+
+        def _destroy_window() -> None:
+            ctypes.windll.wtsapi32.WTSUnRegisterSessionNotification(wintypes.HWND(hwnd))
+            user32.DestroyWindow(wintypes.HWND(hwnd))
+
+        return _destroy_window
+
+    def _on_message(self, hwnd: int, message: int, w_param: int, l_param: int) -> int:
+        if message == WM_WTSSESSION_CHANGE and w_param in (WTS_SESSION_LOCK, WTS_SESSION_UNLOCK):
+            self._is_locked = w_param == WTS_SESSION_LOCK
+            try:
+                if self._callback is not None:
+                    self._callback(SessionState.LOCKED if self._is_locked else SessionState.UNLOCKED)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # never let an exception escape into the window procedure, it is called by the OS
+                logger.exception("Session state callback failed")
+            return 0
+
+        return int(
+            ctypes.windll.user32.DefWindowProcW(
+                wintypes.HWND(hwnd), wintypes.UINT(message), wintypes.WPARAM(w_param), wintypes.LPARAM(l_param)
+            )
+        )
@@ -0,0 +1,60 @@
+"""Base classes for the window event sources"""
+
+import abc
+import enum
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from handlers.fallback import FallbackController
+
+
+class WindowEventType(enum.Enum):
+    """Types of the top-level window events"""
+
+    CREATED = enum.auto()
+    TITLE_CHANGED = enum.auto()
+    DESTROYED = enum.auto()
+
+
+@dataclass(frozen=True)
+class WindowEvent:
+    """A change on a top-level window"""
+
+    event_type: WindowEventType
+    hwnd: int
+    title: str
+    # perf_counter timestamp of the moment the event is detected, used to measure the handling latency
+    detected_at: float = field(default_factory=time.perf_counter)
+
+
+WindowEventCallback = Callable[[WindowEvent], None]
+
+
+class WindowEventSourceInterface(abc.ABC):
+    """Interface class for the window event sources"""
+
+    @abc.abstractmethod
+    def start(self, callback: WindowEventCallback) -> None:
+        """Start delivering the window events to the given callback. Must not block."""
+
+    @abc.abstractmethod
+    def stop(self) -> None:
+        """Stop delivering the window events"""
+
+    @property
+    @abc.abstractmethod
+    def is_event_driven(self) -> bool:
+        """return the information that the source is notified by the OS instead of polling"""
+
+
+class WindowEventSourceController(FallbackController[WindowEventSourceInterface], WindowEventSourceInterface):
+    """Controller class for the window event sources. Falls back to the
+    given fallback source if the primary one cannot be started."""
+
+    def start(self, callback: WindowEventCallback) -> None:
+        self._start_handler(lambda source: source.start(callback))
+
+    @property
+    def is_event_driven(self) -> bool:
+        return self._active is not None and self._active.is_event_driven
@@ -0,0 +1,83 @@
+"""A scriptable window event source. Does not depend on any OS specific API,
+allows to drive and time the whole detection pipeline without real windows."""
+
+import threading
+import time
+from typing import Iterable
+
+from handlers.window_events.base import WindowEvent, WindowEventCallback, WindowEventSourceInterface, WindowEventType
+
+
+class FakeWindowEventSource(WindowEventSourceInterface):
+    """A scriptable window event source"""
+
+    def __init__(self) -> None:
+        self._callback: WindowEventCallback | None = None
+        self._windows: dict[int, str] = {}
+        self.emitted: list[WindowEvent] = []
+
+    @property
+    def is_event_driven(self) -> bool:
+        return True
+
+    @property
+    def windows(self) -> dict[int, str]:
+        """return the titles of the currently open fake windows keyed by their hwnd"""
+        return dict(self._windows)
+
+    def start(self, callback: WindowEventCallback) -> None:
+        self._callback = callback
+
+    def stop(self) -> None:
+        self._callback = None
+
+    def emit(self, event: WindowEvent) -> None:
+        """deliver the given event as is"""
+
+        if event.event_type is WindowEventType.DESTROYED:
+            self._windows.pop(event.hwnd, None)
+        else:
+            self._windows[event.hwnd] = event.title
+
+        self.emitted.append(event)
+        if self._callback is not None:
+            self._callback(event)
+
+    def create(self, hwnd: int, title: str) -> WindowEvent:
+        """open a fake window"""
+
+        event = WindowEvent(WindowEventType.CREATED, hwnd, title)
+        self.emit(event)
+        return event
+
+    def retitle(self, hwnd: int, title: str) -> WindowEvent:
+        """change the title of a fake window"""
+
+        event = WindowEvent(WindowEventType.TITLE_CHANGED, hwnd, title)
+        self.emit(event)
+        return event
+
+    def destroy(self, hwnd: int) -> WindowEvent:
+        """close a fake window"""
+
+        event = WindowEvent(WindowEventType.DESTROYED, hwnd, self._windows.get(hwnd, ""))
+        self.emit(event)
+        return event
+
+    def play(self, script: Iterable[tuple[float, WindowEvent]], blocking: bool = True) -> threading.Thread | None:
+        """emit the events in the script, each one after waiting the given delay in seconds.
+        If blocking is False, the script is played in a thread and the thread is returned."""
+
+        def _play() -> None:
+            for delay_secs, event in script:
+                time.sleep(delay_secs)
+                # re-create the event to have a correct detection timestamp
+                self.emit(WindowEvent(event.event_type, event.hwnd, event.title))
+
+        if blocking:
+            _play()
+            return None
+
+        thread = threading.Thread(target=_play, daemon=True)
+        thread.start()
+        return thread
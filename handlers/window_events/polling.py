@@ -0,0 +1,32 @@
+"""Detect the window events by enumerating all windows periodically"""
+
+from common.adaptive_scheduler import AdaptiveScheduler
+from common.window_registry import WindowRegistry
+from handlers.window_events.base import WindowEventCallback, WindowEventSourceInterface
+
+
+class PollingWindowEventSource(WindowEventSourceInterface):
+    """Detect the window events by enumerating all windows periodically.
+    The enumeration is shared with the other consumers of the window registry.
+    The interval is chosen by the scheduler if given, otherwise it is the tick of the registry."""
+
+    def __init__(self, registry: WindowRegistry | None = None, scheduler: AdaptiveScheduler | None = None) -> None:
+        self._registry = registry or WindowRegistry.shared()
+        self._scheduler = scheduler
+        self._callback: WindowEventCallback | None = None
+
+    @property
+    def is_event_driven(self) -> bool:
+        return False
+
+    def start(self, callback: WindowEventCallback) -> None:
+        self._callback = callback
+        # the windows that are opened before starting are reported as created
+        self._registry.subscribe(callback, replay=True)
+        self._registry.start(self._scheduler)
+
+    def stop(self) -> None:
+        if self._callback is not None:
+            self._registry.unsubscribe(self._callback)
+            self._callback = None
+        self._registry.stop()
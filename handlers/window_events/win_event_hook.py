@@ -0,0 +1,156 @@
+"""Detect the window events with the help of the SetWinEventHook, without polling"""
+
+import ctypes
+from ctypes import wintypes
+from typing import Any, Callable
+
+from handlers.message_loop import MessageLoopThread
+from handlers.window_events.base import WindowEvent, WindowEventCallback, WindowEventSourceInterface, WindowEventType
+from logger import logger
+
+EVENT_OBJECT_CREATE = 0x8000
+EVENT_OBJECT_DESTROY = 0x8001
+EVENT_OBJECT_SHOW = 0x8002
+EVENT_OBJECT_NAMECHANGE = 0x800C
+
+WINEVENT_OUTOFCONTEXT = 0x0000
+WINEVENT_SKIPOWNPROCESS = 0x0002
+
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+GA_ROOT = 2
+
+
+# the prototypes are created on start, WINFUNCTYPE is only available on Windows and the module must be importable anywhere
+def _win_event_proc_type() -> Any:
+    return ctypes.WINFUNCTYPE(
+        None,
+        wintypes.HANDLE,  # hWinEventHook
+        wintypes.DWORD,  # event
+        wintypes.HWND,  # hwnd
+        wintypes.LONG,  # idObject
+        wintypes.LONG,  # idChild
+        wintypes.DWORD,  # idEventThread
+        wintypes.DWORD,  # dwmsEventTime
+    )
+
+
+def _enum_windows_proc_type() -> Any:
+    return ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+
+
+class WinEventHookSource(WindowEventSourceInterface):
+    """Detect the window events with the help of the SetWinEventHook, without polling.
+    The hook and its message loop live in a dedicated thread."""
+
+    def __init__(self) -> None:
+        self._callback: WindowEventCallback | None = None
+        self._loop = MessageLoopThread()
+        self._known_windows: dict[int, str] = {}
+
+        # keep a reference to the C callback, otherwise it is garbage collected while the hook is alive
+        self._win_event_proc: Any = None
+
+    @property
+    def is_event_driven(self) -> bool:
+        return True
+
+    def start(self, callback: WindowEventCallback) -> None:
+        self._callback = callback
+        self._known_windows.clear()
+        if self._win_event_proc is None:
+            self._win_event_proc = _win_event_proc_type()(self._on_win_event)
+
+        self._loop.start(self._install_hooks, on_started=self._emit_existing_windows)
+
+    def stop(self) -> None:
+        self._loop.stop()
+
+    def _install_hooks(self) -> Callable[[], None]:
+        user32 = ctypes.windll.user32
+
+        # two separate ranges, the events in between(focus, location change etc.) are way too frequent
+        hooks = [
+            user32.SetWinEventHook(event_min, event_max, 0, self._win_event_proc, 0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS)
+            for event_min, event_max in ((EVENT_OBJECT_CREATE, EVENT_OBJECT_SHOW), (EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE))
+        ]
+
+        def _unhook() -> None:
+            for hook in filter(None, hooks):
+                user32.UnhookWinEvent(hook)
+
+        if not all(hooks):
+            error = ctypes.WinError()
+            _unhook()
+            raise error
+
+        return _unhook
+
+    def _emit_existing_windows(self) -> None:
+        """the windows that are opened before the hook is installed are reported as created"""
+
+        hwnd_s: list[int] = []
+
+        def _collect(hwnd: int, _: int) -> bool:
+            hwnd_s.append(hwnd)
+            return True
+
+        ctypes.windll.user32.EnumWindows(_enum_windows_proc_type()(_collect), 0)
+
+        for hwnd in hwnd_s:
+            self._on_shown(hwnd)
+
+    def _on_win_event(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, _hook: int, event: int, hwnd: int | None, id_object: int, id_child: int, _thread: int, _time: int
+    ) -> None:
+        if hwnd is None or id_object != OBJID_WINDOW or id_child != CHILDID_SELF:
+            return
+
+        try:
+            if event == EVENT_OBJECT_DESTROY:
+                self._on_destroyed(hwnd)
+            elif event in (EVENT_OBJECT_CREATE, EVENT_OBJECT_SHOW, EVENT_OBJECT_NAMECHANGE):
+                self._on_shown(hwnd)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # never let an exception escape into the hook, it is called by the OS
+            logger.exception("Cannot process the window event %s for %s", event, hwnd)
+
+    def _on_shown(self, hwnd: int) -> None:
+        user32 = ctypes.windll.user32
+
+        if user32.GetAncestor(hwnd, GA_ROOT) != hwnd or not user32.IsWindowVisible(hwnd):
+            return  # only the visible top-level windows are interested
+
+        title = _get_window_text(hwnd)
+        try:
+            old_title = self._known_windows[hwnd]
+        except KeyError:
+            self._known_windows[hwnd] = title
+            self._emit(WindowEvent(WindowEventType.CREATED, hwnd, title))
+            return
+
+        if old_title != title:
+            self._known_windows[hwnd] = title
+            self._emit(WindowEvent(WindowEventType.TITLE_CHANGED, hwnd, title))
+
+    def _on_destroyed(self, hwnd: int) -> None:
+        try:
+            title = self._known_windows.pop(hwnd)
+        except KeyError:
+            return
+
+        self._emit(WindowEvent(WindowEventType.DESTROYED, hwnd, title))
+
+    def _emit(self, event: WindowEvent) -> None:
+        if self._callback is not None:
+            self._callback(event)
+
+
+def _get_window_text(hwnd: int) -> str:
+    user32 = ctypes.windll.user32
+
+    length = user32.GetWindowTextLengthW(hwnd)
+    buffer = ctypes.create_unicode_buffer(length + 1)
+    user32.GetWindowTextW(hwnd, buffer, length + 1)
+
+    return buffer.value
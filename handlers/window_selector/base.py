@@ -29,6 +29,12 @@ class WindowSelectorInterface(abc.ABC):
     def supports_thread(self) -> bool:
         """return the information that the class supports running in the thread"""
 
+    def start(self) -> None:
+        """prepare the selector in advance, before the first select call"""
+
+    def stop(self) -> None:
+        """release the resources allocated by the selector"""
+
 
 class WindowSelectorController(WindowSelectorInterface):
     """Controller class for WindowSelector"""
@@ -44,3 +50,11 @@ class WindowSelectorController(WindowSelectorInterface):
     def supports_thread(self) -> bool:
         """return the information that the class supports running in the thread"""
         return self._selector.supports_thread
+
+    def start(self) -> None:
+        """prepare the selector in advance, before the first select call"""
+        self._selector.start()
+
+    def stop(self) -> None:
+        """release the resources allocated by the selector"""
+        self._selector.stop()
@@ -33,4 +33,5 @@ class WindowSelectorCLI(WindowSelectorInterface):
             send_enter=input("Send Enter after selecting? (y/n): ").strip().lower() == "y",
             passkey=w_data.passkey,
             verify_sent=w_data.verify_sent,
+            entry_id=w_data.entry_id,
         )
@@ -55,6 +55,7 @@ class _WindowSelectorGUIHelper:
             send_enter=self._send_enter_checkbox.get(),
             passkey=w_data.passkey,
             verify_sent=w_data.verify_sent,
+            entry_id=w_data.entry_id,
         )
 
     def configure_window(self) -> tuple[tk.Tk, tk.BooleanVar, MultiColumnListbox]:
@@ -131,4 +132,4 @@ class WindowSelectorGUI(WindowSelectorInterface):
 
 
 if __name__ == "__main__":
-    main_execute(_WindowSelectorGUIHelper())
+    main_execute(_WindowSelectorGUIHelper)
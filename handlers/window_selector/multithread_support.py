@@ -2,15 +2,24 @@
 tkinter nor PyQt are supporting the applications that are run in a thread.
 Desired behavior might cause some problems during runtime. This module is
 a helper file to create a subprocess to call the desired functions.
+
+The subprocess serves the requests coming from its stdin and writes the responses
+to its stdout, both as length prefixed frames. It is either started per call or kept
+running as a worker. The data is never passed via command line arguments.
 """
 
-import argparse
 import json
+import struct
 import subprocess
 import sys
-from typing import Protocol, Sequence
+import threading
+from typing import IO, Any, Callable, Protocol, Sequence
 
 from config.config import SelectedWindowProperties, WindowData
+from logger import logger
+
+_FRAME_HEADER = struct.Struct(">I")
+_WORKER_STOP_TIMEOUT_SECS = 5
 
 
 # pylint: disable=too-few-public-methods
@@ -21,55 +30,225 @@ class SupportsSelect(Protocol):
         """protocol function or method called select"""
 
 
-def get_params() -> tuple[int, list[WindowData]]:
-    """require the data parameter and try to get the value of it."""
+def write_frame(stream: IO[bytes], payload: bytes) -> None:
+    """write the payload prefixed with its length and flush the stream"""
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--data", required=True)
-    args = parser.parse_args()
+    stream.write(_FRAME_HEADER.pack(len(payload)) + payload)
+    stream.flush()
 
-    param = json.loads(args.data)
 
-    return param["hwnd"], [WindowData.from_dict(data) for data in param["data"]]
+def _read_exactly(stream: IO[bytes], size: int) -> bytes | None:
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def read_frame(stream: IO[bytes]) -> bytes | None:
+    """read a length prefixed frame, return None if the stream is closed"""
+
+    header = _read_exactly(stream, _FRAME_HEADER.size)
+    if header is None:
+        return None
+
+    (size,) = _FRAME_HEADER.unpack(header)
+    return _read_exactly(stream, size)
 
 
-def main_execute(func_or_method: SupportsSelect) -> None:
-    """execute the given function or method with cli arguments"""
+def _dump_params(window_hwnd: int, windows_data: Sequence[WindowData]) -> bytes:
+    data = {"hwnd": window_hwnd, "data": [window_data.to_dict() for window_data in windows_data]}
+    return json.dumps(data).encode()
+
+
+def _load_params(data: bytes) -> tuple[int, list[WindowData]]:
+    param = json.loads(data)
+    return param["hwnd"], [WindowData.from_dict(data) for data in param["data"]]
+
 
-    hwnd, windows_data = get_params()
-    selected_window = func_or_method.select(hwnd, windows_data)
+def _dump_result(selected_window: SelectedWindowProperties | None) -> bytes:
     to_dump = None
     if selected_window is not None:
         to_dump = {
             "passkey": selected_window.passkey,
             "verify_sent": selected_window.verify_sent,
             "send_enter": selected_window.send_enter,
+            "entry_id": selected_window.entry_id,
         }
 
-    print(json.dumps(to_dump), end="")
+    return json.dumps(to_dump).encode()
 
 
-def dump_params(window_hwnd: int, windows_data: Sequence[WindowData]) -> str:
-    """convert the data to cli argument string"""
+def _load_result(data: bytes) -> SelectedWindowProperties | None:
+    loaded: dict[str, Any] | None = json.loads(data)
+    if loaded is None:
+        return None
+    return SelectedWindowProperties(
+        passkey=loaded["passkey"],
+        verify_sent=loaded["verify_sent"],
+        send_enter=loaded["send_enter"],
+        entry_id=loaded.get("entry_id", ""),
+    )
 
-    data = {"hwnd": window_hwnd, "data": [window_data.to_dict() for window_data in windows_data]}
-    return json.dumps(data).replace('"', '\\"')
+
+def main_execute(factory: Callable[[], SupportsSelect]) -> None:
+    """serve the select requests coming from stdin until it is closed. Each request
+    is handled by a new object created by the given factory."""
+
+    # stdout is reserved for the responses, do not let anything else to write there
+    responses = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    while (request := read_frame(sys.stdin.buffer)) is not None:
+        hwnd, windows_data = _load_params(request)
+        selected_window = factory().select(hwnd, windows_data)
+        write_frame(responses, _dump_result(selected_window))
+
+
+def _log_stderr(stream: IO[bytes]) -> None:
+    # the errors of the subprocess, i.e. a traceback, are not shown anywhere else
+    with stream:
+        for line in stream:
+            logger.warning("Window selector subprocess: %s", line.decode(errors="replace").rstrip())
+
+
+def _start_process(file: str) -> tuple["subprocess.Popen[bytes]", threading.Thread]:
+    """start the file in a subprocess, its stderr is forwarded to the log by the returned thread"""
+
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, file], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    assert process.stderr is not None
+    stderr_thread = threading.Thread(target=_log_stderr, args=(process.stderr,), daemon=True)
+    stderr_thread.start()
+    return process, stderr_thread
 
 
 def thread_execute(file: str, window_hwnd: int, windows_data: Sequence[WindowData]) -> SelectedWindowProperties | None:
     """allow to run this function in the thread and run the actual file with the subprocess"""
 
-    dumped = dump_params(window_hwnd, windows_data)
+    process, stderr_thread = _start_process(file)
+    if process.stdin is None or process.stdout is None:
+        raise ValueError("the subprocess is not started with pipes")
 
     try:
-        data = subprocess.check_output(f'{sys.executable} {file} --data "{dumped}"')
-        loaded = json.loads(data)
-        if loaded is None:
-            return None
-        return SelectedWindowProperties(
-            passkey=loaded["passkey"],
-            verify_sent=loaded["verify_sent"],
-            send_enter=loaded["send_enter"],
-        )
-    except subprocess.CalledProcessError:
+        write_frame(process.stdin, _dump_params(window_hwnd, windows_data))
+        process.stdin.close()  # single request, let the subprocess exit after the response
+        response = read_frame(process.stdout)
+    except OSError:
+        response = None
+    finally:
+        process.stdout.close()
+        if process.wait():
+            logger.warning("The window selector subprocess exited with code %s.", process.returncode)
+        stderr_thread.join()
+
+    if response is None:
         return None
+    return _load_result(response)
+
+
+class SelectorWorker:
+    """a long living subprocess that runs the given file as a worker. It is started once,
+    kept warm for the next requests and restarted automatically if it dies."""
+
+    def __init__(self, file: str) -> None:
+        self._file = file
+        self._process: subprocess.Popen[bytes] | None = None
+        self._stopped = False
+        # held while a request is served, which is as long as the user keeps the picker open
+        self._busy_lock = threading.Lock()
+        # guards the process and the stopped flag, never held while waiting for the worker
+        self._state_lock = threading.Lock()
+
+    def _ensure_started(self) -> "subprocess.Popen[bytes] | None":
+        with self._state_lock:
+            if self._stopped:
+                return None
+
+            if self._process is not None and self._process.poll() is None:
+                return self._process
+
+            if self._process is not None:
+                logger.warning("The selector worker is died with code %s, restarting.", self._process.returncode)
+
+            self._process, _ = _start_process(self._file)
+            return self._process
+
+    def _kill(self, process: "subprocess.Popen[bytes]") -> None:
+        process.kill()
+        if process.wait():
+            logger.warning("The selector worker exited with code %s.", process.returncode)
+
+        with self._state_lock:
+            if self._process is process:
+                self._process = None
+
+    def start(self) -> None:
+        """start the worker in advance, so the first request does not wait for the startup"""
+
+        with self._state_lock:
+            self._stopped = False
+        self._ensure_started()
+
+    def stop(self) -> None:
+        """stop the worker gracefully by closing its input. If a request is being served, i.e. the picker
+        is open, the worker is killed instead of waiting for the user to close it."""
+
+        with self._state_lock:
+            self._stopped = True
+            process, self._process = self._process, None
+        if process is None:
+            return
+
+        if not self._busy_lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            process.kill()
+            process.wait()
+            return
+
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            try:
+                process.wait(_WORKER_STOP_TIMEOUT_SECS)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        finally:
+            self._busy_lock.release()
+
+    def select(self, window_hwnd: int, windows_data: Sequence[WindowData]) -> SelectedWindowProperties | None:
+        """send the request to the worker and wait for the response. If the worker is busy
+        with another request, fallback to a one-shot subprocess to not block the caller."""
+
+        if not self._busy_lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return thread_execute(self._file, window_hwnd, windows_data)
+
+        try:
+            request = _dump_params(window_hwnd, windows_data)
+
+            # retry once with a new worker, if the current one is died
+            for _ in range(2):
+                if (process := self._ensure_started()) is None:
+                    return None  # stopped
+                if process.stdin is None or process.stdout is None:
+                    raise ValueError("the worker is not started with pipes")
+
+                try:
+                    write_frame(process.stdin, request)
+                    response = read_frame(process.stdout)
+                except (OSError, ValueError):  # ValueError: the input is closed by stop
+                    response = None
+
+                if response is not None:
+                    return _load_result(response)
+                if self._stopped:
+                    return None  # killed by stop
+
+                self._kill(process)
+
+            return None
+        finally:
+            self._busy_lock.release()
@@ -17,7 +17,7 @@ from common.tools import focus_window, get_position, get_window_by_hwnd
 from config.config import SelectedWindowProperties, WindowData
 from generated.ui_generated_get_passkey_dialog import Ui_PasskeyDialog  # type: ignore[attr-defined]
 from handlers.window_selector.base import WindowSelectorInterface
-from handlers.window_selector.multithread_support import main_execute, thread_execute
+from handlers.window_selector.multithread_support import SelectorWorker, main_execute
 
 # to get rid of the warning:
 # qt.qpa.window: SetProcessDpiAwarenessContext() failed: The operation completed successfully.
@@ -29,7 +29,8 @@ class _WindowSelectorPyQtGUIHelper:
     """Select the window by using PyQt GUI"""
 
     def __init__(self) -> None:
-        self._app = QtWidgets.QApplication([])
+        # the application is reused when the helper runs in a worker
+        self._app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
         self._main_window = QtWidgets.QMainWindow()
         self._ui = Ui_PasskeyDialog()
 
@@ -57,6 +58,7 @@ class _WindowSelectorPyQtGUIHelper:
             send_enter=self._send_enter,
             passkey=windows_data[self._selected_index].passkey,
             verify_sent=windows_data[self._selected_index].verify_sent,
+            entry_id=windows_data[self._selected_index].entry_id,
         )
 
     def add_item(self, item: str) -> None:
@@ -122,10 +124,22 @@ class _WindowSelectorPyQtGUIHelper:
         self._main_window.show()
         self._app.exec()
 
+        self._timer.stop()
+        self._main_window.close()
+
 
 class WindowSelectorPyQtGUI(WindowSelectorInterface):
     """Select the window by using PyQt GUI"""
 
+    def __init__(self) -> None:
+        self._worker = SelectorWorker(__file__)
+
+    def start(self) -> None:
+        self._worker.start()
+
+    def stop(self) -> None:
+        self._worker.stop()
+
     @property
     def supports_thread(self) -> bool:
         return True
@@ -136,8 +150,8 @@ class WindowSelectorPyQtGUI(WindowSelectorInterface):
 
         # even if the operation runs in main thread, the pyqt gui acts strangely.
         # to overcome this, there is no direct call for _WindowSelectorPyQtGUIHelper.select
-        return thread_execute(__file__, window_hwnd, windows_data)
+        return self._worker.select(window_hwnd, windows_data)
 
 
 if __name__ == "__main__":
-    main_execute(_WindowSelectorPyQtGUIHelper())
+    main_execute(_WindowSelectorPyQtGUIHelper)
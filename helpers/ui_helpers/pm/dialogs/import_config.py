@@ -54,25 +54,27 @@ class ImportConfigDialog(DialogBase[Tuple[bytes, Config], Ui_ImportConfigDialog]
         if not self._is_valid_master_key(master_key, master_key_again):
             return
 
-        with open(file, "rb") as file_fd:
-            data = file_fd.read()
-
         if is_encrypted_file:
             try:
-                data = ConfigManager(file_master_key.encode(DFT_ENCODING)).decrypt(data)
+                config = ConfigManager(file_master_key.encode(DFT_ENCODING)).load_config_file(file)
             except ValueError:
                 Notification.show_error(
                     self._wrapper_widget, "The master key is wrong or file format is invalid", "Wrong Master Key or Invalid File Format"
                 )
                 return
+        else:
+            with open(file, "rb") as file_fd:
+                data = file_fd.read()
 
-        try:
-            self._data = (master_key.encode(DFT_ENCODING), Config.from_json(data))
-        except json.JSONDecodeError:
-            Notification.show_error(
-                self._wrapper_widget, "The file is not a valid credential file", "Invalid File", info="Is it encrypted?"
-            )
-            return
+            try:
+                config = Config.from_json(data)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                Notification.show_error(
+                    self._wrapper_widget, "The file is not a valid credential file", "Invalid File", info="Is it encrypted?"
+                )
+                return
+
+        self._data = (master_key.encode(DFT_ENCODING), config)
 
         self.close()
 
@@ -2,6 +2,7 @@
 
 # pylint: disable=c-extension-no-member
 
+import shutil
 import sys
 from typing import TYPE_CHECKING
 
@@ -54,16 +55,14 @@ class MenuActionHandler:
 
         if result.need_save_encrypted:
             if result.use_same_master_key:
-                with open(CREDENTIALS_FILE, "rb") as credentials_fd:
-                    data = credentials_fd.read()
+                # already encrypted, copy it as is without loading into the memory
+                shutil.copyfile(CREDENTIALS_FILE, result.path)
             else:
                 config = self._manager.get_config()
-                data = ConfigManager(result.master_key.encode(DFT_ENCODING)).encrypt(config.to_json(encode=True))
+                ConfigManager(result.master_key.encode(DFT_ENCODING)).encrypt_file(result.path, config.to_json(encode=True))
         else:
-            data = self._manager.get_config().to_json(encode=True)
-
-        with open(result.path, "wb") as out_file_fd:
-            out_file_fd.write(data)
+            with open(result.path, "wb") as out_file_fd:
+                out_file_fd.write(self._manager.get_config().to_json(encode=True))
 
         Notification.show_info(self._manager.ui.tree, "The configuration exported successfully", "Export Successful")
 
@@ -1,12 +1,50 @@
 """Module for managing configuration files."""
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+from common.atomic_file import atomic_write
 from handlers.authentication.methods import AuthMethod
-from settings import ASK_PASSWORD_ON_LOCK, USER_PREFERENCES_FILE
+from handlers.input_injection.methods import InputInjectionMethod
+from settings import (
+    ASK_PASSWORD_ON_LOCK,
+    BURST_DURATION_SECS,
+    BURST_POLL_INTERVAL_SECS,
+    IDLE_POLL_INTERVAL_SECS,
+    POLL_INTERVAL_SECS,
+    USER_PREFERENCES_FILE,
+)
+
+
+@dataclass
+class PollingPreferences:
+    """The intervals of the adaptive polling."""
+
+    interval_secs: float = POLL_INTERVAL_SECS
+    idle_interval_secs: float = IDLE_POLL_INTERVAL_SECS
+    burst_interval_secs: float = BURST_POLL_INTERVAL_SECS
+    burst_duration_secs: float = BURST_DURATION_SECS
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the data to a dictionary."""
+        return {
+            "interval_secs": self.interval_secs,
+            "idle_interval_secs": self.idle_interval_secs,
+            "burst_interval_secs": self.burst_interval_secs,
+            "burst_duration_secs": self.burst_duration_secs,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PollingPreferences":
+        """Create an instance from a dictionary."""
+        return cls(
+            interval_secs=data.get("interval_secs", POLL_INTERVAL_SECS),
+            idle_interval_secs=data.get("idle_interval_secs", IDLE_POLL_INTERVAL_SECS),
+            burst_interval_secs=data.get("burst_interval_secs", BURST_POLL_INTERVAL_SECS),
+            burst_duration_secs=data.get("burst_duration_secs", BURST_DURATION_SECS),
+        )
 
 
 @dataclass
@@ -18,6 +56,8 @@ class UserPreferences:
     repeated_window_protection: bool = True
     auth_method: AuthMethod = AuthMethod.PASSWORD
     ask_password_on_lock: bool = ASK_PASSWORD_ON_LOCK
+    polling: PollingPreferences = field(default_factory=PollingPreferences)
+    input_injection_method: InputInjectionMethod = InputInjectionMethod.SEND_INPUT
 
     def to_dict(self) -> dict[str, Any]:
         """Convert the data to a dictionary."""
@@ -27,6 +67,8 @@ class UserPreferences:
             "repeated_window_protection": self.repeated_window_protection,
             "auth_method": self.auth_method.value,
             "ask_password_on_lock": self.ask_password_on_lock,
+            "polling": self.polling.to_dict(),
+            "input_injection_method": self.input_injection_method.value,
         }
 
     @classmethod
@@ -38,6 +80,8 @@ class UserPreferences:
             repeated_window_protection=data.get("repeated_window_protection", True),
             auth_method=AuthMethod(data.get("auth_method", AuthMethod.PASSWORD.value)),
             ask_password_on_lock=data.get("ask_password_on_lock", ASK_PASSWORD_ON_LOCK),
+            polling=PollingPreferences.from_dict(data.get("polling", {})),
+            input_injection_method=InputInjectionMethod(data.get("input_injection_method", InputInjectionMethod.SEND_INPUT.value)),
         )
 
 
@@ -54,7 +98,7 @@ class UserPreferencesAccessor:
         :param file_path: Path to the JSON file.
         :param data: Data to be saved.
         """
-        with open(file_path, "w", encoding="utf-8") as f:
+        with atomic_write(file_path, "w", encoding="utf-8") as f:
             json.dump(data.to_dict(), f, indent=4)
 
     @classmethod
@@ -1,45 +1,74 @@
 """Allows you to save passwords and let you to bypass the windows security windows
 by entering the passwords automatically"""
 
+import asyncio
 import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from functools import cache
-from typing import List, NoReturn, Set
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, NoReturn
 
-import pyautogui
-import pyperclip
-from pygetwindow import Win32Window  # type: ignore[import-untyped]
+from pygetwindow import PyGetWindowException, Win32Window  # type: ignore[import-untyped]
 
 from common import exceptions
+from common.adaptive_scheduler import AdaptiveScheduler, user_activity_marker
 from common.auto_key_trigger_manager import AutoKeyTriggerManager
+from common.config_watcher import ConfigWatcher
 from common.exit_codes import ExitCodes
 from common.ignored_window_handler import IgnoredWindowsHandler
+from common.send_verifier import SendVerifier, VerificationStatistics
+from common.title_matcher import TitleMatcherIndex
 from common.tools import (
+    UIASession,
     check_config_file,
     check_single_instance,
     complete_update,
     extract_text_from_window,
+    get_focused_edit_length,
     get_password_length,
+    get_window_class_name,
     get_window_hwnd,
     is_interactive_authentication,
-    is_windows_locked,
     restart_as_admin,
 )
+from common.trigger_scanner import TriggerScanner, is_triggered
+from common.window_dispatcher import DispatcherStatistics, WindowDispatcher
+from common.window_registry import WindowRegistry
+from common.window_text_cache import CacheStatistics, WindowTextCache
 from communication import data_sharing
+from communication.messages import CONFIG_CHANNEL, MASTER_KEY_CHANNEL, ConfigChangedMessage, EntryChangeKind
 from config import ConfigManager
 from config.config import SelectedWindowProperties, WindowData
 from handlers.authentication.base import AuthenticationController
+from handlers.file_watcher.base import FileWatcherController
+from handlers.file_watcher.change_notification import ChangeNotificationFileWatcher
+from handlers.file_watcher.polling import PollingFileWatcher
+from handlers.input_injection.base import InjectionStatistics, InputInjectionController
 from handlers.notification.base import NotificationController
 from handlers.notification.gui import NotificationGUI
+from handlers.session_monitor.base import SessionMonitorController, SessionMonitorInterface, SessionState
+from handlers.session_monitor.polling import PollingSessionMonitor
+from handlers.session_monitor.wts_notification import WTSSessionMonitor
+from handlers.window_events.base import WindowEvent, WindowEventSourceController, WindowEventSourceInterface, WindowEventType
+from handlers.window_events.polling import PollingWindowEventSource
+from handlers.window_events.win_event_hook import WinEventHookSource
 from handlers.window_selector.base import WindowSelectorController
 from handlers.window_selector.pyqt_gui import WindowSelectorPyQtGUI
 from helpers.user_preferences import UserPreferencesAccessor
 from logger import initialize as logger_initialize
 from logger import logger
 from package_builder.registry import PBId, PBRegistry
-from settings import CREDENTIALS_FILE, DEBUG, MAX_KEY_SENT_ATTEMPTS, MIN_SLEEP_SECS_AFTER_KEY_SENT
+from settings import (
+    CONFIG_WATCH_DEBOUNCE_SECS,
+    CREDENTIALS_FILE,
+    DEBUG,
+    MIN_SLEEP_SECS_AFTER_KEY_SENT,
+    SELECT_MAX_WAITING_WINDOWS,
+    SELECT_MAX_WORKERS,
+    USER_PREFERENCES_FILE,
+)
 from updater.helpers import check_for_updates
 
 SLEEP_SECS = 1
@@ -77,35 +106,143 @@ def main() -> None:
     ExitCodes.SUCCESS.exit()
 
 
+@dataclass(frozen=True)
+class WindowMatch:
+    """An open window and the window data that match to its title"""
+
+    hwnd: int
+    title: str
+    windows: list[WindowData]
+    detected_at: float
+
+    @property
+    def priority(self) -> tuple[int, float]:
+        """the windows that can be handled without asking the user come first, then the older ones"""
+        return (0 if any(window_data.auto_key_trigger for window_data in self.windows) else 1, self.detected_at)
+
+
 @dataclass
 class _WindowData:
     windows: List[WindowData] = field(default_factory=list)
-    window_hwnd_s: Set[int] = field(default_factory=set)
+    title_matcher: TitleMatcherIndex = field(default_factory=lambda: TitleMatcherIndex([]))
     ignored_windows_handler: IgnoredWindowsHandler = field(default_factory=IgnoredWindowsHandler)
     auto_key_trigger_manager: AutoKeyTriggerManager = field(default_factory=AutoKeyTriggerManager)
+    window_text_cache: WindowTextCache = field(default_factory=WindowTextCache)
+    # the passkeys are not kept in the memory, they are read via the manager when a window is selected
+    config_manager: ConfigManager | None = None
 
 
 class SecurityBypass:
     """Allows you to save passwords and let you to bypass the windows security windows
     by entering the passwords automatically"""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        window_event_source: WindowEventSourceInterface | None = None,
+        session_monitor: SessionMonitorInterface | None = None,
+        input_injector: InputInjectionController | None = None,
+    ) -> None:
         self._is_running = False
+        self._stop_event = threading.Event()
         self.__key: bytes | None = None
 
-        self._credential_file_modified_time = 0.0
         self._window_data = _WindowData()
 
-        key_tracker = data_sharing.Informer(data_sharing.KEY_TRACKER_PORT)
-        key_tracker.add_callback(self._on_master_key_change)
-        key_tracker.start_server()
+        # backs off the polling while the user is idle, polls fast after a new window or a failed send
+        self._scheduler = AdaptiveScheduler(activity_probe=user_activity_marker)
+        self._configure_scheduler()
+
+        # the OS notifies the window changes, polling is only used if the hook cannot be installed
+        self._window_event_source = window_event_source or WindowEventSourceController(
+            WinEventHookSource(), fallback=PollingWindowEventSource(scheduler=self._scheduler)
+        )
+        # the session changes are notified by the OS as well, the process table is scanned only as a fallback
+        self._session_monitor = session_monitor or SessionMonitorController(WTSSessionMonitor(), fallback=PollingSessionMonitor())
+        # the event loop owns the events, the config reload and the ipc. The blocking calls run on a
+        # single worker, so they do not block the loop and are still handled in the order of the events.
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopped: asyncio.Event | None = None
+        self._window_events: asyncio.Queue[WindowEvent | SessionState] = asyncio.Queue()
+        self._blocking_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="security-bypass")
+        # the selections run on a bounded pool, one at a time per window
+        self._dispatcher = WindowDispatcher(self._select, SELECT_MAX_WORKERS, SELECT_MAX_WAITING_WINDOWS)
+        # types the passkeys, the preferred backend falls back to the others on the windows it does not work
+        self._input_injector = input_injector or UserPreferencesAccessor.get().input_injection_method.create_controller()
+        # waits until the typed passkey is arrived instead of sleeping a fixed time
+        self._send_verifier = SendVerifier()
+        # the window events that are received while waiting for the authentication after the lock
+        self._deferred_window_events: list[WindowEvent] = []
+
+        # the config files are reloaded as soon as their content is changed
+        self._config_watcher = ConfigWatcher(
+            [CREDENTIALS_FILE, USER_PREFERENCES_FILE],
+            FileWatcherController(ChangeNotificationFileWatcher(), fallback=PollingFileWatcher()),
+            CONFIG_WATCH_DEBOUNCE_SECS,
+        )
+        # served by the event loop once started
+        self._key_tracker = data_sharing.Informer(data_sharing.KEY_TRACKER_PORT)
+        self._key_tracker.add_callback(self._on_master_key_change, channel=MASTER_KEY_CHANNEL)
+        self._key_tracker.add_callback(self._on_config_changed, channel=CONFIG_CHANNEL)
 
         PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController).mark_started()
 
-    def _on_master_key_change(self, data: bytes) -> None:
-        self.__key = data
+    def _on_master_key_change(self, frame: data_sharing.Frame) -> None:
+        """called by the key tracker in the event loop"""
+
+        self.__key = frame.payload
         logger.info("Master key has been changed.")
 
+    def _on_config_changed(self, frame: data_sharing.Frame) -> None:
+        """called by the key tracker in the event loop"""
+
+        try:
+            message = ConfigChangedMessage.from_bytes(frame.payload)
+        except ValueError:
+            logger.warning("A malformed config changed message is received.")
+            return
+        # in the order of the other blocking calls, i.e. a reload that is already started
+        future = asyncio.get_running_loop().run_in_executor(self._blocking_executor, self._apply_config_changes, message)
+        future.add_done_callback(self._on_config_changes_applied)
+
+    @staticmethod
+    def _on_config_changes_applied(future: "asyncio.Future[None]") -> None:
+        """nobody awaits the applying, so its failure is logged here"""
+
+        if not future.cancelled() and (error := future.exception()) is not None:
+            logger.error("The config changes cannot be applied: %s", error, exc_info=error)
+
+    def _apply_config_changes(self, message: ConfigChangedMessage) -> None:
+        """apply the changes that are published by the password manager, only the changed entries are read"""
+
+        config_manager = self._window_data.config_manager
+        if config_manager is None:
+            return
+
+        requested = {change.entry_id for change in message.changes if change.kind is not EntryChangeKind.REMOVED}
+        try:
+            changed = config_manager.get_windows(requested)
+        except (ValueError, OSError) as error:
+            logger.warning("The config changes cannot be applied, reloading the whole config: %s", error)
+            self._config_watcher.invalidate(CREDENTIALS_FILE)
+            self._config_watcher.notify()
+            return
+
+        # the entries that are removed in the meantime are not returned
+        removed = {change.entry_id for change in message.changes if change.kind is EntryChangeKind.REMOVED} | (requested - changed.keys())
+
+        windows = [changed.pop(window.entry_id, window) for window in self._window_data.windows if window.entry_id not in removed]
+        windows.extend(changed.values())  # the added ones
+
+        self._window_data.windows = windows
+        self._window_data.title_matcher = TitleMatcherIndex(windows)
+        # the texts may be extracted partially based on the old triggers
+        self._window_data.window_text_cache.clear()
+
+        if message.digest:
+            # the change is applied, the file watcher does not need to reload it
+            self._config_watcher.accept(CREDENTIALS_FILE, message.digest)
+        logger.info("%d config changes have been applied.", len(message.changes))
+
     def _exit(self, exit_code: ExitCodes) -> NoReturn:
         logger.debug("Exiting the application.")
         self._is_running = False
@@ -128,69 +265,119 @@ class SecurityBypass:
         if not isinstance(self.__key, bytes):
             raise exceptions.WrongMasterKeyFormat(self.__key.__class__.__name__)
 
+        # reuse the manager to not derive the key again on each reload
+        config_manager = self._window_data.config_manager
+        if config_manager is None or not config_manager.is_master_key(self.__key):
+            config_manager = ConfigManager(key=self.__key)
+
         try:
-            self._window_data.windows = ConfigManager(key=self.__key).get_config().windows
+            windows = config_manager.get_config(lazy=True).windows
         except ValueError as exc:
             raise exceptions.WrongMasterKeyError() from exc
 
-        self._credential_file_modified_time = CREDENTIALS_FILE.stat().st_mtime
+        self._window_data.config_manager = config_manager
+        self._window_data.windows = windows
+        self._window_data.title_matcher = TitleMatcherIndex(windows)
+        # the texts may be extracted partially based on the old triggers
+        self._window_data.window_text_cache.clear()
+
         logger.info("Config file has been loaded successfully.")
 
-    def _sleep(self, secs: int = 0) -> None:
+    def _sleep(self, secs: float = 0) -> None:
         if secs == 0:
             secs = SLEEP_SECS
         elif secs < 0:
             raise ValueError("Time travel did not invent yet!")
 
-        sleep_secs = 0
-        while sleep_secs < secs and self._is_running:
-            sleep_secs += 1
-            time.sleep(1)
+        # wakes up immediately if the application is stopped
+        self._stop_event.wait(secs)
+
+    def _configure_scheduler(self) -> None:
+        polling = UserPreferencesAccessor.get().polling
+        try:
+            self._scheduler.configure(
+                polling.interval_secs, polling.idle_interval_secs, polling.burst_interval_secs, polling.burst_duration_secs
+            )
+        except ValueError as error:
+            logger.error("The polling intervals in the user preferences are ignored: %s", error)
+
+    def _post(self, event: WindowEvent | SessionState) -> None:
+        """pass the event to the event loop, can be called from any thread"""
 
-    def _handle_windows_lock(self) -> None:
-        if not is_windows_locked():
+        if self._loop is None:
             return
 
-        while is_windows_locked():
-            time.sleep(1)
+        try:
+            self._loop.call_soon_threadsafe(self._window_events.put_nowait, event)
+        except RuntimeError:
+            pass  # the loop is closed, the application is stopped
+
+    async def _run_blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """run the blocking call on the worker without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self._blocking_executor, func, *args)
+
+    def _on_session_state(self, state: SessionState) -> None:
+        """called by the session monitor, possibly from another thread"""
+        self._post(state)
+
+    def _is_waiting_for_unlock(self) -> bool:
+        return self._session_monitor.is_locked and UserPreferencesAccessor.get().ask_password_on_lock
+
+    def _handle_session_state(self, state: SessionState) -> None:
+        logger.info("Windows is %s.", state.name.lower())
+        if state is SessionState.LOCKED or not UserPreferencesAccessor.get().ask_password_on_lock:
+            return
 
         PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController).warning("Windows is locked. Authentication is required.")
         self.__key = None
         self._load_config()
 
-    def _reload_config_in_bg(self) -> None:
-        while self._is_running:
-            self._reload_if_required()
-            time.sleep(1)
+        deferred_window_events, self._deferred_window_events = self._deferred_window_events, []
+        self._handle_window_events(deferred_window_events)
 
-    def _reload_if_required(self) -> None:
-        credential_file_modified_time = CREDENTIALS_FILE.stat().st_mtime
-        if credential_file_modified_time != self._credential_file_modified_time:
-            logger.debug("Config file has been modified. Reloading the config.")
+    async def _reload_config_on_change(self) -> None:
+        async for changed in self._config_watcher.changes():
+            if not await self._run_blocking(self._reload_config, changed):
+                # retry a while later even if the file is not changed again
+                self._config_watcher.invalidate(CREDENTIALS_FILE)
+                asyncio.get_running_loop().call_later(SLEEP_SECS, self._config_watcher.notify)
+
+    def _reload_config(self, changed: set[Path]) -> bool:
+        """reload the changed config files, return False if they could not be loaded"""
+
+        if USER_PREFERENCES_FILE in changed:
+            logger.debug("User preferences have been modified. Reloading the preferences.")
             UserPreferencesAccessor.load()
+            self._configure_scheduler()
+
+        if CREDENTIALS_FILE in changed:
+            logger.debug("Config file has been modified. Reloading the config.")
             try:
                 self._load_config()
             except exceptions.WrongMasterKeyError:
                 # this case should not happen. In case if happens for some reason,
-                # let's try to reload the config again in next cycle of background loader.
-                logger.error("Master key is incorrect. Trying to reload the config in the next cycle.")
-                return
-            self._credential_file_modified_time = credential_file_modified_time
+                # let's try to reload the config again a while later.
+                logger.error("Master key is incorrect. Trying to reload the config later.")
+                return False
             logger.info("Config file has been reloaded successfully.")
 
+        return True
+
+    def _extract_text_from_window_cached(self, window_hwnd: int, title: str, windows: list[WindowData]) -> str:
+        # stop walking the window once the rest of the text cannot change which triggers match
+        return self._window_data.window_text_cache.get(
+            window_hwnd,
+            title,
+            lambda hwnd: extract_text_from_window(hwnd, stop_when=TriggerScanner(windows).feed),
+        )
+
     @staticmethod
-    @cache
-    def _extract_text_from_window_cached(window_hwnd: int) -> str:
-        return extract_text_from_window(window_hwnd)
-
-    def _auto_detect_passkey(self, window_hwnd: int, windows: list[WindowData]) -> SelectedWindowProperties | None:
-        text = self._extract_text_from_window_cached(window_hwnd)
-        auto_detected = [
-            window_data
-            for window_data in windows
-            if (window_data.auto_key_trigger_pattern is not None and window_data.auto_key_trigger_pattern.match(text))
-            or (window_data.auto_key_trigger and window_data.auto_key_trigger in text)
-        ]
+    def _get_triggered(text: str, windows: list[WindowData]) -> list[WindowData]:
+        return [window_data for window_data in windows if is_triggered(window_data, text)]
+
+    def _auto_detect_passkey(self, window: Win32Window, windows: list[WindowData]) -> SelectedWindowProperties | None:
+        text = self._extract_text_from_window_cached(get_window_hwnd(window), window.title, windows)
+        auto_detected = self._get_triggered(text, windows)
 
         notification_controller = PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController)
 
@@ -217,7 +404,12 @@ class SecurityBypass:
                     return None
             else:
                 self._window_data.auto_key_trigger_manager.add_triggered(auto_detected[0])
-            return SelectedWindowProperties(passkey=auto_detected[0].passkey, send_enter=True, verify_sent=auto_detected[0].verify_sent)
+            return SelectedWindowProperties(
+                passkey=auto_detected[0].passkey,
+                send_enter=True,
+                verify_sent=auto_detected[0].verify_sent,
+                entry_id=auto_detected[0].entry_id,
+            )
 
         if len(auto_detected) > 1:
             self._set_temp_timeout()
@@ -227,52 +419,176 @@ class SecurityBypass:
             )
         return None
 
-    def _select(self) -> None:
-        window, windows = self.filter_windows()
-        if window is None or not windows:
-            return  # no matching window found
+    def _on_window_event(self, event: WindowEvent) -> None:
+        """called by the window event source, possibly from another thread"""
+
+        if self._window_event_source.is_event_driven:
+            # keep the shared snapshot up to date between the enumerations
+            WindowRegistry.shared().apply(event)
+        self._post(event)
+
+    def _drain_events(self) -> list[WindowEvent | SessionState]:
+        """return the events that are already in the queue without waiting"""
 
-        window_hwnd = get_window_hwnd(window)
-        if window_hwnd in self._window_data.window_hwnd_s:
-            return  # already processing
+        events: list[WindowEvent | SessionState] = []
+        while True:
+            try:
+                events.append(self._window_events.get_nowait())
+            except asyncio.QueueEmpty:
+                return events
+
+    def _handle_window_events(self, events: list[WindowEvent]) -> None:
+        """match all windows in the events at once and dispatch them in the priority order"""
+
+        latest_events: dict[int, WindowEvent] = {}
+        for event in events:
+            if event.event_type is WindowEventType.DESTROYED:
+                self._window_data.window_text_cache.evict(event.hwnd)
+                UIASession.shared().invalidate(event.hwnd)
+                self._window_data.ignored_windows_handler.forget(event.hwnd)
+                latest_events.pop(event.hwnd, None)
+            else:
+                latest_events[event.hwnd] = event
+
+        matches = sorted(self.match_windows(latest_events.values()), key=lambda match: match.priority)
+        if not matches:
+            return  # no matching window data found
+
+        supports_thread = PBRegistry.get_typed(PBId.SELECT_WINDOW, WindowSelectorController).supports_thread
+        for match in matches:
+            logger.debug("Window '%s' is matched in %.1f ms.", match.title, (time.perf_counter() - match.detected_at) * 1000)
 
+            if supports_thread:
+                self._dispatcher.dispatch(match.hwnd, match.windows)
+            else:
+                self._select(match.hwnd, match.windows)
+
+    def _select(self, window_hwnd: int, windows: list[WindowData]) -> None:
         if self._window_data.ignored_windows_handler.is_ignored(window_hwnd):
             return
 
-        self._window_data.window_hwnd_s.add(window_hwnd)
-        if (selected_window := self._auto_detect_passkey(window_hwnd, windows)) is None:
+        try:
+            window = Win32Window(window_hwnd)
+        except PyGetWindowException:
+            return  # the window is closed in the meantime
+
+        if (selected_window := self._auto_detect_passkey(window, windows)) is None:
             selected_window = PBRegistry.get_typed(PBId.SELECT_WINDOW, WindowSelectorController).select(window_hwnd, windows)
 
+        sent = False
         if selected_window is None:
             self._window_data.ignored_windows_handler.ignore(window)
-        else:
-            self.send_keys(window, selected_window)
+        elif self._resolve_passkey(selected_window, windows):
+            if not self.send_keys(window, selected_window):
+                self._scheduler.burst()  # check the window again soon
+            sent = True
             # Do not sleep less than `MIN_SLEEP_SECS_AFTER_KEY_SENT` seconds if a key is sent
             if SLEEP_SECS < MIN_SLEEP_SECS_AFTER_KEY_SENT:
                 self._sleep(MIN_SLEEP_SECS_AFTER_KEY_SENT)
 
-        self._window_data.window_hwnd_s.remove(window_hwnd)
+        if sent:
+            # the window is still there if the key did not help, check it again as the polling did.
+            # it is handled by the dispatcher once this one is completed.
+            # the title of a closed window is empty, which does not match anything.
+            self._on_window_event(WindowEvent(WindowEventType.TITLE_CHANGED, window_hwnd, window.title))
 
-    def _start(self) -> None:
-        self._is_running = True
+    def _resolve_passkey(self, selected_window: SelectedWindowProperties, windows: list[WindowData]) -> bool:
+        """decrypt the passkey of the selected entry, only the selected one is decrypted"""
 
-        PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController).info("The application has been started.")
-        threading.Thread(target=self._reload_config_in_bg, daemon=True).start()
+        config_manager = self._window_data.config_manager
+        window_data = next((window_data for window_data in windows if window_data.entry_id == selected_window.entry_id), None)
+        if config_manager is None or window_data is None:
+            return True  # not loaded lazily, the passkey is already there
 
-        while self._is_running:
-            if UserPreferencesAccessor.get().ask_password_on_lock:
-                self._handle_windows_lock()
+        try:
+            selected_window.passkey = config_manager.get_passkey(window_data)
+        except ValueError:
+            logger.error("The passkey of the selected entry could not be read.")
+            PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController).error(
+                "The passkey could not be read from the config file. Please try again."
+            )
+            return False
+
+        return True
+
+    async def _handle_events(self) -> None:
+        while True:
+            first_event = await self._window_events.get()
+
+            # handle all pending events in one pass, i.e. multiple prompts opened at the same time
+            window_events: list[WindowEvent] = []
+            for event in [first_event, *self._drain_events()]:
+                if isinstance(event, SessionState):
+                    # keep the order of the window events and the session changes
+                    await self._run_blocking(self._handle_window_events, window_events)
+                    window_events = []
+                    await self._run_blocking(self._handle_session_state, event)
+                elif self._is_waiting_for_unlock():
+                    # handled after the authentication
+                    self._deferred_window_events.append(event)
+                else:
+                    window_events.append(event)
+
+            await self._run_blocking(self._handle_window_events, window_events)
+
+    async def _run(self) -> None:
+        # bound to this loop, the application can be started again after it is stopped
+        self._window_events = asyncio.Queue()
+        self._stopped = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        if not self._is_running:
+            return  # stopped before the loop is started
+
+        # start the selector before the first window, to show it without a startup delay
+        PBRegistry.get_typed(PBId.SELECT_WINDOW, WindowSelectorController).start()
+        self._window_event_source.start(self._on_window_event)
+        self._session_monitor.start(self._on_session_state)
+
+        tasks = [
+            asyncio.create_task(self._handle_events(), name="events"),
+            asyncio.create_task(self._reload_config_on_change(), name="config-reload"),
+            asyncio.create_task(self._key_tracker.serve(), name="key-tracker"),
+        ]
+        stopped = asyncio.create_task(self._stopped.wait(), name="stop")
+        try:
+            done, _ = await asyncio.wait([*tasks, stopped], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()  # raise the error of the failed component
+        finally:
+            for task in [*tasks, stopped]:
+                task.cancel()
+            await asyncio.gather(*tasks, stopped, return_exceptions=True)
+
+            self._dispatcher.cancel_waiting()
+            self._session_monitor.stop()
+            self._window_event_source.stop()
+            PBRegistry.get_typed(PBId.SELECT_WINDOW, WindowSelectorController).stop()
+            self._loop = None
 
-            if PBRegistry.get_typed(PBId.SELECT_WINDOW, WindowSelectorController).supports_thread:
-                threading.Thread(target=self._select, daemon=True).start()
-            else:
-                self._select()
+    def _start(self) -> None:
+        self._is_running = True
+        self._stop_event.clear()
 
-            self._sleep()
+        PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController).info("The application has been started.")
+        try:
+            asyncio.run(self._run())
+        finally:
+            self._is_running = False
 
     def start(self) -> None:
         """start the window listener in the background"""
-        self._load_config()
+        # the changes after this point are reloaded
+        self._config_watcher.reset()
+
+        had_key = self.__key is not None
+        try:
+            self._load_config()
+        except exceptions.WrongMasterKeyError:
+            if not had_key:
+                raise
+            # the master key may be changed while the application is stopped, it is not tracked then
+            self.__key = None
+            self._load_config()
 
         notification_controller = PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController)
 
@@ -290,6 +606,15 @@ class SecurityBypass:
     def stop(self, before_quit: bool = False) -> None:
         """stop the window listener"""
         self._is_running = False
+        self._stop_event.set()
+
+        # takes effect immediately, the running tasks are cancelled
+        loop, stopped = self._loop, self._stopped
+        if loop is not None and stopped is not None:
+            try:
+                loop.call_soon_threadsafe(stopped.set)
+            except RuntimeError:
+                pass  # the loop is already closed
         if not before_quit:
             PBRegistry.get_typed(PBId.NOTIFICATION_HANDLER, NotificationController).info("The application has been stopped!")
 
@@ -298,83 +623,97 @@ class SecurityBypass:
         """Check if the window listener is running"""
         return self._is_running
 
+    @property
+    def polling_intervals(self) -> list[float]:
+        """return the recently chosen polling intervals, the oldest first"""
+        return self._scheduler.history
+
+    @property
+    def dispatcher_statistics(self) -> DispatcherStatistics:
+        """return the queue depth and latency statistics of the window selections"""
+        return self._dispatcher.statistics
+
+    @property
+    def input_injection_statistics(self) -> dict[tuple[str, str], InjectionStatistics]:
+        """return the timing statistics of the input injection backends keyed by the backend and the window class"""
+        return self._input_injector.statistics
+
+    @property
+    def send_verification_statistics(self) -> VerificationStatistics:
+        """return the timing statistics of the verified sends"""
+        return self._send_verifier.statistics
+
+    @property
+    def window_text_cache_statistics(self) -> CacheStatistics:
+        """return the hit/miss statistics of the window text cache"""
+        return self._window_data.window_text_cache.statistics
+
     @classmethod
     def focus_window(cls, window: Win32Window) -> None:
         """Bring focus to given window"""
         window.minimize()
         window.maximize()
 
-    @classmethod
-    def clear_keys(cls, password_len: int) -> None:
+    def clear_keys(self, target: str = "") -> None:
         """Clear the keys from the password field"""
-        for _ in range(password_len):
-            pyautogui.press("backspace")
-
-    @classmethod
-    def _send_keys(cls, keys: str) -> None:
-        pyperclip.copy(keys)
-        pyautogui.hotkey("ctrl", "v")
-        time.sleep(0.1)
-
-    @classmethod
-    def _check_sent(cls, window: Win32Window, keys: str) -> bool:
-        password_len = get_password_length(window)
-        if password_len == len(keys):
-            return True
-        cls.clear_keys(password_len)
-        return False
+        self._input_injector.hotkey("ctrl", "a", target=target)
+        self._input_injector.press("delete", target=target)
 
-    @classmethod
-    def send_keys(cls, window: Win32Window, selected_window: SelectedWindowProperties) -> None:
-        """Send given keys to the given window"""
-
-        # backup the current clipboard content
-        current_clipboard = pyperclip.paste()
+    @staticmethod
+    def _get_sent_length(window: Win32Window) -> int | None:
+        # reading the focused control is enough most of the time, the tree is walked only if the focus is elsewhere
+        length = get_focused_edit_length(window)
+        return get_password_length(window) if length is None else length
 
-        for _ in range(MAX_KEY_SENT_ATTEMPTS):
-            cls.focus_window(window)
-            cls._send_keys(selected_window.passkey)
+    def send_keys(self, window: Win32Window, selected_window: SelectedWindowProperties) -> bool:
+        """Send given keys to the given window, return whether they are sent"""
 
-            if not selected_window.verify_sent:
-                break
+        # the statistics of the input injection backends are kept per kind of window
+        target = get_window_class_name(get_window_hwnd(window))
 
-            if cls._check_sent(window, selected_window.passkey):
-                # break the loop if the keys are sent successfully
-                break
-        else:
-            return
+        def _type() -> None:
+            self.focus_window(window)
+            self._input_injector.send_text(selected_window.passkey, target=target)
 
-        # restore the clipboard content
-        pyperclip.copy(current_clipboard)
+        try:
+            if selected_window.verify_sent:
+                sent = self._send_verifier.send(
+                    _type, lambda: self.clear_keys(target), lambda: self._get_sent_length(window), len(selected_window.passkey)
+                )
+                self._input_injector.record_result(target, sent)
+                if not sent:
+                    return False
+            else:
+                _type()
+        except OSError as error:
+            logger.error("Cannot send the keys to the window '%s': %s", window.title, error)
+            return False
 
         if selected_window.send_enter:
-            pyautogui.press("enter")
+            self._input_injector.press("enter", target=target)
 
         logger.info(
-            "Keys sent successfully to the window '%s' %s.",
+            "Keys sent successfully to the window '%s' via %s %s.",
             window.title,
+            self._input_injector.injector_for(target).name,
             "with enter key" if selected_window.send_enter else "without enter key",
         )
+        return True
 
-    def filter_windows(self) -> tuple[Win32Window | None, list[WindowData]]:
-        """Filter the windows by title"""
+    def filter_windows(self, title: str) -> list[WindowData]:
+        """Filter the window data by given window title"""
 
-        try:
-            windows: list[Win32Window] = pyautogui.getAllWindows()  # type: ignore[attr-defined]
-        except OSError:
-            return None, []
-
-        for window in windows:
-            windows = [
-                window_data
-                for window_data in self._window_data.windows
-                if (window_data.title_pattern is not None and window_data.title_pattern.match(window.title))
-                or window_data.title == window.title
-            ]
-            if windows:
-                return window, windows
-
-        return None, []
+        return self._window_data.title_matcher.match(title)
+
+    def match_windows(self, events: Iterable[WindowEvent]) -> list[WindowMatch]:
+        """return all windows in the events that have matching window data, with their matches"""
+
+        matches: list[WindowMatch] = []
+        for event in events:
+            if windows := self.filter_windows(event.title):
+                matches.append(WindowMatch(event.hwnd, event.title, windows, event.detected_at))
+
+        return matches
 
 
 if __name__ == "__main__":
@@ -27,6 +27,43 @@ ENV_NAME_SKIP_UPDATE = "SECURITY_BYPASS_SKIP_UPDATE"
 MIN_SLEEP_SECS_AFTER_KEY_SENT = 3
 MAX_KEY_SENT_ATTEMPTS = 10
 
+# the sent keys are verified by polling the focused edit control until the deadline,
+# the failed attempts are retried after an exponentially growing delay
+SEND_VERIFY_TIMEOUT_SECS = 0.5
+SEND_VERIFY_POLL_INTERVAL_SECS = 0.005
+SEND_RETRY_BACKOFF_SECS = 0.05
+SEND_RETRY_MAX_BACKOFF_SECS = 1.0
+
+# limits for walking the UI Automation tree of a window
+UIA_WALK_MAX_DEPTH = 16
+UIA_WALK_MAX_NODES = 2000
+# the resolved controls of a window are reused until it is destroyed or for a while at most
+UIA_CACHE_TTL_SECS = 10.0
+UIA_CACHE_MAX_WINDOWS = 32
+# the extracted texts of the windows are reused while their title is the same, for a while at most
+WINDOW_TEXT_CACHE_TTL_SECS = 300.0
+WINDOW_TEXT_CACHE_MAX_SIZE = 64
+
+# work factor of the key derivation for the new credential files, see `python -m tests.benchmarks.kdf_benchmark`
+KDF_ALGORITHM = "scrypt"
+KDF_SCRYPT_COST = 2**15
+KDF_PBKDF2_ITERATIONS = 600_000
+
+# the burst of writes of a save is reloaded once, after the config files are quiet for this long
+CONFIG_WATCH_DEBOUNCE_SECS = 0.05
+# the previous credential files are kept next to it as .bak1, .bak2, ... the most recent first
+CREDENTIALS_BACKUP_GENERATIONS = 3
+
+# bounded pool for the window selections, the windows wait in a bounded queue while all workers are busy
+SELECT_MAX_WORKERS = 4
+SELECT_MAX_WAITING_WINDOWS = 32
+
+# the polling intervals, used only if the window events cannot be received from the OS
+POLL_INTERVAL_SECS = 1.0
+IDLE_POLL_INTERVAL_SECS = 5.0
+BURST_POLL_INTERVAL_SECS = 0.1
+BURST_DURATION_SECS = 3.0
+
 ASK_PASSWORD_ON_LOCK = False
 
 DEBUG = True
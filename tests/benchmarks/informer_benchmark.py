@@ -0,0 +1,56 @@
+"""Measure the throughput and the latency of the informer with a persistent and a new connection per message.
+
+Run `python -m tests.benchmarks.informer_benchmark` from the root of the repository.
+"""
+
+import threading
+import time
+
+from communication.data_sharing import DEFAULT_CHANNEL, Frame, Informer, InformerClient
+
+
+def _send_with_new_connection(port: int, payload: bytes) -> None:
+    client = InformerClient(port)
+    try:
+        client.send(Frame(DEFAULT_CHANNEL, 0, payload))
+    finally:
+        client.close()
+
+
+def benchmark(rounds: int = 2000, payload_sizes: tuple[int, ...] = (32, 1024, 64 * 1024)) -> None:
+    """print the message rate, the throughput and the latency percentiles per payload size"""
+
+    received = threading.Semaphore(0)
+    informer = Informer()
+    informer.add_callback(lambda _: received.release())
+    informer.start_server()
+
+    try:
+        for payload_size in payload_sizes:
+            payload = b"x" * payload_size
+
+            for reuse in (True, False):
+                latencies: list[float] = []
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    sent_at = time.perf_counter()
+                    if reuse:
+                        Informer.send_data(payload, informer.port)
+                    else:
+                        _send_with_new_connection(informer.port, payload)
+                    received.acquire()
+                    latencies.append(time.perf_counter() - sent_at)
+                elapsed = time.perf_counter() - start
+
+                latencies.sort()
+                print(
+                    f"{payload_size:>6} bytes, {'persistent' if reuse else 'new':<10} connection: "
+                    f"{rounds / elapsed:10.0f} msg/s, {rounds * payload_size / elapsed / 2**20:8.2f} MiB/s, "
+                    f"latency p50 {latencies[len(latencies) // 2] * 1e6:8.1f} us, p99 {latencies[int(len(latencies) * 0.99)] * 1e6:8.1f} us"
+                )
+    finally:
+        informer.shutdown()
+
+
+if __name__ == "__main__":
+    benchmark()
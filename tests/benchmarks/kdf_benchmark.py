@@ -0,0 +1,43 @@
+"""Measure the key derivation and the encryption with the supported algorithms to tune the work factor.
+
+Run `python -m tests.benchmarks.kdf_benchmark` from the root of the repository.
+"""
+
+import time
+
+from Crypto import Random
+
+from config.config import ConfigManager
+from config.kdf import LEGACY_ALGORITHM, PBKDF2_ALGORITHM, SCRYPT_ALGORITHM, KdfParameters, derive_key
+
+
+def benchmark(rounds: int = 100, data_size: int = 4096) -> None:
+    """print the timings of each algorithm"""
+
+    data = Random.new().read(data_size)
+    for algorithm in (LEGACY_ALGORITHM, PBKDF2_ALGORITHM, SCRYPT_ALGORITHM):
+        parameters = KdfParameters.new(algorithm)
+
+        start = time.perf_counter()
+        key = derive_key(b"benchmark", parameters)
+        derive_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encrypted = [ConfigManager.encrypt_with_key(key, data) for _ in range(rounds)]
+        encrypt_secs = (time.perf_counter() - start) / rounds
+
+        start = time.perf_counter()
+        for item in encrypted:
+            ConfigManager.decrypt_with_key(key, item)
+        decrypt_secs = (time.perf_counter() - start) / rounds
+
+        print(
+            f"{algorithm:<14} {parameters.to_dict()}\n"
+            f"  derive : {derive_secs * 1000:10.3f} ms\n"
+            f"  encrypt: {encrypt_secs * 1000:10.3f} ms per {data_size} bytes\n"
+            f"  decrypt: {decrypt_secs * 1000:10.3f} ms per {data_size} bytes"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
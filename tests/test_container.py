@@ -0,0 +1,48 @@
+"""Read the encrypted containers, including the ones with an invalid header"""
+
+import io
+import json
+from typing import Any
+
+import pytest
+
+# the config package needs the Windows only dependencies
+container = pytest.importorskip("config.container")
+
+KEY = bytes(32)
+
+
+def _write(data: bytes, chunk_size: int = 4) -> bytes:
+    target = io.BytesIO()
+    container.write_container(target, io.BytesIO(data), KEY, {"kdf": None}, chunk_size=chunk_size)
+    return target.getvalue()
+
+
+def _read(data: bytes) -> bytes:
+    return b"".join(container.read_container(io.BytesIO(data), lambda _: KEY))
+
+
+def _with_header(header: Any) -> bytes:
+    raw_header = json.dumps(header).encode()
+    return container._PREAMBLE.pack(container.MAGIC, container.VERSION, len(raw_header)) + raw_header  # pylint: disable=protected-access
+
+
+def test_chunks_are_read_back() -> None:
+    assert _read(_write(b"0123456789")) == b"0123456789"
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        {"cipher": container.CIPHER, "chunk_size": 4},
+        {"cipher": container.CIPHER, "nonce_prefix": "00" * container.NONCE_PREFIX_SIZE},
+        {"cipher": container.CIPHER, "chunk_size": 4, "nonce_prefix": "not hex"},
+        {"cipher": container.CIPHER, "chunk_size": 4, "nonce_prefix": "00"},
+        {"cipher": container.CIPHER, "chunk_size": "4", "nonce_prefix": "00" * container.NONCE_PREFIX_SIZE},
+        {"cipher": container.CIPHER, "chunk_size": 0, "nonce_prefix": "00" * container.NONCE_PREFIX_SIZE},
+        ["not", "an", "object"],
+    ],
+)
+def test_an_invalid_header_raises_value_error(header: Any) -> None:
+    with pytest.raises(ValueError, match="invalid container header"):
+        _read(_with_header(header))
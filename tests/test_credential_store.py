@@ -0,0 +1,66 @@
+"""Read the credential store, including the truncated and corrupt files"""
+
+from pathlib import Path
+
+import pytest
+
+# the config package needs the Windows only dependencies
+store_module = pytest.importorskip("config.store")
+CredentialStore = store_module.CredentialStore
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+def _store(path: Path) -> "CredentialStore":
+    return CredentialStore(path, _identity, _identity)
+
+
+ENTRY_ID = "0123456789abcdef0123456789abcdef"
+
+
+def test_entries_are_read_back(tmp_path: Path) -> None:
+    store = _store(tmp_path / "credentials")
+    store.rewrite({ENTRY_ID: (b"metadata", b"secret")}, header={"kdf": None})
+    store.append({ENTRY_ID: (b"metadata2", b"secret2")})
+
+    reloaded = _store(tmp_path / "credentials")
+    reloaded.load()
+
+    assert reloaded.ids() == [ENTRY_ID]
+    assert reloaded.read_metadata(ENTRY_ID) == b"metadata2"
+    assert reloaded.read_secret(ENTRY_ID) == b"secret2"
+
+
+@pytest.mark.parametrize("size", [5, 9, 12])
+def test_a_truncated_header_raises_value_error(tmp_path: Path, size: int) -> None:
+    path = tmp_path / "credentials"
+    _store(path).rewrite({ENTRY_ID: (b"metadata", b"secret")}, header={"kdf": None})
+    path.write_bytes(path.read_bytes()[:size])
+
+    with pytest.raises(ValueError):
+        _store(path).load()
+
+
+def test_a_torn_record_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "credentials"
+    _store(path).rewrite({ENTRY_ID: (b"metadata", b"secret")}, header={"kdf": None})
+    path.write_bytes(path.read_bytes() + b"\x01" + b"\x00" * 10)
+
+    store = _store(path)
+    store.load()
+
+    assert store.read_metadata(ENTRY_ID) == b"metadata"
+
+
+def test_a_corrupt_record_raises_value_error(tmp_path: Path) -> None:
+    path = tmp_path / "credentials"
+    store = _store(path)
+    store.rewrite({}, header={"kdf": None})
+    # a record whose payload is shorter than its metadata length
+    path.write_bytes(path.read_bytes() + b"\x01" + bytes.fromhex(ENTRY_ID) + b"\x00\x00\x00\x02" + b"\x00\x09")
+
+    store.load()
+    with pytest.raises(ValueError):
+        store.read_metadata(ENTRY_ID)
@@ -0,0 +1,75 @@
+"""Open and close many connections to the informer, it should not keep any thread or connection afterwards"""
+
+import socket
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+# the informer imports the tools, which need the Windows only dependencies
+data_sharing = pytest.importorskip("communication.data_sharing")
+
+CONNECTIONS = 500
+IDLE_SECS = 0.5
+RECEIVE_TIMEOUT_SECS = 2.0
+
+
+@pytest.fixture(name="informer")
+def _informer() -> Iterator["data_sharing.Informer"]:
+    informer = data_sharing.Informer()
+    informer.start_server()
+    try:
+        yield informer
+    finally:
+        informer.shutdown()
+
+
+def _wait_released(informer: "data_sharing.Informer") -> None:
+    # the handlers of the last connections may be still reading the end of the stream
+    deadline = time.monotonic() + data_sharing.SHUTDOWN_TIMEOUT_SECS
+    while informer.connection_count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_closed_connections_are_released_without_extra_threads(informer: "data_sharing.Informer") -> None:
+    received = threading.Semaphore(0)
+    informer.add_callback(lambda _: received.release())
+    threads_before = threading.active_count()
+
+    for index in range(CONNECTIONS):
+        with socket.create_connection((data_sharing.HOST, informer.port)) as sock:
+            if index % 2:
+                # half of them send a frame, the others close right away
+                sock.sendall(data_sharing.encode_frame(data_sharing.Frame(data_sharing.DEFAULT_CHANNEL, 0, b"x")))
+                assert received.acquire(timeout=RECEIVE_TIMEOUT_SECS), "the frame is not received"
+
+    _wait_released(informer)
+
+    assert informer.connection_count == 0, "the closed connections are not released"
+    assert threading.active_count() == threads_before, "the connections are served by extra threads"
+
+
+def test_server_is_idle_without_connections(informer: "data_sharing.Informer") -> None:
+    for _ in range(10):
+        with socket.create_connection((data_sharing.HOST, informer.port)):
+            pass
+    _wait_released(informer)
+
+    cpu_start = time.process_time()
+    time.sleep(IDLE_SECS)
+    idle_cpu_secs = time.process_time() - cpu_start
+
+    assert idle_cpu_secs < IDLE_SECS * 0.1, "the server is busy while there is no connection"
+
+
+def test_shutdown_does_not_wait_for_open_connections(informer: "data_sharing.Informer") -> None:
+    threads_before = threading.active_count()
+
+    with socket.create_connection((data_sharing.HOST, informer.port)):
+        start = time.perf_counter()
+        informer.shutdown()
+        shutdown_secs = time.perf_counter() - start
+
+    assert shutdown_secs < data_sharing.SHUTDOWN_TIMEOUT_SECS, "the shutdown waits for the client to close the connection"
+    assert threading.active_count() == threads_before - 1, "the server thread is not finished"
@@ -0,0 +1,97 @@
+"""Drive the input injection controller with the fake backends"""
+
+import pytest
+
+from handlers.input_injection.base import InputInjectionController
+from handlers.input_injection.fake import FakeInputInjector
+
+TARGET = "Credential Dialog Xaml Host"
+
+
+class _NamedInjector(FakeInputInjector):
+    def __init__(self, name: str, drop_every: int = 0) -> None:
+        super().__init__(drop_every=drop_every)
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+
+class _FailingInjector(_NamedInjector):
+    def send_text(self, text: str) -> None:
+        super().send_text(text)
+        raise OSError("the input is blocked")
+
+
+def test_falls_back_to_the_next_backend_when_one_raises() -> None:
+    failing, working = _FailingInjector("failing"), _NamedInjector("working")
+    controller = InputInjectionController([failing, working])
+
+    controller.send_text("secret", target=TARGET)
+
+    assert working.value == "secret"
+    assert failing.actions == [("text", "secret")]
+    assert controller.statistics[("failing", TARGET)].errors == 1
+    assert controller.statistics[("working", TARGET)].errors == 0
+
+
+def test_raises_when_all_backends_fail() -> None:
+    controller = InputInjectionController([_FailingInjector("first"), _FailingInjector("second")])
+
+    with pytest.raises(OSError):
+        controller.send_text("secret", target=TARGET)
+
+
+def test_unreliable_backend_is_skipped_for_the_target() -> None:
+    lossy, intact = _NamedInjector("lossy", drop_every=2), _NamedInjector("intact")
+    controller = InputInjectionController([lossy, intact])
+
+    # the verification fails twice on the preferred backend
+    for _ in range(2):
+        controller.send_text("secret", target=TARGET)
+        controller.record_result(TARGET, success=False)
+
+    assert controller.injector_for(TARGET) is intact
+    # the other targets are not affected
+    assert controller.injector_for("Notepad") is lossy
+
+    controller.send_text("secret", target=TARGET)
+    controller.record_result(TARGET, success=True)
+
+    assert intact.value == "secret"
+    assert controller.statistics[("intact", TARGET)].verified == 1
+
+
+def test_unreliable_backends_are_used_if_nothing_else_is_left() -> None:
+    only = _NamedInjector("only")
+    controller = InputInjectionController([only])
+
+    for _ in range(2):
+        controller.send_text("secret", target=TARGET)
+        controller.record_result(TARGET, success=False)
+
+    assert controller.injector_for(TARGET) is only
+
+
+def test_statistics_are_kept_per_backend_and_target() -> None:
+    injector = _NamedInjector("injector")
+    controller = InputInjectionController([injector])
+
+    controller.send_text("secret", target=TARGET)
+    controller.hotkey("ctrl", "a", target=TARGET)
+    controller.press("delete", target=TARGET)
+    controller.record_result(TARGET, success=True)
+    controller.send_text("other", target="Notepad")
+
+    statistics = controller.statistics
+    assert set(statistics) == {("injector", TARGET), ("injector", "Notepad")}
+    assert statistics[("injector", TARGET)].calls == 3
+    assert statistics[("injector", TARGET)].verified == 1
+    assert statistics[("injector", "Notepad")].calls == 1
+    assert statistics[("injector", "Notepad")].verified == 0
+    assert statistics[("injector", TARGET)].max_secs <= statistics[("injector", TARGET)].total_secs
+
+    # a copy is returned
+    statistics[("injector", TARGET)].calls = 0
+    assert controller.statistics[("injector", TARGET)].calls == 3
@@ -0,0 +1,189 @@
+"""Drive the window detection of SecurityBypass with the fake window event source"""
+
+# pylint: disable=protected-access
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, Sequence
+
+import pytest
+
+from handlers.input_injection.base import InputInjectionController
+from handlers.input_injection.fake import FakeInputInjector
+from handlers.session_monitor.base import SessionMonitorInterface, SessionStateCallback
+from handlers.window_events.base import WindowEvent, WindowEventSourceController, WindowEventSourceInterface, WindowEventType
+from handlers.window_events.fake import FakeWindowEventSource
+from package_builder.registry import PBId, PBRegistry
+
+# the application and its config need the Windows only dependencies
+security_bypass = pytest.importorskip("security_bypass")
+config = pytest.importorskip("config.config")
+window_selector = pytest.importorskip("handlers.window_selector.base")
+notification_cli = pytest.importorskip("handlers.notification.cli")
+user_preferences = pytest.importorskip("helpers.user_preferences")
+
+# from the event is detected until the window is handed to the selection
+LATENCY_BUDGET_SECS = 0.5
+
+
+class _UnlockedSession(SessionMonitorInterface):
+    @property
+    def is_locked(self) -> bool:
+        return False
+
+    def start(self, callback: SessionStateCallback) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class _Selector(window_selector.WindowSelectorInterface):
+    def __init__(self, supports_thread: bool) -> None:
+        self._supports_thread = supports_thread
+
+    @property
+    def supports_thread(self) -> bool:
+        return self._supports_thread
+
+    def select(self, window_hwnd: int, windows_data: Sequence["config.WindowData"]) -> None:
+        raise AssertionError("the selection is replaced by the test")
+
+
+@dataclass
+class _Selections:
+    """the windows handed to SecurityBypass._select and when"""
+
+    handled: list[tuple[int, list[str], float]] = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, window_hwnd: int, windows: list["config.WindowData"]) -> None:
+        with self.lock:
+            self.handled.append((window_hwnd, [window.name for window in windows], time.perf_counter()))
+
+    def wait(self, count: int, timeout_secs: float = 2.0) -> None:
+        deadline = time.monotonic() + timeout_secs
+        while len(self.handled) < count:
+            assert time.monotonic() < deadline, "the matched windows are not handled in time"
+            time.sleep(0.005)
+
+    @property
+    def windows(self) -> list[tuple[int, list[str]]]:
+        return sorted((window_hwnd, names) for window_hwnd, names, _ in self.handled)
+
+
+@pytest.fixture(name="selections")
+def _selections(monkeypatch: pytest.MonkeyPatch) -> _Selections:
+    """replace the selection, it opens the window and asks the user"""
+
+    selections = _Selections()
+    monkeypatch.setattr(security_bypass.SecurityBypass, "_select", lambda _, window_hwnd, windows: selections.record(window_hwnd, windows))
+    return selections
+
+
+@pytest.fixture(autouse=True)
+def _handlers(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """register the console notifications and the default preferences instead of the user's ones"""
+
+    monkeypatch.setattr(user_preferences.UserPreferencesAccessor, "_USER_PREFERENCES", user_preferences.UserPreferences())
+    PBRegistry.register_override(PBId.NOTIFICATION_HANDLER, security_bypass.NotificationController(notification_cli.NotificationCLI()))
+    PBRegistry.register_override(PBId.SELECT_WINDOW, window_selector.WindowSelectorController(_Selector(supports_thread=True)))
+    try:
+        yield
+    finally:
+        PBRegistry.unregister(PBId.NOTIFICATION_HANDLER)
+        PBRegistry.unregister(PBId.SELECT_WINDOW)
+
+
+def _create_bypass(source: WindowEventSourceInterface) -> "security_bypass.SecurityBypass":
+    bypass = security_bypass.SecurityBypass(
+        window_event_source=source, session_monitor=_UnlockedSession(), input_injector=InputInjectionController([FakeInputInjector()])
+    )
+    windows = [
+        config.WindowData("Windows Security", "uac", "secret", ""),
+        config.WindowData(r"Remote Desktop .*", "rdp", "secret", ""),
+    ]
+    bypass._window_data.windows = windows
+    bypass._window_data.title_matcher = security_bypass.TitleMatcherIndex(windows)
+    return bypass
+
+
+class _EventLoop:
+    """runs the event handling of SecurityBypass in the background, as SecurityBypass._run does"""
+
+    def __init__(self, bypass: "security_bypass.SecurityBypass") -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        bypass._loop = self._loop
+        self._handling = asyncio.run_coroutine_threadsafe(bypass._handle_events(), self._loop)
+
+    def stop(self) -> None:
+        self._handling.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def test_fake_events_are_matched_and_dispatched(selections: _Selections) -> None:
+    source = FakeWindowEventSource()
+    controller = WindowEventSourceController(source)
+    bypass = _create_bypass(controller)
+    loop = _EventLoop(bypass)
+    controller.start(bypass._on_window_event)
+    assert controller.is_event_driven
+
+    try:
+        source.create(1, "Windows Security")
+        source.create(2, "Notepad")
+        source.retitle(2, "Remote Desktop Connection")
+        selections.wait(2)
+        source.destroy(1)
+    finally:
+        controller.stop()
+        loop.stop()
+
+    assert selections.windows == [(1, ["uac"]), (2, ["rdp"])]
+
+    # the latency from the detection of the matching event until the selection is started
+    detected_at = {event.hwnd: event.detected_at for event in source.emitted if event.title != "Notepad"}
+    latencies = [handled_at - detected_at[window_hwnd] for window_hwnd, _, handled_at in selections.handled]
+    assert max(latencies) < LATENCY_BUDGET_SECS, f"the windows are handled in {max(latencies) * 1000:.1f} ms"
+
+    statistics = bypass.dispatcher_statistics
+    assert (statistics.dispatched, statistics.completed) == (2, 2)
+    assert statistics.max_latency_secs <= max(latencies)
+
+
+def test_destroyed_windows_are_not_selected(selections: _Selections) -> None:
+    PBRegistry.register_override(PBId.SELECT_WINDOW, window_selector.WindowSelectorController(_Selector(supports_thread=False)))
+    bypass = _create_bypass(FakeWindowEventSource())
+
+    # the selection runs on the calling thread if the selector does not support the threads
+    bypass._handle_window_events(
+        [
+            WindowEvent(WindowEventType.CREATED, 1, "Windows Security"),
+            WindowEvent(WindowEventType.CREATED, 2, "Remote Desktop Connection"),
+            WindowEvent(WindowEventType.DESTROYED, 1, "Windows Security"),
+        ]
+    )
+
+    assert selections.windows == [(2, ["rdp"])]
+    assert bypass.dispatcher_statistics.dispatched == 0
+
+
+def test_match_windows_keeps_the_detection_time() -> None:
+    bypass = _create_bypass(FakeWindowEventSource())
+    events = [
+        WindowEvent(WindowEventType.CREATED, 1, "Windows Security"),
+        WindowEvent(WindowEventType.CREATED, 2, "Notepad"),
+        WindowEvent(WindowEventType.TITLE_CHANGED, 3, "Remote Desktop Connection"),
+    ]
+
+    matches = bypass.match_windows(events)
+
+    assert [(match.hwnd, [window.name for window in match.windows]) for match in matches] == [(1, ["uac"]), (3, ["rdp"])]
+    assert [match.detected_at for match in matches] == [events[0].detected_at, events[2].detected_at]
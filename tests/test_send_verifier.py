@@ -0,0 +1,128 @@
+"""Type into the fake input injector and verify the sent text"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from common import send_verifier
+from common.send_verifier import SendVerifier
+from handlers.input_injection.fake import FakeInputInjector
+
+PASSKEY = "secret"
+
+
+class _Field:
+    """the fake injector typing into its emulated edit control, as SecurityBypass.send_keys does"""
+
+    def __init__(self, injector: FakeInputInjector) -> None:
+        self.injector = injector
+
+    def type_text(self) -> None:
+        self.injector.send_text(PASSKEY)
+
+    def clear(self) -> None:
+        self.injector.hotkey("ctrl", "a")
+        self.injector.press("delete")
+
+    def probe(self) -> int | None:
+        return len(self.injector.value)
+
+    def send(self, verifier: SendVerifier) -> bool:
+        return verifier.send(self.type_text, self.clear, self.probe, len(PASSKEY))
+
+
+@pytest.fixture(name="sleeps")
+def _sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """record the sleeps of the verifier instead of sleeping"""
+
+    sleeps: list[float] = []
+    monkeypatch.setattr(send_verifier, "time", SimpleNamespace(perf_counter=time.perf_counter, sleep=sleeps.append))
+    return sleeps
+
+
+def test_first_attempt_is_verified() -> None:
+    field = _Field(FakeInputInjector())
+    verifier = SendVerifier(timeout_secs=1, max_attempts=3)
+
+    assert field.send(verifier)
+
+    assert field.injector.value == PASSKEY
+    assert field.injector.actions == [("text", PASSKEY)]
+    statistics = verifier.statistics
+    assert (statistics.sends, statistics.verified, statistics.failed, statistics.attempts, statistics.probes) == (1, 1, 0, 1, 1)
+    assert statistics.last_secs == statistics.total_secs == statistics.max_secs
+
+
+def test_a_slow_control_is_probed_again_instead_of_typed_again() -> None:
+    field = _Field(FakeInputInjector())
+    lengths = iter([None, 2])
+
+    def _lagging_probe() -> int | None:
+        return next(lengths, len(field.injector.value))
+
+    verifier = SendVerifier(timeout_secs=1, poll_interval_secs=0.001, max_attempts=3)
+
+    assert verifier.send(field.type_text, field.clear, _lagging_probe, len(PASSKEY))
+
+    assert field.injector.actions == [("text", PASSKEY)]
+    assert verifier.statistics.probes == 3
+
+
+def test_the_field_is_cleared_before_each_retry(sleeps: list[float]) -> None:
+    # every second character is lost, so no attempt is verified
+    field = _Field(FakeInputInjector(drop_every=2))
+    verifier = SendVerifier(timeout_secs=0, max_attempts=3, backoff_secs=0.1, max_backoff_secs=1)
+
+    assert not field.send(verifier)
+
+    attempt = [("text", PASSKEY), ("hotkey", "ctrl+a"), ("press", "delete")]
+    assert field.injector.actions == attempt * 3
+    assert field.injector.value == ""
+    assert sleeps == pytest.approx([0.1, 0.2])
+
+
+def test_backoff_grows_exponentially_up_to_the_limit() -> None:
+    verifier = SendVerifier(backoff_secs=0.1, max_backoff_secs=0.5)
+
+    assert [verifier.backoff_secs(attempt) for attempt in range(6)] == pytest.approx([0.0, 0.1, 0.2, 0.4, 0.5, 0.5])
+
+
+def test_attempts_are_limited_and_counted(sleeps: list[float]) -> None:
+    field = _Field(FakeInputInjector(drop_every=2))
+    verifier = SendVerifier(timeout_secs=0, max_attempts=4, backoff_secs=0.1, max_backoff_secs=0.3)
+
+    assert not field.send(verifier)
+
+    statistics = verifier.statistics
+    assert (statistics.sends, statistics.verified, statistics.failed, statistics.attempts, statistics.probes) == (1, 0, 1, 4, 4)
+    assert sleeps == pytest.approx([0.1, 0.2, 0.3])
+
+
+def test_statistics_are_accumulated_over_the_sends(sleeps: list[float]) -> None:
+    verifier = SendVerifier(timeout_secs=0, max_attempts=2, backoff_secs=0.1)
+
+    assert _Field(FakeInputInjector()).send(verifier)
+    assert not _Field(FakeInputInjector(drop_every=2)).send(verifier)
+
+    statistics = verifier.statistics
+    assert (statistics.sends, statistics.verified, statistics.failed, statistics.attempts, statistics.probes) == (2, 1, 1, 3, 3)
+    assert statistics.average_secs == pytest.approx(statistics.total_secs / 2)
+    assert sleeps == [0.1]
+
+
+def test_gives_up_waiting_at_the_deadline() -> None:
+    verifier = SendVerifier(timeout_secs=0.05, poll_interval_secs=0.01)
+
+    started_at = time.perf_counter()
+    verified, probes = verifier.wait_for_length(lambda: None, len(PASSKEY))
+
+    assert not verified
+    assert probes >= 2
+    assert time.perf_counter() - started_at >= 0.05
+
+
+def test_stops_waiting_when_more_characters_arrived() -> None:
+    verifier = SendVerifier(timeout_secs=1, poll_interval_secs=0.01)
+
+    assert verifier.wait_for_length(lambda: len(PASSKEY) + 1, len(PASSKEY)) == (False, 1)
@@ -0,0 +1,50 @@
+"""Match the window titles with the title matcher index"""
+
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from common.title_matcher import TitleMatcherIndex, has_numbered_reference
+
+
+def _window(title: str) -> SimpleNamespace:
+    # the fields of config.config.WindowData that the matching uses, the config needs the Windows only dependencies
+    try:
+        title_pattern = re.compile(title)
+    except re.error:
+        title_pattern = None
+    return SimpleNamespace(title=title, title_pattern=title_pattern)
+
+
+@pytest.mark.parametrize(
+    ("pattern", "expected"),
+    [
+        (r"(x)\1", True),
+        (r"(a)?(?(1)b|c)", True),
+        (r"(?P<name>x)(?P=name)", False),
+        (r"a\\1", False),
+        (r"a\\\1", True),
+        (r"(Windows|Remote) Security", False),
+    ],
+)
+def test_numbered_references_are_detected(pattern: str, expected: bool) -> None:
+    assert has_numbered_reference(pattern) is expected
+
+
+def test_back_references_match_as_the_single_pattern() -> None:
+    windows = [_window(r"(x)\1"), _window(r"(y)\1")]
+    index = TitleMatcherIndex(windows)
+
+    for title in ("xx", "yy", "xy"):
+        assert index.match(title) == [window for window in windows if window.title_pattern.match(title)]
+
+
+def test_literal_exact_and_pattern_titles_are_matched_in_order() -> None:
+    windows = [_window("Remote .*"), _window("Windows Security"), _window("Windows"), _window("[")]
+    index = TitleMatcherIndex(windows)
+
+    assert index.match("Windows Security") == windows[1:3]
+    assert index.match("[") == windows[3:]
+    assert index.match("Remote Desktop") == windows[:1]
+    assert not index.match("Notepad")
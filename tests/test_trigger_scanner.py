@@ -0,0 +1,83 @@
+"""Decide the auto key triggers while the text of a window is collected"""
+
+import re
+from types import SimpleNamespace
+
+from common.trigger_scanner import TriggerScanner, is_triggered
+
+
+def _window(auto_key_trigger: str) -> SimpleNamespace:
+    # the fields of config.config.WindowData that the triggers use, the config needs the Windows only dependencies
+    try:
+        pattern = re.compile(auto_key_trigger) if auto_key_trigger else None
+    except re.error:
+        pattern = None
+    return SimpleNamespace(auto_key_trigger=auto_key_trigger, auto_key_trigger_pattern=pattern)
+
+
+def _feed_until_decided(scanner: TriggerScanner, texts: list[str]) -> int:
+    for count, text in enumerate(texts, start=1):
+        if scanner.feed(text):
+            return count
+    return len(texts)
+
+
+def test_a_single_trigger_is_decided_once_it_matches() -> None:
+    texts = ["Windows Security\n", "Enter your PIN\n", "More choices\n", "OK\n"]
+    scanner = TriggerScanner([_window("PIN"), _window("")])
+
+    assert _feed_until_decided(scanner, texts) == 2
+
+
+def test_the_walk_continues_until_a_second_match_is_excluded() -> None:
+    texts = ["Enter your PIN\n", "Other\n", "Enter your password\n", "OK\n"]
+    windows = [_window("PIN"), _window("password")]
+
+    assert _feed_until_decided(TriggerScanner(windows), texts) == 3
+    # both are matched, so the multiple windows warning is shown
+    assert [window for window in windows if is_triggered(window, "".join(texts[:3]))] == windows
+
+
+def test_the_walk_is_not_stopped_while_an_entry_may_still_match() -> None:
+    texts = ["Enter your PIN\n", "Other\n", "OK\n"]
+    scanner = TriggerScanner([_window("PIN"), _window("password")])
+
+    assert _feed_until_decided(scanner, texts) == 3
+    assert not scanner.is_decided
+
+
+def test_a_trigger_split_between_the_texts_is_found() -> None:
+    scanner = TriggerScanner([_window("PIN\ncode")])
+
+    assert not scanner.feed("Enter the PI")
+    assert scanner.feed("N\ncode\n")
+
+
+def test_patterns_are_matched_from_the_start_of_the_whole_text() -> None:
+    texts = ["Windows Security\n", *[f"line {idx}\n" for idx in range(20)]]
+    scanner = TriggerScanner([_window(r"Windows Security\n(.*\n)*line 5\n")])
+
+    count = _feed_until_decided(scanner, texts)
+
+    # the pattern is checked again once the text is doubled, so it is decided later but not too early
+    assert 7 <= count <= len(texts)
+    assert scanner.is_decided
+
+
+def test_nothing_is_decided_without_triggers() -> None:
+    scanner = TriggerScanner([_window(""), _window("")])
+
+    assert _feed_until_decided(scanner, ["a\n", "b\n"]) == 2
+    assert not scanner.is_decided
+
+
+def test_the_walk_is_not_stopped_for_an_end_anchored_pattern() -> None:
+    texts = ["Enter your PIN\n", "OK\n"]
+    windows = [_window("PIN"), _window(r"Enter your PIN\n$")]
+    scanner = TriggerScanner(windows)
+
+    # the pattern matches the first text, but not the whole text
+    assert is_triggered(windows[1], texts[0])
+    assert _feed_until_decided(scanner, texts) == 2
+    assert not scanner.is_decided
+    assert [window for window in windows if is_triggered(window, "".join(texts))] == windows[:1]
@@ -0,0 +1,74 @@
+"""Deliver the window events of the fake window event source"""
+
+import pytest
+
+from handlers.window_events.base import (
+    WindowEvent,
+    WindowEventCallback,
+    WindowEventSourceController,
+    WindowEventSourceInterface,
+    WindowEventType,
+)
+from handlers.window_events.fake import FakeWindowEventSource
+
+
+class _FailingSource(WindowEventSourceInterface):
+    @property
+    def is_event_driven(self) -> bool:
+        return True
+
+    def start(self, callback: WindowEventCallback) -> None:
+        raise OSError("not available")
+
+    def stop(self) -> None:
+        pass
+
+
+def test_events_are_not_delivered_after_stop() -> None:
+    received: list[WindowEvent] = []
+    source = FakeWindowEventSource()
+    controller = WindowEventSourceController(source)
+    controller.start(received.append)
+    source.create(1, "Windows Security")
+    controller.stop()
+
+    source.create(2, "Windows Security")
+
+    assert [event.hwnd for event in received] == [1]
+
+
+def test_controller_falls_back_when_the_source_cannot_be_started() -> None:
+    received: list[WindowEvent] = []
+    fallback = FakeWindowEventSource()
+    controller = WindowEventSourceController(_FailingSource(), fallback=fallback)
+    controller.start(received.append)
+
+    event = fallback.create(1, "Windows Security")
+
+    assert received == [event]
+    assert controller.is_event_driven
+
+
+def test_scripted_events_are_played_in_order() -> None:
+    source = FakeWindowEventSource()
+    received: list[WindowEvent] = []
+    source.start(received.append)
+
+    script = [
+        (0.0, WindowEvent(WindowEventType.CREATED, 1, "a")),
+        (0.01, WindowEvent(WindowEventType.TITLE_CHANGED, 1, "b")),
+        (0.0, WindowEvent(WindowEventType.DESTROYED, 1, "b")),
+    ]
+    thread = source.play(script, blocking=False)
+    assert thread is not None
+    thread.join()
+
+    assert [(event.event_type, event.title) for event in received] == [(event.event_type, event.title) for _, event in script]
+    assert not source.windows
+
+
+@pytest.mark.parametrize(
+    "module", ["handlers.message_loop", "handlers.window_events.win_event_hook", "handlers.session_monitor.wts_notification"]
+)
+def test_native_sources_are_importable_on_any_platform(module: str) -> None:
+    __import__(module)